@@ -6,16 +6,156 @@ class Settings(BaseSettings):
     # OpenAI Configuration
     openai_api_key: Optional[str] = None
     
+    # Shared LLM client connection pool
+    llm_timeout_seconds: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+    llm_max_retries: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    llm_max_connections: int = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+    llm_max_keepalive_connections: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    llm_keepalive_expiry_seconds: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "30"))
+    
+    # Adaptive (AIMD) concurrency limit for LLM calls
+    llm_limit_initial: int = int(os.getenv("LLM_LIMIT_INITIAL", "16"))
+    llm_limit_min: int = int(os.getenv("LLM_LIMIT_MIN", "1"))
+    llm_limit_max: int = int(os.getenv("LLM_LIMIT_MAX", "100"))
+    llm_limit_backoff_ratio: float = float(os.getenv("LLM_LIMIT_BACKOFF_RATIO", "0.7"))
+    llm_limit_latency_tolerance: float = float(os.getenv("LLM_LIMIT_LATENCY_TOLERANCE", "2.0"))
+    # Hedged LLM requests (opt-in) and provider circuit breaker
+    llm_hedging_enabled: bool = os.getenv("LLM_HEDGING_ENABLED", "false").lower() == "true"
+    llm_hedge_percentile: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "90"))
+    llm_hedge_budget_ratio: float = float(os.getenv("LLM_HEDGE_BUDGET_RATIO", "0.05"))
+    llm_hedge_min_samples: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    llm_hedge_min_delay_seconds: float = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "0.05"))
+    llm_breaker_failure_threshold: int = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+    llm_breaker_reset_seconds: float = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+    
+    # Per-org fair-queuing weights for LLM capacity, e.g. "orgA:2,orgB:0.5" (default weight 1)
+    scheduler_org_weights: str = os.getenv("SCHEDULER_ORG_WEIGHTS", "")
+    # Orgs that get their own Prometheus org label, e.g. "orgA,orgB"; orgs in SCHEDULER_ORG_WEIGHTS
+    # and ORG_TOKEN_BUDGETS are included, every other org is labelled "other"
+    metric_orgs: str = os.getenv("METRIC_ORGS", "")
+    
+    # Load shedding: when estimated LLM queue wait exceeds the budget, "reject" (503) or "degrade" (heuristic)
+    load_shedding_enabled: bool = os.getenv("LOAD_SHEDDING_ENABLED", "true").lower() == "true"
+    shed_wait_budget_seconds: float = float(os.getenv("SHED_WAIT_BUDGET_SECONDS", "5"))
+    shed_action_extract_tags: str = os.getenv("SHED_ACTION_EXTRACT_TAGS", "degrade")
+    shed_action_generate_and_save: str = os.getenv("SHED_ACTION_GENERATE_AND_SAVE", "reject")
+    shed_action_batch: str = os.getenv("SHED_ACTION_BATCH", "reject")
+    
+    # Request deadlines (X-Request-Deadline / grpc-timeout); 0 = no deadline when the header is absent
+    request_default_timeout_seconds: float = float(os.getenv("REQUEST_DEFAULT_TIMEOUT_SECONDS", "0"))
+    enhanced_processing_timeout_seconds: float = float(os.getenv("ENHANCED_PROCESSING_TIMEOUT_SECONDS", "30"))
+    enhanced_chunk_timeout_seconds: float = float(os.getenv("ENHANCED_CHUNK_TIMEOUT_SECONDS", "15"))
+
+    # Per-org LLM token budgets (0 = unlimited); overrides as "orgA:60000/2000000,orgB:5000/0" (minute/day)
+    org_token_budget_per_minute: int = int(os.getenv("ORG_TOKEN_BUDGET_PER_MINUTE", "0"))
+    org_token_budget_per_day: int = int(os.getenv("ORG_TOKEN_BUDGET_PER_DAY", "0"))
+    org_token_budgets: str = os.getenv("ORG_TOKEN_BUDGETS", "")
+    token_budget_action: str = os.getenv("TOKEN_BUDGET_ACTION", "reject")
+    token_usage_collection: str = os.getenv("TOKEN_USAGE_COLLECTION", "token_usage")
+    token_usage_flush_seconds: int = int(os.getenv("TOKEN_USAGE_FLUSH_SECONDS", "60"))
+
     # Tagging Service Configuration (Optional - for tag generation only)
     tagging_service_url: Optional[str] = os.getenv("MME_TAGGING_SERVICE_URL")
     tagmaker_jwt_secret: Optional[str] = os.getenv("TAGMAKER_JWT_SECRET")
     enable_tagging_service: bool = os.getenv("ENABLE_TAGGING_SERVICE", "false").lower() == "true"
+    tagging_service_timeout_seconds: float = float(os.getenv("TAGGING_SERVICE_TIMEOUT_SECONDS", "5"))
     
     # MongoDB Configuration for direct database access (Primary dependency)
     mongodb_uri: str = os.getenv("MONGODB_URI")
     mongodb_database: str = os.getenv("MONGODB_DATABASE", "mme")
     mongodb_collection: str = os.getenv("MONGODB_COLLECTION", "memories")
     
+    # Extraction mode: llm, heuristic or tiered (heuristic first, LLM on escalation)
+    extraction_mode: str = os.getenv("EXTRACTION_MODE", "llm")
+    heuristic_confidence_threshold: float = float(os.getenv("HEURISTIC_CONFIDENCE_THRESHOLD", "0.6"))
+    heuristic_max_complexity: float = float(os.getenv("HEURISTIC_MAX_COMPLEXITY", "0.5"))
+    
+    # Pre-filter for content the LLM cannot extract from (logs, dumps, machine JSON): "reject" (422) or "degrade" (heuristic)
+    content_filter_enabled: bool = os.getenv("CONTENT_FILTER_ENABLED", "true").lower() == "true"
+    content_filter_action: str = os.getenv("CONTENT_FILTER_ACTION", "reject")
+    
+    # Pre-compress content (dedupe, whitespace, blob/code/trace placeholders) before LLM extraction
+    precompression_enabled: bool = os.getenv("PRECOMPRESSION_ENABLED", "true").lower() == "true"
+    
+    # LLM-backed engine (llm_tagger or enhanced) and shadow comparison
+    extraction_engine: str = os.getenv("EXTRACTION_ENGINE", "llm_tagger")
+    shadow_engine: Optional[str] = os.getenv("SHADOW_ENGINE")
+    shadow_sample_rate: float = float(os.getenv("SHADOW_SAMPLE_RATE", "0.0"))
+    shadow_max_inflight: int = int(os.getenv("SHADOW_MAX_INFLIGHT", "4"))
+
+    # Model routing by estimated content tokens: small <= SMALL_MAX_TOKENS < medium <= MEDIUM_MAX_TOKENS < large
+    model_routing_enabled: bool = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true"
+    route_small_max_tokens: int = int(os.getenv("ROUTE_SMALL_MAX_TOKENS", "150"))
+    route_small_model: str = os.getenv("ROUTE_SMALL_MODEL", "gpt-4o-mini")
+    # Route cue budgets only cap the caller's max_cues when an operator lowers them
+    route_small_max_cues: int = int(os.getenv("ROUTE_SMALL_MAX_CUES", "20"))
+    route_medium_max_tokens: int = int(os.getenv("ROUTE_MEDIUM_MAX_TOKENS", "1000"))
+    route_medium_model: str = os.getenv("ROUTE_MEDIUM_MODEL", "gpt-4o-mini")
+    route_medium_max_cues: int = int(os.getenv("ROUTE_MEDIUM_MAX_CUES", "20"))
+    route_large_model: str = os.getenv("ROUTE_LARGE_MODEL", "gpt-4o-mini")
+    route_large_max_cues: int = int(os.getenv("ROUTE_LARGE_MAX_CUES", "20"))
+    # Pin orgs to a route, e.g. "orgA:large,orgB:local"
+    route_org_overrides: str = os.getenv("ROUTE_ORG_OVERRIDES", "")
+    # USD per 1M prompt/completion tokens, e.g. "gpt-4o-mini:0.15/0.60"
+    model_prices: str = os.getenv("MODEL_PRICES", "gpt-4o-mini:0.15/0.60")
+    # "openai", or "local" to send every route to the stand-in at LOCAL_LLM_BASE_URL
+    llm_backend: str = os.getenv("LLM_BACKEND", "openai")
+    local_llm_base_url: str = os.getenv("LOCAL_LLM_BASE_URL", "http://127.0.0.1:8081/v1")
+    local_llm_model: str = os.getenv("LOCAL_LLM_MODEL", "standin")
+    # Bundled stand-in (python -m app.services.llm_standin): latency spec, injected failures, record/replay
+    standin_latency: str = os.getenv("STANDIN_LATENCY", "0")
+    standin_error_rate: float = float(os.getenv("STANDIN_ERROR_RATE", "0"))
+    standin_rate_limit_rate: float = float(os.getenv("STANDIN_RATE_LIMIT_RATE", "0"))
+    standin_seed: Optional[str] = os.getenv("STANDIN_SEED")
+    standin_mode: str = os.getenv("STANDIN_MODE", "off")
+    standin_cassette_dir: str = os.getenv("STANDIN_CASSETTE_DIR", "standin_cassettes")
+    standin_upstream_base_url: str = os.getenv("STANDIN_UPSTREAM_BASE_URL", "https://api.openai.com/v1")
+    
+    # Map-reduce extraction for documents over the single-call limit
+    map_reduce_enabled: bool = os.getenv("MAP_REDUCE_ENABLED", "true").lower() == "true"
+    map_reduce_chunk_chars: int = int(os.getenv("MAP_REDUCE_CHUNK_CHARS", "6000"))
+    map_reduce_concurrency: int = int(os.getenv("MAP_REDUCE_CONCURRENCY", "8"))
+    map_reduce_deadline_seconds: float = float(os.getenv("MAP_REDUCE_DEADLINE_SECONDS", "45"))
+    
+    # Domain lexicon source (builtin, file or mongo), reloaded every DOMAIN_LEXICON_RELOAD_SECONDS (0 = never)
+    domain_lexicon_source: str = os.getenv("DOMAIN_LEXICON_SOURCE", "builtin")
+    domain_lexicon_path: str = os.getenv("DOMAIN_LEXICON_PATH", "domain_lexicon.json")
+    domain_lexicon_collection: str = os.getenv("DOMAIN_LEXICON_COLLECTION", "domain_lexicon")
+    domain_lexicon_reload_seconds: int = int(os.getenv("DOMAIN_LEXICON_RELOAD_SECONDS", "300"))
+    
+    # Extraction cache configuration
+    extraction_cache_enabled: bool = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+    extraction_cache_max_entries: int = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "10000"))
+    extraction_cache_ttl_seconds: int = int(os.getenv("EXTRACTION_CACHE_TTL_SECONDS", "3600"))
+    
+    # Shared (MongoDB) extraction cache tier
+    shared_cache_enabled: bool = os.getenv("SHARED_CACHE_ENABLED", "true").lower() == "true"
+    shared_cache_collection: str = os.getenv("SHARED_CACHE_COLLECTION", "extraction_cache")
+    shared_cache_ttl_seconds: int = int(os.getenv("SHARED_CACHE_TTL_SECONDS", "86400"))
+    shared_cache_read_timeout_ms: int = int(os.getenv("SHARED_CACHE_READ_TIMEOUT_MS", "50"))
+    
+    # Session-incremental extraction: only the unseen suffix of a sessionId's transcript is extracted
+    session_incremental_enabled: bool = os.getenv("SESSION_INCREMENTAL_ENABLED", "true").lower() == "true"
+    session_max_entries: int = int(os.getenv("SESSION_MAX_ENTRIES", "5000"))
+    session_ttl_seconds: int = int(os.getenv("SESSION_TTL_SECONDS", "1800"))
+    
+    # Prompt packing: small bulk-lane documents share one LLM call, up to a token and document budget per pack
+    prompt_packing_enabled: bool = os.getenv("PROMPT_PACKING_ENABLED", "false").lower() == "true"
+    prompt_packing_max_doc_tokens: int = int(os.getenv("PROMPT_PACKING_MAX_DOC_TOKENS", "400"))
+    prompt_packing_max_tokens: int = int(os.getenv("PROMPT_PACKING_MAX_TOKENS", "3000"))
+    prompt_packing_max_docs: int = int(os.getenv("PROMPT_PACKING_MAX_DOCS", "16"))
+    prompt_packing_window_ms: int = int(os.getenv("PROMPT_PACKING_WINDOW_MS", "20"))
+    
+    # Per-stage timing breakdown in a Server-Timing response header
+    server_timing_enabled: bool = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+    
+    # Serialize extraction responses with orjson straight to bytes instead of FastAPI's jsonable_encoder
+    fast_json_responses: bool = os.getenv("FAST_JSON_RESPONSES", "true").lower() == "true"
+    
+    # Batch extraction endpoints
+    batch_max_items: int = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+    batch_max_concurrency: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+    
     # Server Configuration
     host: str = "0.0.0.0"
     port: int = 8000
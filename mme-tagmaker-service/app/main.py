@@ -5,6 +5,10 @@ from app.router import router
 from app.services.tiering import rebalance_all_tags
 from app.services.client import replay_failed_deltas
 from app.services.database import db_service
+from app.services.llm_client import close_llm_client
+from app.services.metering import token_meter
+from app.services.domain_lexicon import domain_lexicon
+from app.config import settings
 from app.security.middleware import SecurityMiddleware, SecurityConfig
 from app.security.handlers import security_router, set_security_middleware
 from app.routes.edge_admin import router as edge_admin_router
@@ -39,6 +43,11 @@ scheduler = BackgroundScheduler(timezone="UTC")
 scheduler.add_job(rebalance_all_tags, "cron", hour=2, minute=0)  # Daily rebalancing at 2 AM
 scheduler.add_job(replay_failed_deltas, "interval", minutes=1)   # Retry failed deltas every minute
 scheduler.add_job(run_edge_learning, "interval", minutes=10)     # Edge learning every 10 minutes
+scheduler.add_job(token_meter.flush, "interval", seconds=settings.token_usage_flush_seconds)  # Token usage rollup
+if settings.domain_lexicon_source != "builtin":
+    domain_lexicon.reload()
+    if settings.domain_lexicon_reload_seconds > 0:
+        scheduler.add_job(domain_lexicon.reload, "interval", seconds=settings.domain_lexicon_reload_seconds)  # Lexicon hot reload
 scheduler.start()
 
 @app.get("/health")
@@ -57,4 +66,6 @@ async def version():
 async def shutdown_event():
     """Clean up resources on shutdown"""
     scheduler.shutdown()
+    token_meter.flush()
+    await close_llm_client()
     db_service.close()
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import List
+from app.models.tag import Tag
+
+class ExtractionOutcome(BaseModel):
+    tags: List[Tag]
+    confidence: float
+    primary_tag: str
+    engine: str = "llm"  # Engine that produced the tags: llm, heuristic
+    escalated: bool = False  # Tiered mode: heuristic result was escalated to the LLM
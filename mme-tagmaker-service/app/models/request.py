@@ -1,9 +1,16 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Literal
 
 class TagRequest(BaseModel):
     content: str = Field(..., description="Raw agent output")
     userId: str
     orgId: Optional[str] = "test-org"
-    sessionId: Optional[str] = None
+    sessionId: Optional[str] = Field(None, description="Conversation id; repeated transcripts are extracted incrementally per session")
     source: str = "agent_output"
+    bypassCache: bool = Field(False, description="Skip the extraction result cache for this request")
+    mode: Optional[Literal["llm", "heuristic", "tiered"]] = Field(None, description="Extraction mode (defaults to EXTRACTION_MODE)")
+    priority: Optional[Literal["interactive", "save", "bulk"]] = Field(None, description="Scheduling class for LLM work; can lower but not raise the route's class")
+
+class BatchTagRequest(BaseModel):
+    items: List[TagRequest] = Field(..., min_length=1, description="Extraction requests, processed in order")
+    concurrency: Optional[int] = Field(None, ge=1, description="Max items in flight (capped by the service limit)")
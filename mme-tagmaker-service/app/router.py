@@ -1,10 +1,26 @@
-from fastapi import APIRouter, HTTPException, Header
+import json
+import asyncio
+from fastapi import APIRouter, HTTPException, Header, Response
+from fastapi.responses import StreamingResponse
 from typing import Optional
-from app.models.request import TagRequest
-from app.services.llm_tagger import extract_cues
+from app.models.request import TagRequest, BatchTagRequest
+from app.services.llm_tagger import tag_cues
+from app.services.extraction_engine import extract, stream_llm, resolve_mode
+from app.services.shadow import shadow_comparator
 from app.services.merge import build_delta
 from app.services.client import post_delta
 from app.services.database import db_service
+from app.services.batch import run_batch
+from app.services.scheduler import request_lane, resolve_priority
+from app.services.metering import token_meter, request_tenant, TokenBudgetExceeded
+from app.services.load_shedding import load_shedder, Overloaded
+from app.services.content_filter import content_filter
+from app.services.domain_lexicon import domain_lexicon
+from app.services.stage_timing import request_timing, timed_stage, observe_extraction, server_timing_header
+from app.services import deadline
+from app.services.deadline import request_deadline
+from app.services.llm_client import llm_breaker
+from app.utils.fast_json import RawJSONResponse, dumps
 from app.config import settings
 
 router = APIRouter(
@@ -145,6 +161,17 @@ async def database_direct_test():
             "connection_state": getattr(db_service, '_connection_state', 'unknown') if db_service else 'unknown'
         }
 
+@router.get("/engines/shadow-summary",
+           summary="Extraction Engine Comparison",
+           description="Rolling latency, token and agreement summary of the primary and shadow extraction engines")
+async def engines_shadow_summary():
+    """
+    Summary of shadow-mode comparisons between extraction engines.
+    Returns per-engine latency percentiles and average tokens, plus the mean
+    cue overlap (Jaccard) and primary-tag agreement rate of sampled requests.
+    """
+    return shadow_comparator.summary()
+
 @router.post("/manual-rebalance",
             summary="Manual Rebalance",
             description="Trigger manual tag rebalancing")
@@ -164,6 +191,29 @@ async def manual_rebalance():
     except Exception as e:
         raise HTTPException(500, f"Failed to trigger rebalancing: {str(e)}")
 
+@router.get("/lexicon-status",
+           summary="Domain Lexicon Status",
+           description="Version, source and size of the compiled domain lexicon in use")
+async def lexicon_status():
+    """
+    Report the domain lexicon currently used for tag typing and synonyms.
+    The version is a content hash, so replicas with the same lexicon agree.
+    """
+    return domain_lexicon.info()
+
+@router.post("/lexicon-reload",
+            summary="Reload Domain Lexicon",
+            description="Load and compile the domain lexicon from its source and swap it in without a restart")
+async def lexicon_reload(source: Optional[str] = None):
+    """
+    Reload the domain lexicon from source (builtin, file or mongo; defaults to
+    DOMAIN_LEXICON_SOURCE). A failed load keeps the current lexicon.
+    """
+    try:
+        return await asyncio.to_thread(domain_lexicon.reload, source)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
 @router.post("/extract-tags",
             summary="Extract Tags Only",
             description="Extract structured semantic tags from content using LLM without saving to tagging service",
@@ -188,13 +238,16 @@ async def manual_rebalance():
                                     }
                                 ],
                                 "confidence": 0.95,
-                                "primary_tag": "IRAP submission timeline"
+                                "primary_tag": "IRAP submission timeline",
+                                "engine": "llm"
                             }
                         }
                     }
                 }
             })
-async def extract_tags_only(req: TagRequest):
+async def extract_tags_only(req: TagRequest, response: Response,
+                            x_request_deadline: Optional[str] = Header(None),
+                            grpc_timeout: Optional[str] = Header(None)):
     """
     Extract structured semantic tags from content using LLM without saving to tagging service.
     
@@ -205,19 +258,38 @@ async def extract_tags_only(req: TagRequest):
     
     **Tag Structure:**
     Each tag includes label, section, origin, scope, type, confidence, links, usageCount, and lastUsed
+    
+    **Extraction Modes** (`mode`, defaults to `EXTRACTION_MODE`):
+    - `llm`: always use the LLM
+    - `heuristic`: local heuristics only, no API call
+    - `tiered`: heuristics first, escalating to the LLM on low confidence or complex content
+    
+    The `engine` field reports which engine produced the tags.
+    
+    **Overload:** when the estimated wait for LLM capacity exceeds the budget,
+    the request is answered from the heuristics (`engine: "heuristic"`) or
+    rejected with 503 and `Retry-After`, depending on `SHED_ACTION_EXTRACT_TAGS`.
+    
+    **Non-extractable content** (logs, binary dumps, machine JSON) is refused
+    with 422 before any LLM call, or answered from the heuristics with
+    `CONTENT_FILTER_ACTION=degrade`.
+    
+    **Token budgets:** an org over its per-minute or per-day LLM token budget
+    gets 429 with `Retry-After`, or the heuristic result with
+    `TOKEN_BUDGET_ACTION=degrade`.
+    
+    **Deadline:** `X-Request-Deadline` (Unix timestamp or ISO-8601) or
+    `grpc-timeout` (e.g. `500m`) bounds every downstream call; work still
+    pending when it passes is dropped and the request fails with 504.
+    
+    **Timing:** with `SERVER_TIMING_ENABLED`, a `Server-Timing` header breaks
+    the request down by pipeline stage (LLM wait, parsing, post-processing, ...).
     """
     try:
-        tags, conf, primary_tag = extract_cues(req.content)
-        
-        if not tags:
-            raise HTTPException(400, "No extractable content found")
-            
-        return {
-            "tags": tags, 
-            "confidence": conf,
-            "primary_tag": primary_tag
-        }
-        
+        with request_deadline(_request_budget(x_request_deadline, grpc_timeout)), \
+                request_timing("extract-tags") as timings:
+            result = await _extract_tags(req, "interactive", "extract-tags")
+        return _respond(response, result, timings)
     except HTTPException:
         raise
     except Exception as e:
@@ -249,7 +321,9 @@ async def extract_tags_only(req: TagRequest):
                     }
                 }
             })
-async def generate_and_save(req: TagRequest, authorization: Optional[str] = Header(None)):
+async def generate_and_save(req: TagRequest, response: Response, authorization: Optional[str] = Header(None),
+                            x_request_deadline: Optional[str] = Header(None),
+                            grpc_timeout: Optional[str] = Header(None)):
     """
     Extract semantic cues from agent output content and save as tags.
     
@@ -271,48 +345,281 @@ async def generate_and_save(req: TagRequest, authorization: Optional[str] = Head
     **Error Handling:**
     - Failed requests are queued to disk for automatic retry
     - Service returns 502 if tagging-service is unavailable
+    - Service returns 503 with `Retry-After` when overloaded (`SHED_ACTION_GENERATE_AND_SAVE`)
+    - Service returns 429 with `Retry-After` when the org is over its token budget
+    - Service returns 422 for logs, dumps and machine JSON the LLM cannot extract from
+    - Service returns 504 when the `X-Request-Deadline` / `grpc-timeout` deadline passes
     - Confidence scores reflect extraction quality
+    
+    With `SERVER_TIMING_ENABLED`, a `Server-Timing` header breaks the request
+    down by stage, including `build_delta` and the `post_delta` hop.
     """
     try:
-        tags, conf, primary_tag = extract_cues(req.content)
+        with request_deadline(_request_budget(x_request_deadline, grpc_timeout)), \
+                request_timing("generate-and-save") as timings:
+            result = await _generate_and_save(req, _bearer_token(authorization), "save", "generate-and-save")
+        return _respond(response, result, timings)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(500, f"Tag extraction failed: {str(e)}")
+
+@router.post("/extract-tags/batch",
+            summary="Extract Tags (Batch)",
+            description="Extract structured semantic tags for a list of requests with bounded concurrency",
+            response_description="Per-item extraction results in request order")
+async def extract_tags_batch(batch: BatchTagRequest, response: Response,
+                             x_request_deadline: Optional[str] = Header(None),
+                             grpc_timeout: Optional[str] = Header(None)):
+    """
+    Batch variant of `/extract-tags`.
+    
+    Items run concurrently up to the service limit (`BATCH_MAX_CONCURRENCY`, or the
+    lower `concurrency` given in the request). Results come back in input order;
+    a failing item is reported with its own error instead of failing the batch.
+    Batch items run in the `bulk` priority class so they never delay interactive calls.
+    A request deadline applies to the whole batch; items not done by then fail with 504.
+    Server-Timing durations are summed over the items.
+    """
+    _check_batch_size(batch)
+    with request_deadline(_request_budget(x_request_deadline, grpc_timeout)), request_timing("batch") as timings:
+        result = await run_batch(
+            batch.items,
+            lambda item: _extract_tags(item, "bulk", "batch"),
+            _batch_concurrency(batch),
+            "extract-tags"
+        )
+    return _respond(response, result, timings)
+
+@router.post("/generate-and-save/batch",
+            summary="Extract Tags and Save (Batch)",
+            description="Extract and save tags for a list of requests with bounded concurrency",
+            response_description="Per-item extraction and save results in request order")
+async def generate_and_save_batch(batch: BatchTagRequest, response: Response, authorization: Optional[str] = Header(None),
+                                  x_request_deadline: Optional[str] = Header(None),
+                                  grpc_timeout: Optional[str] = Header(None)):
+    """
+    Batch variant of `/generate-and-save`.
+    
+    Same concurrency and per-item error semantics as `/extract-tags/batch`.
+    Server-Timing durations are summed over the items.
+    """
+    _check_batch_size(batch)
+    jwt_token = _bearer_token(authorization)
+    with request_deadline(_request_budget(x_request_deadline, grpc_timeout)), request_timing("batch") as timings:
+        result = await run_batch(
+            batch.items,
+            lambda item: _generate_and_save(item, jwt_token, "bulk", "batch"),
+            _batch_concurrency(batch),
+            "generate-and-save"
+        )
+    return _respond(response, result, timings)
+
+@router.post("/extract-tags/stream",
+            summary="Extract Tags (Streaming)",
+            description="Stream structured semantic tags as Server-Sent Events while the LLM is still generating",
+            response_description="text/event-stream of `tag` events followed by one `done` event")
+async def extract_tags_stream(req: TagRequest,
+                              x_request_deadline: Optional[str] = Header(None),
+                              grpc_timeout: Optional[str] = Header(None)):
+    """
+    Streaming variant of `/extract-tags`.
+    
+    **Events:**
+    - `tag`: one structured Tag, sent as soon as its cue is complete (confidence is null)
+    - `done`: `{"confidence": ..., "primary_tag": ..., "engine": ...}`, sent last
+    - `error`: `{"detail": ...}` if extraction fails mid-stream
+    
+    Under overload this route follows `SHED_ACTION_EXTRACT_TAGS`: a 503 before
+    the stream starts, or the heuristic result sent as one burst of events.
+    """
+    budget = _request_budget(x_request_deadline, grpc_timeout)
+    priority = resolve_priority("interactive", req.priority)
+    with request_deadline(budget), request_timing("extract-tags"), timed_stage("admission"):
+        mode = _admit(req, priority, "extract-tags")
+    
+    async def _events():
+        tag_count = 0
+        try:
+            with request_deadline(budget), request_lane(priority, req.orgId), request_tenant(req.orgId, req.userId), \
+                    request_timing("extract-tags"):
+                async for event, payload in _stream_events(req, mode):
+                    if event == "tag":
+                        tag_count += 1
+                        yield _sse("tag", payload.model_dump_json())
+                    elif not tag_count:
+                        yield _sse("error", json.dumps({"detail": "No extractable content found"}))
+                    else:
+                        observe_extraction(req.content, tag_count, payload["engine"])
+                        yield _sse("done", json.dumps(payload))
+        except Exception as e:
+            yield _sse("error", json.dumps({"detail": f"Tag extraction failed: {str(e)}"}))
+    
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _stream_events(req: TagRequest, mode: Optional[str]):
+    """Stream cues from the LLM, or emit a non-streamed result for heuristic modes and an open circuit"""
+    if resolve_mode(mode) == "llm" and not llm_breaker.rejecting():
+        async for event, payload in stream_llm(req.content, use_cache=not req.bypassCache):
+            yield event, ({**payload, "engine": "llm"} if event == "summary" else payload)
+        return
+    outcome = await extract(req.content, use_cache=not req.bypassCache, mode=mode)
+    for tag in outcome.tags:
+        yield "tag", tag
+    yield "summary", {"confidence": outcome.confidence, "primary_tag": outcome.primary_tag, "engine": outcome.engine}
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+def _admit(req: TagRequest, priority: str, route: str) -> Optional[str]:
+    """
+    Extractability, token-budget and load-shedding admission check; returns the extraction mode to run.
+    Raises 422 for content the LLM cannot extract from (CONTENT_FILTER_ACTION=reject),
+    429 with Retry-After for an org over its token budget (TOKEN_BUDGET_ACTION=reject)
+    and 503 with Retry-After when the route rejects under overload.
+    """
+    mode = req.mode
+    if resolve_mode(mode) == "heuristic":
+        return mode
+    try:
+        if content_filter.check(req.content) == "degrade":
+            return "heuristic"
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+    try:
+        if token_meter.check(req.orgId) == "degrade":
+            return "heuristic"
+    except TokenBudgetExceeded as e:
+        raise HTTPException(429, str(e), headers={"Retry-After": str(e.retry_after)})
+    try:
+        if load_shedder.check(route, priority) == "degrade":
+            return "heuristic"
+    except Overloaded as e:
+        raise HTTPException(503, str(e), headers={"Retry-After": str(e.retry_after)})
+    return mode
+
+def _request_budget(x_request_deadline: Optional[str], grpc_timeout: Optional[str]) -> Optional[float]:
+    """Seconds left from the deadline headers (400 if malformed, 504 if already passed)"""
+    try:
+        budget = deadline.budget_from_headers(x_request_deadline, grpc_timeout, settings.request_default_timeout_seconds)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if budget is not None and budget <= 0:
+        deadline.DEADLINE_EXCEEDED.labels(stage="admission").inc()
+        raise HTTPException(504, "Request deadline already passed")
+    return budget
+
+def _check_deadline(stage: str):
+    try:
+        deadline.check(stage)
+    except deadline.DeadlineExceeded as e:
+        raise HTTPException(504, str(e))
+
+async def _extract(req: TagRequest, priority: str, route: str):
+    """Run the extraction engine in the request's priority lane, subject to load shedding"""
+    _check_deadline("extraction")
+    priority = resolve_priority(priority, req.priority)
+    with timed_stage("admission"):
+        mode = _admit(req, priority, route)
+    try:
+        with request_lane(priority, req.orgId), request_tenant(req.orgId, req.userId):
+            outcome = await extract(req.content, use_cache=not req.bypassCache, mode=mode, session_id=req.sessionId)
+        observe_extraction(req.content, len(outcome.tags), outcome.engine)
+        return outcome
+    except Exception:
+        # Stages fail in their own ways once the deadline passes; report it as such
+        _check_deadline("extraction")
+        raise
+
+async def _extract_tags(req: TagRequest, priority: str, route: str) -> dict:
+    """Extract tags for a single request"""
+    outcome = await _extract(req, priority, route)
+    
+    if not outcome.tags:
+        raise HTTPException(400, "No extractable content found")
         
-        if not tags:
-            raise HTTPException(400, "No extractable content found")
-            
-        # Convert structured tags to legacy format for delta building
-        cues = [f"{tag.label}:{tag.links[0] if tag.links else ''}" for tag in tags]
-        hashes = [tag.label for tag in tags]  # Use label as hash for now
+    return {
+        "tags": outcome.tags, 
+        "confidence": outcome.confidence,
+        "primary_tag": outcome.primary_tag,
+        "engine": outcome.engine
+    }
+
+async def _generate_and_save(req: TagRequest, jwt_token: Optional[str], priority: str, route: str) -> dict:
+    """Extract tags for a single request and post the delta to the tagging service"""
+    outcome = await _extract(req, priority, route)
+    tags, conf, primary_tag = outcome.tags, outcome.confidence, outcome.primary_tag
+    
+    if not tags:
+        raise HTTPException(400, "No extractable content found")
         
-        # primary_tag is now semantically selected by extract_cues
+    # Convert structured tags to legacy format for delta building
+    cues = tag_cues(tags)
+    hashes = [tag.label for tag in tags]  # Use label as hash for now
+    
+    # primary_tag is now semantically selected by extract_cues
+    with timed_stage("build_delta", outcome.engine):
         delta = build_delta(primary_tag, cues, hashes, {})
-        
-        # Extract JWT token from Authorization header
-        jwt_token = None
-        if authorization and authorization.startswith("Bearer "):
-            jwt_token = authorization[7:]  # Remove "Bearer " prefix
-        
-        # Check if tagging service is enabled
-        if not settings.enable_tagging_service:
-            return {
-                "saved": False,
-                "tags": tags, 
-                "confidence": conf,
-                "primary_tag": primary_tag,
-                "message": "Tagging service is disabled, only extraction performed"
-            }
-        
-        ok = post_delta(delta, req.userId, req.orgId, jwt_token)
-        if not ok:
-            raise HTTPException(502, "tagging-service unavailable")
-            
+    
+    # Check if tagging service is enabled
+    if not settings.enable_tagging_service:
         return {
-            "saved": True, 
+            "saved": False,
             "tags": tags, 
             "confidence": conf,
-            "primary_tag": primary_tag
+            "primary_tag": primary_tag,
+            "engine": outcome.engine,
+            "message": "Tagging service is disabled, only extraction performed"
         }
+    
+    # post_delta uses a blocking HTTP client; keep it off the event loop
+    _check_deadline("post_delta")
+    with timed_stage("post_delta", outcome.engine):
+        ok = await asyncio.to_thread(post_delta, delta, req.userId, req.orgId, jwt_token)
+    if not ok:
+        raise HTTPException(502, "tagging-service unavailable")
         
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(500, f"Tag extraction failed: {str(e)}")
+    return {
+        "saved": True, 
+        "tags": tags, 
+        "confidence": conf,
+        "primary_tag": primary_tag,
+        "engine": outcome.engine
+    }
+
+def _respond(response: Response, result: dict, timings):
+    """
+    Endpoint result with its Server-Timing header. With FAST_JSON_RESPONSES the
+    result is serialized here with orjson and returned as raw bytes, so FastAPI
+    does not run jsonable_encoder over every tag.
+    """
+    if not settings.fast_json_responses:
+        _server_timing(response, timings)
+        return result
+    raw = RawJSONResponse(dumps(result))
+    _server_timing(raw, timings)
+    return raw
+
+def _server_timing(response: Response, timings):
+    header = server_timing_header(timings)
+    if header:
+        response.headers["Server-Timing"] = header
+
+def _bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """Extract JWT token from Authorization header"""
+    if authorization and authorization.startswith("Bearer "):
+        return authorization[7:]  # Remove "Bearer " prefix
+    return None
+
+def _check_batch_size(batch: BatchTagRequest):
+    if len(batch.items) > settings.batch_max_items:
+        raise HTTPException(413, f"Batch too large: {len(batch.items)} items (max {settings.batch_max_items})")
+
+def _batch_concurrency(batch: BatchTagRequest) -> int:
+    if batch.concurrency:
+        return min(batch.concurrency, settings.batch_max_concurrency)
+    return settings.batch_max_concurrency
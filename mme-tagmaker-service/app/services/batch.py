@@ -0,0 +1,53 @@
+"""
+Batch execution for extraction endpoints
+
+Runs a list of requests through a per-item handler with bounded concurrency,
+returning results in input order with per-item errors instead of failing
+the whole batch.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List
+from fastapi import HTTPException
+from prometheus_client import Histogram
+from loguru import logger
+
+BATCH_SIZE = Histogram(
+    'mme_batch_size',
+    'Number of items per batch request',
+    ['route'],
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500)
+)
+
+
+async def run_batch(items: List[Any],
+                    handler: Callable[[Any], Awaitable[Dict]],
+                    concurrency: int,
+                    route: str) -> Dict:
+    """
+    Run handler over items with at most `concurrency` in flight.
+    Each result carries its index and either the handler output or an error.
+    """
+    BATCH_SIZE.labels(route=route).observe(len(items))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _run(index: int, item: Any) -> Dict:
+        async with semaphore:
+            try:
+                result = await handler(item)
+                return {"index": index, "status": "ok", **result}
+            except HTTPException as e:
+                return {"index": index, "status": "error", "error": {"code": e.status_code, "detail": e.detail}}
+            except Exception as e:
+                logger.error(f"Batch item {index} failed on {route}: {str(e)}")
+                return {"index": index, "status": "error", "error": {"code": 500, "detail": f"Tag extraction failed: {str(e)}"}}
+
+    results = await asyncio.gather(*[_run(i, item) for i, item in enumerate(items)])
+    failed = sum(1 for r in results if r["status"] == "error")
+
+    return {
+        "results": results,
+        "total": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed
+    }
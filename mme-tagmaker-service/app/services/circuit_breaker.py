@@ -0,0 +1,124 @@
+"""
+Circuit Breaker for the LLM provider
+
+Trips after a run of consecutive provider failures (timeouts, 5xx, connection
+errors). While open, LLM calls fail fast and the extraction engine answers
+from the local heuristics. After the reset timeout a single half-open probe is
+let through; its success closes the circuit, its failure re-opens it.
+"""
+
+import time
+import threading
+from prometheus_client import Counter, Gauge
+from loguru import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Prometheus metrics
+BREAKER_STATE = Gauge(
+    'mme_circuit_breaker_state',
+    'Circuit breaker state (0 closed, 1 half-open, 2 open)',
+    ['name']
+)
+
+BREAKER_TRANSITIONS = Counter(
+    'mme_circuit_breaker_transitions_total',
+    'Circuit breaker state transitions',
+    ['name', 'state']
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+
+    def __init__(self, name: str):
+        super().__init__(f"Circuit '{name}' is open")
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_inflight = False
+        self._lock = threading.Lock()
+        BREAKER_STATE.labels(name=name).set(0)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str):
+        if state == self._state:
+            return
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        BREAKER_STATE.labels(name=self.name).set(_STATE_VALUES[state])
+        BREAKER_TRANSITIONS.labels(name=self.name, state=state).inc()
+        logger.warning(f"Circuit '{self.name}' is now {state}")
+
+    def rejecting(self) -> bool:
+        """True while calls would be rejected (open, or half-open with the probe taken)"""
+        with self._lock:
+            state = self._current_state()
+            return state == OPEN or (state == HALF_OPEN and self._probe_inflight)
+
+    def acquire(self) -> bool:
+        """
+        Permission for one call. Returns True if the call is the half-open
+        probe; raises CircuitOpenError when rejected.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and not self._probe_inflight:
+                self._probe_inflight = True
+                return True
+        raise CircuitOpenError(self.name)
+
+    def record_success(self, probe: bool = False):
+        with self._lock:
+            self._failures = 0
+            if probe:
+                self._probe_inflight = False
+                self._transition(CLOSED)
+
+    def record_failure(self, probe: bool = False):
+        with self._lock:
+            self._failures += 1
+            if probe:
+                self._probe_inflight = False
+                self._transition(OPEN)
+            elif self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+    def record_neutral(self, probe: bool = False):
+        """The call ended without saying anything about provider health (e.g. cancelled, 4xx)"""
+        if probe:
+            with self._lock:
+                self._probe_inflight = False
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_seconds": self.reset_seconds
+            }
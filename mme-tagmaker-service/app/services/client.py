@@ -5,11 +5,13 @@ from datetime import datetime
 from typing import Dict, Optional
 from loguru import logger
 from app.config import settings
+from app.services import deadline
 
 def post_delta(delta: Dict, user_id: str, org_id: str = "test-org", jwt_token: Optional[str] = None) -> bool:
     """
     Post delta operations to the tagging-service (Optional feature)
     Returns True on success (2xx), False on failure or if tagging service is disabled
+    The HTTP timeout is capped by the request deadline when one is set
     """
     # Check if tagging service is enabled
     if not settings.enable_tagging_service:
@@ -38,7 +40,7 @@ def post_delta(delta: Dict, user_id: str, org_id: str = "test-org", jwt_token: O
             settings.tagging_service_url + "/tags/delta",
             json=delta,
             headers=headers,
-            timeout=5
+            timeout=deadline.timeout(settings.tagging_service_timeout_seconds) or 0.001
         )
         
         if response.status_code in range(200, 300):
@@ -0,0 +1,187 @@
+"""
+Adaptive Concurrency Limiter for outbound LLM calls
+
+AIMD limiter: the concurrency limit grows additively (about +1 per limit's
+worth of successful calls) while latency stays within a tolerance of its
+baseline, and shrinks multiplicatively on provider overload signals (429s,
+timeouts, 5xx). A Retry-After from the provider pauses all new calls until it
+has elapsed. Callers beyond the limit wait in a fair queue: strict priority
+between classes, weighted fair queuing between orgs (see scheduler).
+"""
+
+import time
+import asyncio
+from typing import Optional
+from prometheus_client import Counter, Gauge, Histogram
+from loguru import logger
+from app.services.scheduler import FairQueue, SCHEDULER_QUEUE_WAIT, current_lane, metric_org
+
+# Prometheus metrics
+LIMITER_LIMIT = Gauge(
+    'mme_llm_concurrency_limit',
+    'Current adaptive concurrency limit for LLM calls'
+)
+
+LIMITER_INFLIGHT = Gauge(
+    'mme_llm_inflight_calls',
+    'LLM calls currently holding a concurrency slot'
+)
+
+LIMITER_QUEUE_DEPTH = Gauge(
+    'mme_llm_queue_depth',
+    'LLM calls waiting for a concurrency slot'
+)
+
+LIMITER_WAIT = Histogram(
+    'mme_llm_queue_wait_seconds',
+    'Time LLM calls waited for a concurrency slot',
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+)
+
+LIMITER_BACKOFFS = Counter(
+    'mme_llm_limiter_backoffs_total',
+    'Total number of multiplicative limit decreases',
+    ['reason']
+)
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter with a priority/fair wait queue and Retry-After pauses."""
+
+    def __init__(self, initial_limit: int = 16, min_limit: int = 1, max_limit: int = 128,
+                 backoff_ratio: float = 0.7, latency_tolerance: float = 2.0,
+                 queue: Optional[FairQueue] = None):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._inflight = 0
+        self._waiters = queue if queue is not None else FairQueue()
+        self._paused_until = 0.0
+        self._wake_handle: Optional[asyncio.TimerHandle] = None
+        self._baseline_latency: Optional[float] = None
+        LIMITER_LIMIT.set(self._limit)
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _can_grant(self) -> bool:
+        return self._inflight < self.limit and time.monotonic() >= self._paused_until
+
+    async def acquire(self):
+        """Wait for a concurrency slot in the current request's lane"""
+        priority, org = current_lane()
+        start = time.monotonic()
+        if not self._waiters and self._can_grant():
+            self._inflight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            entry = self._waiters.push(waiter, priority, org)
+            self._update_gauges()
+            self._schedule_wake()
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Slot was granted just before cancellation; hand it back
+                    self._release_slot()
+                else:
+                    self._waiters.remove(entry)
+                    self._update_gauges()
+                raise
+        waited = time.monotonic() - start
+        LIMITER_WAIT.observe(waited)
+        SCHEDULER_QUEUE_WAIT.labels(priority=priority, org=metric_org(org)).observe(waited)
+        self._update_gauges()
+
+    def release(self, latency: Optional[float] = None, overload: Optional[str] = None,
+                retry_after: Optional[float] = None):
+        """
+        Release a slot and adapt the limit.
+        overload: reason for a multiplicative decrease (rate_limited, timeout, server_error)
+        retry_after: seconds to pause new calls, from the provider's Retry-After
+        """
+        if overload:
+            self._limit = max(float(self.min_limit), self._limit * self.backoff_ratio)
+            LIMITER_BACKOFFS.labels(reason=overload).inc()
+            logger.warning(f"LLM limiter backing off ({overload}): limit now {self.limit}")
+        elif latency is not None:
+            self._observe_latency(latency)
+
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+        LIMITER_LIMIT.set(self._limit)
+        self._release_slot()
+
+    def _observe_latency(self, latency: float):
+        if self._baseline_latency is None:
+            self._baseline_latency = latency
+            return
+        stable = latency <= self.latency_tolerance * self._baseline_latency
+        # Slow-moving baseline so a gradual slowdown is still noticed
+        self._baseline_latency = 0.95 * self._baseline_latency + 0.05 * latency
+        if stable and self._limit < self.max_limit:
+            self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+
+    def _release_slot(self):
+        self._inflight = max(0, self._inflight - 1)
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self._can_grant():
+            waiter = self._waiters.pop().item
+            if waiter.cancelled():
+                continue
+            self._inflight += 1
+            waiter.set_result(True)
+        self._update_gauges()
+        self._schedule_wake()
+
+    def _schedule_wake(self):
+        """Re-check the queue when a Retry-After pause ends"""
+        remaining = self._paused_until - time.monotonic()
+        if self._waiters and remaining > 0 and self._wake_handle is None:
+            def _resume():
+                self._wake_handle = None
+                self._wake()
+            self._wake_handle = asyncio.get_running_loop().call_later(remaining, _resume)
+
+    def _update_gauges(self):
+        LIMITER_INFLIGHT.set(self._inflight)
+        LIMITER_QUEUE_DEPTH.set(len(self._waiters))
+
+    def estimated_wait(self, priority: str) -> float:
+        """
+        Rough seconds a new call of this class would wait for a slot: remaining
+        Retry-After pause plus the calls queued ahead of it, drained at
+        limit calls per baseline latency. 0 until a latency baseline exists.
+        """
+        paused = max(0.0, self._paused_until - time.monotonic())
+        ahead = self._waiters.depth_ahead_of(priority)
+        if not ahead and self._inflight < self.limit:
+            return paused
+        if self._baseline_latency is None:
+            return paused
+        return paused + (ahead + 1) * self._baseline_latency / self.limit
+
+    def status(self) -> dict:
+        """Current limiter state"""
+        return {
+            "limit": self.limit,
+            "inflight": self._inflight,
+            "queue_depth": len(self._waiters),
+            "queue_depth_by_priority": self._waiters.status(),
+            "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 3),
+            "baseline_latency_seconds": round(self._baseline_latency, 4) if self._baseline_latency else None
+        }
@@ -6,32 +6,54 @@ Handles conflicts between security detection and memory tagging
 import re
 from typing import Dict, Any, Tuple
 from loguru import logger
+from app.utils.keyword_scanner import content_keywords
 
 class SecurityMemoryConflictResolver:
     def __init__(self):
+        # Keyword lists are matched through the shared keyword scanner, one pass per content
         # Educational context indicators
-        self.educational_indicators = {
+        self.educational_indicators = content_keywords.register({
             "training", "educational", "documentation", "learning", "tutorial", 
             "example", "testing", "demonstration", "simulation", "practice",
             "workshop", "course", "guide", "manual", "reference", "how-to"
-        }
+        })
         
         # Legitimate security work indicators
-        self.security_work_indicators = {
+        self.security_work_indicators = content_keywords.register({
             "security audit", "penetration testing", "vulnerability assessment",
             "security training", "security documentation", "security review",
             "threat modeling", "security implementation", "security testing",
             "cybersecurity", "infosec", "security awareness", "compliance audit"
-        }
+        })
+        
+        self.educational_phrases = content_keywords.register([
+            "for learning purposes", "training material", "educational example",
+            "documentation shows", "tutorial demonstrates", "course explains",
+            "best practices", "security awareness", "how to prevent",
+            "security guidelines", "recommended approach"
+        ])
+        
+        self.legitimate_work_phrases = content_keywords.register([
+            "security assessment", "penetration test", "vulnerability scan",
+            "security audit", "compliance check", "security implementation",
+            "security monitoring", "incident response", "threat analysis"
+        ])
+        
+        # Destructive commands
+        self.destructive_indicators = content_keywords.register([
+            "rm -rf /", "format c:", "del /f /s /q", "DROP DATABASE",
+            "TRUNCATE TABLE", "DELETE FROM users", "shutdown -h now",
+            ":(){ :|:& };:", "while true; do", "fork bomb"
+        ])
         
         # High-risk patterns that should always be blocked
-        self.always_block_patterns = [
+        self.always_block_patterns = [re.compile(pattern) for pattern in (
             r"(?i)drop\s+table",
             r"(?i)delete\s+from\s+\*",
             r"(?i)rm\s+-rf\s+/",
             r"(?i)format\s+c:",
             r"(?i)exec\s*\(\s*['\"].*system.*['\"]",
-        ]
+        )]
     
     def resolve_conflict(self, mse_result: Dict[str, Any], mme_result: Dict[str, Any], 
                         original_content: str) -> Dict[str, Any]:
@@ -128,42 +150,13 @@ class SecurityMemoryConflictResolver:
     
     def _analyze_content_context(self, content: str) -> Dict[str, Any]:
         """Analyze content to determine context and legitimacy"""
-        content_lower = content.lower()
-        
-        # Educational context detection
-        educational_score = 0
-        for indicator in self.educational_indicators:
-            if indicator in content_lower:
-                educational_score += 1
-        
-        # Security work context detection
-        security_work_score = 0
-        for indicator in self.security_work_indicators:
-            if indicator in content_lower:
-                security_work_score += 2
-        
-        # Check for educational phrases
-        educational_phrases = [
-            "for learning purposes", "training material", "educational example",
-            "documentation shows", "tutorial demonstrates", "course explains",
-            "best practices", "security awareness", "how to prevent",
-            "security guidelines", "recommended approach"
-        ]
+        hits = content_keywords.scan(content)
         
-        for phrase in educational_phrases:
-            if phrase in content_lower:
-                educational_score += 3
-        
-        # Check for legitimate security work
-        legitimate_work_phrases = [
-            "security assessment", "penetration test", "vulnerability scan",
-            "security audit", "compliance check", "security implementation",
-            "security monitoring", "incident response", "threat analysis"
-        ]
+        # Educational context detection (indicators 1 point, phrases 3)
+        educational_score = len(self.educational_indicators & hits) + 3 * len(self.educational_phrases & hits)
         
-        for phrase in legitimate_work_phrases:
-            if phrase in content_lower:
-                security_work_score += 3
+        # Security work context detection (indicators 2 points, phrases 3)
+        security_work_score = 2 * len(self.security_work_indicators & hits) + 3 * len(self.legitimate_work_phrases & hits)
         
         return {
             "is_educational": educational_score >= 3,
@@ -177,22 +170,11 @@ class SecurityMemoryConflictResolver:
     def _has_critical_threats(self, content: str) -> bool:
         """Check if content contains critical threats that should always be blocked"""
         for pattern in self.always_block_patterns:
-            if re.search(pattern, content):
+            if pattern.search(content):
                 return True
         
         # Check for destructive commands
-        destructive_indicators = [
-            "rm -rf /", "format c:", "del /f /s /q", "DROP DATABASE",
-            "TRUNCATE TABLE", "DELETE FROM users", "shutdown -h now",
-            ":(){ :|:& };:", "while true; do", "fork bomb"
-        ]
-        
-        content_lower = content.lower()
-        for indicator in destructive_indicators:
-            if indicator.lower() in content_lower:
-                return True
-        
-        return False
+        return not self.destructive_indicators.isdisjoint(content_keywords.scan(content))
     
     def _create_security_aware_tag(self, primary_tag: str, matched_rules: list, 
                                   context_analysis: Dict[str, Any]) -> str:
@@ -0,0 +1,54 @@
+"""
+Shared fixtures for service tests.
+
+standin_llm: the bundled chat-completions stand-in (app.services.llm_standin),
+served by uvicorn on an ephemeral port, with scripted per-request latency and errors.
+"""
+
+import time
+import threading
+import pytest
+import uvicorn
+from openai import AsyncOpenAI
+from app.services import extraction_engine, llm_client
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.concurrency import AdaptiveLimiter
+from app.services.hedging import HedgeBudget, LatencyWindow
+from app.services.llm_standin import StandinLLM
+
+
+# Fixed answer and usage for service tests; the bundled stand-in derives both from the prompt otherwise
+STANDIN_CUES = ["Budget proposal submitted", "Deadline review meeting scheduled"]
+STANDIN_USAGE = (50, 20)
+
+
+@pytest.fixture(scope="session")
+def standin_server():
+    """Run one stand-in server for the test session; yields (standin, base_url)"""
+    standin = StandinLLM(cues=STANDIN_CUES, usage=STANDIN_USAGE)
+    server = uvicorn.Server(uvicorn.Config(standin.app, host="127.0.0.1", port=0, log_level="warning", ws="none"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield standin, f"http://127.0.0.1:{port}/v1"
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+@pytest.fixture
+def standin_llm(standin_server, monkeypatch):
+    """Point the shared LLM client at the stand-in, with fresh limiter, breaker and hedging state"""
+    standin, base_url = standin_server
+    standin.reset(STANDIN_CUES)
+    client = AsyncOpenAI(api_key="test-key", base_url=base_url, max_retries=0)
+    monkeypatch.setattr(llm_client, "_client", client)
+    monkeypatch.setattr(llm_client, "llm_limiter", AdaptiveLimiter(initial_limit=16))
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=0.1)
+    monkeypatch.setattr(llm_client, "llm_breaker", breaker)
+    monkeypatch.setattr(extraction_engine, "llm_breaker", breaker)
+    monkeypatch.setattr(llm_client, "llm_latency", LatencyWindow(min_samples=5))
+    monkeypatch.setattr(llm_client, "hedge_budget", HedgeBudget(ratio=1.0))
+    monkeypatch.setattr(llm_client.settings, "llm_max_retries", 0)
+    return standin
@@ -0,0 +1,161 @@
+"""
+Extractability Pre-Filter
+
+Fast local classifier run at admission, before any LLM call. Pure logs,
+binary-ish dumps, encoded blobs and machine JSON never yield cues, so instead
+of paying a full LLM round-trip to end in "LLM returned no cues" (a 500), such
+content is answered with a 422 or the heuristic result. The signals are
+character entropy, the share of control characters, token shape (how many
+tokens look like words), log-line structure, and the letter and stopword
+shares as a cheap test for natural language. Thresholds are conservative:
+markdown, code and terse bullet lists still go to the LLM.
+"""
+
+import re
+import json
+import math
+from collections import Counter as CharCounter
+from typing import Dict, List, Optional
+from prometheus_client import Counter
+from loguru import logger
+from app.config import settings
+
+FILTER_ACTIONS = ("reject", "degrade")
+
+# Content shorter than this is always passed through; there is too little to judge
+MIN_CHARS = 40
+# Bits per non-space character; English prose is around 4.5, code up to 5.4, base64 around 6
+MAX_ENTROPY = 5.5
+MAX_CONTROL_RATIO = 0.05
+MIN_WORD_TOKEN_RATIO = 0.35
+MIN_LETTER_RATIO = 0.4
+MIN_LOG_LINE_RATIO = 0.8
+
+# Letters of any script, with inner apostrophes and hyphens
+_WORD_TOKEN = re.compile(r"^[^\W\d_](?:[^\W\d_]|['-])*$")
+# Scripts written without spaces between words (CJK, kana, Thai); such text is tokenized into letter and digit runs
+_UNSEGMENTED = re.compile(r"[\u0e00-\u0e7f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+_LETTER_OR_DIGIT_RUN = re.compile(r"[^\W\d_]+|\d+")
+# Punctuation and markdown markup around a token (bold, code, quotes, brackets)
+_TOKEN_WRAPPING = "()[]{}<>\"'.,;:!?*_`#|~"
+_LOG_LINE = re.compile(
+    r'^\s*(?:\[?\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}|\[?\d{2}:\d{2}:\d{2}|'
+    r'\[?(?:TRACE|DEBUG|INFO|WARN|WARNING|ERROR|FATAL|CRITICAL)\]?[\s:])'
+)
+_STOPWORDS = {
+    "the", "a", "an", "and", "or", "but", "of", "to", "in", "on", "at", "for", "with", "by",
+    "from", "is", "are", "was", "were", "be", "been", "has", "have", "had", "it", "this",
+    "that", "we", "they", "our", "will", "not", "as", "after", "before", "should", "can"
+}
+
+# Prometheus metrics
+CONTENT_FILTER = Counter(
+    'mme_content_filter_total',
+    'Pre-filter verdicts on extraction requests',
+    ['verdict']
+)
+
+
+def char_entropy(text: str) -> float:
+    """Shannon entropy of the character distribution, in bits per character"""
+    if not text:
+        return 0.0
+    total = len(text)
+    return -sum(n / total * math.log2(n / total) for n in CharCounter(text).values())
+
+
+def _tokens(content: str) -> List[str]:
+    tokens = []
+    for raw in content.split():
+        token = raw.strip(_TOKEN_WRAPPING)
+        if _UNSEGMENTED.search(token):
+            # A whole clause or sentence; each run of letters counts as one word
+            tokens.extend(_LETTER_OR_DIGIT_RUN.findall(token))
+        # Tokens that are only markup or symbols (bullets, table rules, emoji) say nothing either way
+        elif any(c.isalnum() for c in token):
+            tokens.append(token)
+    return tokens
+
+
+def content_features(content: str) -> Dict[str, float]:
+    """Signals the classifier decides on"""
+    tokens = _tokens(content)
+    words = [t for t in tokens if _WORD_TOKEN.match(t)]
+    lines = [line for line in content.splitlines() if line.strip()]
+    visible = re.sub(r'\s+', '', content)
+    letters = sum(c.isalpha() for c in visible)
+    alnum = sum(c.isalnum() for c in visible)
+    return {
+        "entropy": char_entropy(visible),
+        "letter_ratio": letters / alnum if alnum else 0.0,
+        "control_ratio": sum(not c.isprintable() and not c.isspace() for c in content) / len(content),
+        "word_token_ratio": len(words) / len(tokens) if tokens else 0.0,
+        "stopword_ratio": sum(w.lower() in _STOPWORDS for w in words) / len(tokens) if tokens else 0.0,
+        "log_line_ratio": sum(bool(_LOG_LINE.match(line)) for line in lines) / len(lines) if lines else 0.0,
+        "line_count": len(lines),
+        "token_count": len(tokens),
+    }
+
+
+def _is_json(content: str) -> bool:
+    stripped = content.strip()
+    if not stripped or stripped[0] not in "{[":
+        return False
+    try:
+        json.loads(stripped)
+        return True
+    except ValueError:
+        return False
+
+
+class ContentFilter:
+    """Decides per request whether content is worth an LLM call."""
+
+    def classify(self, content: str) -> Optional[str]:
+        """Reason the content is not extractable, or None if it is"""
+        if len(content.strip()) < MIN_CHARS:
+            return None
+        if _is_json(content):
+            return "machine_json"
+
+        features = content_features(content)
+        if features["control_ratio"] > MAX_CONTROL_RATIO:
+            return "binary"
+        if features["entropy"] > MAX_ENTROPY and features["word_token_ratio"] < 0.5:
+            return "high_entropy"
+        if features["line_count"] >= 3 and features["log_line_ratio"] >= MIN_LOG_LINE_RATIO:
+            return "log_lines"
+        # Mostly digits (numeric dumps, metric tables); letters of any script count
+        if features["letter_ratio"] < MIN_LETTER_RATIO:
+            return "no_language"
+        if features["word_token_ratio"] < MIN_WORD_TOKEN_RATIO:
+            return "machine_tokens"
+        # Long stretches of word-like tokens without a single function word (keyword lists, identifiers)
+        if features["token_count"] >= 50 and features["stopword_ratio"] == 0 and features["word_token_ratio"] < 0.5:
+            return "no_language"
+        return None
+
+    def check(self, content: str) -> Optional[str]:
+        """
+        Admission check for one LLM-backed request.
+        Returns None to run normally or "degrade" for a heuristic-only result;
+        raises ValueError when CONTENT_FILTER_ACTION is reject.
+        """
+        if not settings.content_filter_enabled:
+            return None
+
+        reason = self.classify(content)
+        if reason is None:
+            CONTENT_FILTER.labels(verdict="extractable").inc()
+            return None
+
+        CONTENT_FILTER.labels(verdict=reason).inc()
+        action = settings.content_filter_action if settings.content_filter_action in FILTER_ACTIONS else "reject"
+        logger.info(f"Content not extractable ({reason}), action={action}")
+        if action == "reject":
+            raise ValueError(f"Content is not extractable: {reason.replace('_', ' ')}")
+        return action
+
+
+# Global content filter instance
+content_filter = ContentFilter()
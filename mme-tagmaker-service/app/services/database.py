@@ -7,16 +7,26 @@ Provides async-compatible methods for FastAPI environment with proper connection
 """
 
 import os
+import time
 import asyncio
 import threading
-from datetime import datetime
+import contextvars
+from contextlib import nullcontext
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any, Union
+import pymongo
 from pymongo import MongoClient
 from pymongo.collection import Collection
 from pymongo.database import Database
-from pymongo.errors import ServerSelectionTimeoutError, ConnectionFailure, AutoReconnect, OperationFailure
+from pymongo.errors import ServerSelectionTimeoutError, ConnectionFailure, AutoReconnect, OperationFailure, BulkWriteError
 from loguru import logger
 from app.config import settings
+from app.services import deadline
+
+# Recent flush ids kept on each token usage rollup document, so retried flushes are not counted twice
+TOKEN_USAGE_FLUSH_IDS = 50
+# Failures of best-effort operations (shared cache) are logged at most once per interval per operation
+BEST_EFFORT_LOG_INTERVAL_SECONDS = 60
 
 
 class DatabaseService:
@@ -52,6 +62,8 @@ class DatabaseService:
             self.client: Optional[MongoClient] = None
             self.database: Optional[Database] = None
             self.collection: Optional[Collection] = None
+            self.extraction_cache_collection: Optional[Collection] = None
+            self.token_usage_collection: Optional[Collection] = None
             
             # Connection state tracking
             self._connection_state = "disconnected"
@@ -59,6 +71,7 @@ class DatabaseService:
             self._reconnect_attempts = 0
             self._max_reconnect_attempts = 3
             self._connection_health_score = 0.0
+            self._best_effort_logged: Dict[str, float] = {}
             
             # Connection pooling settings
             self._connection_pool_settings = {
@@ -109,6 +122,13 @@ class DatabaseService:
             # Verify collection access
             self.collection.count_documents({}, limit=1)
             
+            # Shared extraction cache collection with TTL expiry
+            self.extraction_cache_collection = self.database[settings.shared_cache_collection]
+            self._ensure_extraction_cache_indexes()
+            
+            # Per-org/user token usage rollup
+            self.token_usage_collection = self.database[settings.token_usage_collection]
+            
             # Update connection state
             self._connection_state = "connected"
             self._last_error = None
@@ -150,6 +170,16 @@ class DatabaseService:
         self.client = None
         self.database = None
         self.collection = None
+        self.extraction_cache_collection = None
+        self.token_usage_collection = None
+    
+    def _ensure_extraction_cache_indexes(self):
+        """Create the TTL index that expires shared extraction cache entries."""
+        try:
+            self.extraction_cache_collection.create_index("expiresAt", expireAfterSeconds=0)
+        except Exception as e:
+            # Cache is an optimization; a missing index must not fail the connection
+            logger.warning(f"Could not ensure extraction cache TTL index: {str(e)}")
     
     def _reconnect(self) -> bool:
         """Attempt to reconnect with exponential backoff."""
@@ -201,10 +231,38 @@ class DatabaseService:
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, _check)
     
-    def _execute_operation(self, operation_func, operation_name: str, *args, **kwargs):
-        """Execute database operation with error handling and metrics tracking."""
-        if not self.is_connected():
-            logger.error(f"Cannot execute {operation_name}: database not connected")
+    def _log_failure(self, message: str, operation_name: str, best_effort: bool):
+        if not best_effort:
+            logger.error(message)
+            return
+        now = time.monotonic()
+        if now - self._best_effort_logged.get(operation_name, float("-inf")) >= BEST_EFFORT_LOG_INTERVAL_SECONDS:
+            self._best_effort_logged[operation_name] = now
+            logger.warning(f"{message} (best-effort; repeats suppressed for {BEST_EFFORT_LOG_INTERVAL_SECONDS}s)")
+    
+    def _execute_operation(self, operation_func, operation_name: str, *args, health_check: bool = True,
+                           best_effort: bool = False, **kwargs):
+        """Execute database operation with error handling and metrics tracking.
+        
+        Latency-sensitive callers can pass health_check=False to skip the
+        ping round-trip and rely on the tracked connection state instead.
+        Callers that work without the result (best_effort=True) get their
+        failures logged as rate-limited warnings instead of errors.
+        
+        Inside a request with a deadline, the operation is skipped once the
+        deadline has passed and otherwise runs under pymongo.timeout, which
+        sends the remaining time to the server as maxTimeMS.
+        """
+        if deadline.expired():
+            logger.warning(f"Skipping {operation_name}: request deadline passed")
+            deadline.DEADLINE_EXCEEDED.labels(stage="mongo").inc()
+            return None
+        
+        connected = self.is_connected() if health_check else (
+            self.client is not None and self._connection_state == "connected"
+        )
+        if not connected:
+            self._log_failure(f"Cannot execute {operation_name}: database not connected", operation_name, best_effort)
             self._error_count += 1
             return None
         
@@ -212,14 +270,17 @@ class DatabaseService:
             self._operation_count += 1
             self._last_operation_time = datetime.utcnow()
             
-            result = operation_func(*args, **kwargs)
+            remaining = deadline.remaining()
+            with pymongo.timeout(remaining) if remaining is not None else nullcontext():
+                result = operation_func(*args, **kwargs)
             
             # Update health score on successful operation
             self._connection_health_score = min(1.0, self._connection_health_score + 0.05)
             return result
             
         except (ServerSelectionTimeoutError, ConnectionFailure, AutoReconnect) as e:
-            logger.error(f"Database operation {operation_name} failed due to connection issue: {str(e)}")
+            self._log_failure(f"Database operation {operation_name} failed due to connection issue: {str(e)}",
+                              operation_name, best_effort)
             self._error_count += 1
             self._connection_health_score = max(0.0, self._connection_health_score - 0.2)
             
@@ -228,18 +289,22 @@ class DatabaseService:
             return None
             
         except Exception as e:
-            logger.error(f"Database operation {operation_name} failed: {str(e)}")
+            self._log_failure(f"Database operation {operation_name} failed: {str(e)}", operation_name, best_effort)
             self._error_count += 1
             self._connection_health_score = max(0.0, self._connection_health_score - 0.1)
             return None
     
-    async def _execute_operation_async(self, operation_func, operation_name: str, *args, **kwargs):
+    async def _execute_operation_async(self, operation_func, operation_name: str, *args, health_check: bool = True,
+                                       best_effort: bool = False, **kwargs):
         """Async wrapper for database operations."""
         def _execute():
-            return self._execute_operation(operation_func, operation_name, *args, **kwargs)
+            return self._execute_operation(operation_func, operation_name, *args, health_check=health_check,
+                                           best_effort=best_effort, **kwargs)
         
+        # Carry the request context (deadline) into the executor thread
+        context = contextvars.copy_context()
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _execute)
+        return await loop.run_in_executor(None, context.run, _execute)
     
     def get_tags_for_rebalancing(self, page: int = 0, limit: int = 100) -> List[Dict]:
         """
@@ -382,6 +447,96 @@ class DatabaseService:
         )
         return result if result is not None else {"error": "Database operation failed"}
     
+    def _find_cached_extraction(self, key: str, max_time_ms: int) -> Optional[Dict]:
+        return self.extraction_cache_collection.find_one(
+            {"_id": key, "expiresAt": {"$gt": datetime.utcnow()}},
+            max_time_ms=max_time_ms
+        )
+    
+    def _replace_cached_extraction(self, key: str, entry: Dict, ttl_seconds: int) -> bool:
+        now = datetime.utcnow()
+        self.extraction_cache_collection.replace_one(
+            {"_id": key},
+            {**entry, "_id": key, "createdAt": now, "expiresAt": now + timedelta(seconds=ttl_seconds)},
+            upsert=True
+        )
+        return True
+    
+    def get_cached_extraction(self, key: str, max_time_ms: int = 50) -> Optional[Dict]:
+        """
+        Fetch a shared extraction cache entry by content hash
+        Returns None on miss, expiry or any database error
+        """
+        return self._execute_operation(self._find_cached_extraction, "get_cached_extraction", key, max_time_ms,
+                                       health_check=False, best_effort=True)
+    
+    async def get_cached_extraction_async(self, key: str, max_time_ms: int = 50) -> Optional[Dict]:
+        """Async version of get_cached_extraction."""
+        return await self._execute_operation_async(self._find_cached_extraction, "get_cached_extraction", key, max_time_ms,
+                                                   health_check=False, best_effort=True)
+    
+    def save_cached_extraction(self, key: str, entry: Dict, ttl_seconds: int) -> bool:
+        """
+        Upsert a shared extraction cache entry keyed by content hash
+        The TTL index on expiresAt removes it after ttl_seconds
+        """
+        result = self._execute_operation(self._replace_cached_extraction, "save_cached_extraction", key, entry, ttl_seconds,
+                                         health_check=False, best_effort=True)
+        return result if result is not None else False
+    
+    async def save_cached_extraction_async(self, key: str, entry: Dict, ttl_seconds: int) -> bool:
+        """Async version of save_cached_extraction."""
+        result = await self._execute_operation_async(self._replace_cached_extraction, "save_cached_extraction",
+                                                     key, entry, ttl_seconds, health_check=False, best_effort=True)
+        return result if result is not None else False
+    
+    def increment_token_usage(self, rollups: List[Dict], flush_id: str) -> Optional[List[int]]:
+        """
+        Add token counts to the daily per-org/user rollup documents
+        Each rollup has day, orgId, userId, promptTokens, completionTokens and calls.
+        
+        Writes are idempotent per flush_id: a rollup document records the
+        flushes applied to it, so retrying a flush (e.g. after a timeout the
+        server had already applied) never counts it twice. Returns the indexes
+        of rollups that were not applied, or None if the write failed as a whole.
+        """
+        def _operation():
+            now = datetime.utcnow()
+            try:
+                self.token_usage_collection.bulk_write([
+                    pymongo.UpdateOne(
+                        {"_id": f"{r['day']}:{r['orgId']}:{r['userId']}", "flushIds": {"$ne": flush_id}},
+                        {
+                            "$inc": {
+                                "promptTokens": r["promptTokens"],
+                                "completionTokens": r["completionTokens"],
+                                "calls": r["calls"]
+                            },
+                            "$set": {"updatedAt": now},
+                            "$setOnInsert": {"day": r["day"], "orgId": r["orgId"], "userId": r["userId"]},
+                            "$push": {"flushIds": {"$each": [flush_id], "$slice": -TOKEN_USAGE_FLUSH_IDS}}
+                        },
+                        upsert=True
+                    )
+                    for r in rollups
+                ], ordered=False)
+            except BulkWriteError as e:
+                if e.details.get("writeConcernErrors"):
+                    # Applied or not is unknown; retrying the whole flush is safe
+                    return list(range(len(rollups)))
+                # A duplicate key means the document already carries this flush id: applied by an earlier attempt
+                return sorted({err["index"] for err in e.details.get("writeErrors", []) if err.get("code") != 11000})
+            return []
+        
+        return self._execute_operation(_operation, "increment_token_usage", health_check=False)
+    
+    def get_domain_lexicon(self) -> Optional[List[Dict]]:
+        """Domain lexicon entries, one document per domain category"""
+        def _operation():
+            return list(self.database[settings.domain_lexicon_collection].find({}, {"_id": 0}))
+        
+        return self._execute_operation(_operation, "get_domain_lexicon", health_check=False)
+    
     def get_connection_status(self) -> Dict[str, Any]:
         """Get detailed connection status and metrics."""
         return {
@@ -423,6 +578,8 @@ class DatabaseService:
         self.client = None
         self.database = None
         self.collection = None
+        self.extraction_cache_collection = None
+        self.token_usage_collection = None
         
         # Reset state
         self._connection_state = "disconnected"
@@ -0,0 +1,137 @@
+"""
+Request Deadline Propagation
+
+A per-request deadline taken from the `X-Request-Deadline` or `grpc-timeout`
+header, carried in a contextvar so it reaches every stage the request fans out
+to. Stages derive their timeouts from the time remaining (LLM calls, the
+tagging-service post, MongoDB maxTimeMS) and drop work whose deadline has
+already passed instead of finishing it for nobody. A call shared by coalesced
+requests runs under the latest of their deadlines.
+"""
+
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+from prometheus_client import Counter
+
+# Prometheus metrics
+DEADLINE_EXCEEDED = Counter(
+    'mme_deadline_exceeded_total',
+    'Work dropped because the request deadline had passed',
+    ['stage']
+)
+
+_GRPC_TIMEOUT = re.compile(r'^(\d{1,8})([HMSmun])$')
+_GRPC_UNITS = {"H": 3600.0, "M": 60.0, "S": 1.0, "m": 1e-3, "u": 1e-6, "n": 1e-9}
+
+# Absolute deadline of the current request on the monotonic clock
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a stage is reached after the request deadline"""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        super().__init__(f"Request deadline exceeded before {stage}")
+
+
+def parse_grpc_timeout(value: str) -> float:
+    """Seconds from a grpc-timeout value such as "500m" or "2S" """
+    match = _GRPC_TIMEOUT.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid grpc-timeout '{value}'")
+    return int(match.group(1)) * _GRPC_UNITS[match.group(2)]
+
+
+def parse_request_deadline(value: str) -> float:
+    """
+    Seconds remaining until an X-Request-Deadline value: a Unix timestamp in
+    seconds or milliseconds, or an ISO-8601 datetime with timezone
+    """
+    value = value.strip()
+    try:
+        timestamp = float(value)
+        if timestamp > 1e11:
+            timestamp /= 1000.0
+    except ValueError:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"Invalid X-Request-Deadline '{value}'")
+        if parsed.tzinfo is None:
+            raise ValueError("X-Request-Deadline must include a timezone")
+        timestamp = parsed.timestamp()
+    return timestamp - time.time()
+
+
+def budget_from_headers(request_deadline: Optional[str], grpc_timeout: Optional[str],
+                        default: Optional[float] = None) -> Optional[float]:
+    """Seconds the caller is willing to wait; the stricter header wins. None means no deadline."""
+    budgets = []
+    if request_deadline:
+        budgets.append(parse_request_deadline(request_deadline))
+    if grpc_timeout:
+        budgets.append(parse_grpc_timeout(grpc_timeout))
+    if budgets:
+        return min(budgets)
+    return default if default else None
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]):
+    """Apply a deadline `seconds` from now to the block; nested deadlines can only tighten it"""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def absolute() -> Optional[float]:
+    """The current deadline on the monotonic clock, or None without one"""
+    return _deadline.get()
+
+
+def set_absolute(at: Optional[float]):
+    """
+    Replace the deadline of the current context. Used through Context.run to
+    extend the deadline of a call shared by several requests (see SingleFlight).
+    """
+    _deadline.set(at)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def timeout(default: float) -> float:
+    """A stage timeout: the stage default, capped by the time remaining"""
+    left = remaining()
+    if left is None:
+        return default
+    return max(0.0, min(default, left))
+
+
+def check(stage: str):
+    """Raise DeadlineExceeded if the deadline has passed before `stage` starts"""
+    if expired():
+        DEADLINE_EXCEEDED.labels(stage=stage).inc()
+        raise DeadlineExceeded(stage)
@@ -1,8 +1,42 @@
 """
 Domain Lexicon for Finance and Compliance
 Provides controlled vocabulary and type mapping for semantic understanding
+
+The lexicon is compiled into a lookup index: every category name, synonym and
+subtype synonym is lowercased once and placed in a keyword automaton, so a
+label lookup is one pass over the label instead of a walk over the whole
+vocabulary. Lookups keep the original semantics: a term matches as a
+substring of the lowercased label, and the first term in lexicon order wins
+(category, then its synonyms, then its subtypes). The lexicon is built in
+(DOMAIN_LEXICON) or loaded from a JSON file or MongoDB collection, and reloads
+swap in a newly compiled index atomically.
 """
 
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+from prometheus_client import Counter, Gauge
+from loguru import logger
+from app.config import settings
+from app.utils.keyword_scanner import KeywordAutomaton
+
+LEXICON_SOURCES = ("builtin", "file", "mongo")
+DEFAULT_DOMAIN_TYPE = "general.concept"
+
+# Prometheus metrics
+LEXICON_TERMS = Gauge(
+    'mme_domain_lexicon_terms',
+    'Terms (category names and synonyms) in the loaded domain lexicon'
+)
+
+LEXICON_RELOADS = Counter(
+    'mme_domain_lexicon_reloads_total',
+    'Domain lexicon reloads by outcome',
+    ['result']
+)
+
 DOMAIN_LEXICON = {
     "finance": {
         "budget": {
@@ -54,44 +88,141 @@ DOMAIN_LEXICON = {
     }
 }
 
+
+class CompiledLexicon:
+    """Immutable lookup index for one version of the lexicon."""
+
+    __slots__ = ("version", "source", "loaded_at", "categories", "terms", "_automaton", "_types", "_synonyms")
+
+    def __init__(self, lexicon: Dict, source: str = "builtin"):
+        self.source = source
+        self.loaded_at = time.time()
+        self.version = hashlib.sha256(json.dumps(lexicon, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        # Lowercased term -> (lexicon-order rank, result); the first occurrence of a term wins
+        self._types: Dict[str, Tuple[int, str]] = {}
+        self._synonyms: Dict[str, Tuple[int, List[str]]] = {}
+        self.categories = 0
+
+        rank = 0
+        for domain, categories in lexicon.items():
+            for category, info in categories.items():
+                self.categories += 1
+                domain_type = info.get("type", f"{domain}.{category}")
+                synonyms = list(info.get("synonyms", []))
+                for term in [category] + synonyms:
+                    self._add(term, rank, domain_type, synonyms)
+                    rank += 1
+                for subtype, subtype_synonyms in info.get("subtypes", {}).items():
+                    for term in subtype_synonyms:
+                        self._add(term, rank, f"{domain_type}.{subtype}")
+                        rank += 1
+
+        self.terms = len(self._types)
+        self._automaton = KeywordAutomaton(self._types)
+
+    def _add(self, term: str, rank: int, domain_type: str, synonyms: Optional[List[str]] = None):
+        term = term.lower()
+        if not term:
+            return
+        self._types.setdefault(term, (rank, domain_type))
+        # Subtype synonyms give a type but never a synonym list
+        if synonyms is not None:
+            self._synonyms.setdefault(term, (rank, synonyms))
+
+    def domain_type(self, label: str) -> str:
+        hits = self._automaton.scan(label.lower())
+        if not hits:
+            return DEFAULT_DOMAIN_TYPE
+        return min(self._types[term] for term in hits)[1]
+
+    def synonyms(self, label: str) -> list:
+        matches = [self._synonyms[term] for term in self._automaton.scan(label.lower()) if term in self._synonyms]
+        if not matches:
+            return []
+        return list(min(matches, key=lambda match: match[0])[1])
+
+    def info(self) -> Dict:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "categories": self.categories,
+            "terms": self.terms,
+            "loaded_at": self.loaded_at
+        }
+
+
+def _lexicon_from_documents(documents: List[Dict]) -> Dict:
+    """Nested lexicon from one Mongo document per category ({domain, category, type, synonyms, subtypes, order})"""
+    lexicon: Dict = {}
+    for doc in sorted(documents, key=lambda d: d.get("order", 0)):
+        info = {key: doc[key] for key in ("type", "synonyms", "subtypes") if key in doc}
+        lexicon.setdefault(doc["domain"], {})[doc["category"]] = info
+    return lexicon
+
+
+class DomainLexicon:
+    """Holds the compiled lexicon in use and reloads it from the configured source."""
+
+    def __init__(self, lexicon: Dict = DOMAIN_LEXICON):
+        self._index = CompiledLexicon(lexicon)
+        self._reload_lock = threading.Lock()
+        LEXICON_TERMS.set(self._index.terms)
+
+    @property
+    def index(self) -> CompiledLexicon:
+        return self._index
+
+    def _read(self, source: str) -> Dict:
+        if source == "file":
+            with open(settings.domain_lexicon_path, encoding="utf-8") as f:
+                return json.load(f)
+        if source == "mongo":
+            from app.services.database import db_service
+            documents = db_service.get_domain_lexicon()
+            if not documents:
+                raise ValueError(f"No domain lexicon entries in '{settings.domain_lexicon_collection}'")
+            return _lexicon_from_documents(documents)
+        return DOMAIN_LEXICON
+
+    def reload(self, source: Optional[str] = None) -> Dict:
+        """
+        Load and compile the lexicon from source (default DOMAIN_LEXICON_SOURCE) and swap it in.
+        A failed load keeps the current index. Returns the info of the index in use.
+        """
+        source = source or settings.domain_lexicon_source
+        if source not in LEXICON_SOURCES:
+            raise ValueError(f"Unknown lexicon source '{source}' (expected one of {', '.join(LEXICON_SOURCES)})")
+
+        with self._reload_lock:
+            try:
+                compiled = CompiledLexicon(self._read(source), source)
+            except Exception as e:
+                LEXICON_RELOADS.labels(result="failed").inc()
+                logger.error(f"Domain lexicon reload from {source} failed, keeping {self._index.version}: {e}")
+                return self._index.info()
+
+            if compiled.version == self._index.version and compiled.source == self._index.source:
+                LEXICON_RELOADS.labels(result="unchanged").inc()
+                return self._index.info()
+
+            # Readers hold on to the index they started with; the swap is a single reference assignment
+            self._index = compiled
+            LEXICON_TERMS.set(compiled.terms)
+            LEXICON_RELOADS.labels(result="updated").inc()
+            logger.info(f"Domain lexicon {compiled.version} loaded from {source}: {compiled.terms} terms")
+            return compiled.info()
+
+    def info(self) -> Dict:
+        return self._index.info()
+
+
+# Global domain lexicon instance
+domain_lexicon = DomainLexicon()
+
 def get_domain_type(label: str) -> str:
     """Determine domain type from label using lexicon"""
-    label_lower = label.lower()
-    
-    # Check each domain and category
-    for domain, categories in DOMAIN_LEXICON.items():
-        for category, info in categories.items():
-            # Check main category
-            if category in label_lower:
-                return info.get("type", f"{domain}.{category}")
-            
-            # Check synonyms
-            synonyms = info.get("synonyms", [])
-            for synonym in synonyms:
-                if synonym.lower() in label_lower:
-                    return info.get("type", f"{domain}.{category}")
-            
-            # Check subtypes
-            subtypes = info.get("subtypes", {})
-            for subtype, subtype_synonyms in subtypes.items():
-                for subtype_synonym in subtype_synonyms:
-                    if subtype_synonym.lower() in label_lower:
-                        return f"{info.get('type', f'{domain}.{category}')}.{subtype}"
-    
-    return "general.concept"
+    return domain_lexicon.index.domain_type(label)
 
 def get_synonyms(label: str) -> list:
     """Get synonyms for a given label"""
-    label_lower = label.lower()
-    
-    for domain, categories in DOMAIN_LEXICON.items():
-        for category, info in categories.items():
-            if category in label_lower:
-                return info.get("synonyms", [])
-            
-            synonyms = info.get("synonyms", [])
-            for synonym in synonyms:
-                if synonym.lower() in label_lower:
-                    return info.get("synonyms", [])
-    
-    return []
+    return domain_lexicon.index.synonyms(label)
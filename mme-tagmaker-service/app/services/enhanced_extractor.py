@@ -8,14 +8,16 @@ import re
 import json
 import asyncio
 from typing import List, Tuple, Optional
-from openai import OpenAI
 from datetime import datetime
 from app.utils.hashing import sha256_hash
 from loguru import logger
-
-# Initialize OpenAI client
 from app.config import settings
-client = OpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
+
+from app.services.llm_client import get_llm_client, create_chat_completion
+from app.services.model_router import current_route
+from app.services import deadline
+from app.services.stage_timing import timed_stage
+from app.utils.keyword_scanner import content_keywords
 
 # Enhanced stopwords for better filtering
 ENHANCED_STOPWORDS = {
@@ -27,13 +29,19 @@ ENHANCED_STOPWORDS = {
 }
 
 # Context-aware filtering for security content
-SECURITY_CONTEXT_MARKERS = {
+SECURITY_CONTEXT_MARKERS = content_keywords.register({
     "training", "educational", "documentation", "learning", "tutorial", "example",
     "testing", "demonstration", "simulation", "practice", "workshop", "course"
-}
+})
+
+EDUCATIONAL_PHRASES = content_keywords.register([
+    "how to prevent", "security best practices", "learning about",
+    "training material", "for educational purposes", "documentation shows",
+    "example demonstrates", "tutorial explains", "course covers"
+])
 
 class EnhancedContentProcessor:
-    def __init__(self, max_chunk_size: int = 8000, processing_timeout: int = 30):
+    def __init__(self, max_chunk_size: int = 8000, processing_timeout: float = settings.enhanced_processing_timeout_seconds):
         self.max_chunk_size = max_chunk_size
         self.processing_timeout = processing_timeout
         
@@ -82,24 +90,10 @@ class EnhancedContentProcessor:
     
     def detect_security_context(self, content: str) -> bool:
         """Detect if content is security-related but educational/legitimate"""
-        content_lower = content.lower()
+        hits = content_keywords.scan(content)
         
-        # Check for educational context markers
-        context_score = 0
-        for marker in SECURITY_CONTEXT_MARKERS:
-            if marker in content_lower:
-                context_score += 1
-        
-        # Check for educational phrases
-        educational_phrases = [
-            "how to prevent", "security best practices", "learning about",
-            "training material", "for educational purposes", "documentation shows",
-            "example demonstrates", "tutorial explains", "course covers"
-        ]
-        
-        for phrase in educational_phrases:
-            if phrase in content_lower:
-                context_score += 2
+        # Educational context markers count once, educational phrases twice
+        context_score = len(SECURITY_CONTEXT_MARKERS & hits) + 2 * len(EDUCATIONAL_PHRASES & hits)
         
         return context_score >= 2
     
@@ -215,14 +209,16 @@ class EnhancedContentProcessor:
     
     async def process_with_timeout(self, content: str, max_cues: int = 20) -> Tuple[List[str], List[str], float, str]:
         """Process content with timeout protection"""
+        deadline.check("enhanced_extraction")
+        processing_timeout = deadline.timeout(self.processing_timeout)
         try:
-            # Use asyncio timeout for processing
+            # Use asyncio timeout for processing, capped by the request deadline
             return await asyncio.wait_for(
                 self._process_content_async(content, max_cues),
-                timeout=self.processing_timeout
+                timeout=processing_timeout
             )
         except asyncio.TimeoutError:
-            logger.warning(f"Content processing timed out after {self.processing_timeout}s")
+            logger.warning(f"Content processing timed out after {processing_timeout:.1f}s")
             # Return fallback result
             fallback_cue = f"processing_timeout:{content[:100]}"
             return [fallback_cue], [sha256_hash(fallback_cue)], 0.5, "processing_timeout"
@@ -242,25 +238,33 @@ class EnhancedContentProcessor:
         all_cues = []
         total_confidence = 0.0
         
-        for chunk in chunks:
-            chunk_cues, chunk_confidence = await self._extract_from_chunk(chunk, max_cues // len(chunks))
+        # Extract chunks concurrently; results keep chunk order
+        semaphore = asyncio.Semaphore(max(1, settings.map_reduce_concurrency))
+        target_cues = max(1, max_cues // len(chunks))
+        
+        async def _extract(chunk: str):
+            async with semaphore:
+                return await self._extract_from_chunk(chunk, target_cues)
+        
+        for chunk_cues, chunk_confidence in await asyncio.gather(*[_extract(chunk) for chunk in chunks]):
             all_cues.extend(chunk_cues)
             total_confidence += chunk_confidence
         
         # Average confidence across chunks
         avg_confidence = total_confidence / len(chunks) if chunks else 0.0
         
-        # Filter and enhance cues
-        filtered_cues = self.enhanced_cue_filtering(all_cues, content)
-        
-        # Limit to max_cues
-        final_cues = filtered_cues[:max_cues]
-        
-        # Generate hashes
-        cue_hashes = [sha256_hash(cue) for cue in final_cues]
-        
-        # Select primary tag with context awareness
-        primary_tag = self.select_enhanced_primary_tag(final_cues, content)
+        with timed_stage("postprocess", "enhanced"):
+            # Filter and enhance cues
+            filtered_cues = self.enhanced_cue_filtering(all_cues, content)
+            
+            # Limit to max_cues
+            final_cues = filtered_cues[:max_cues]
+            
+            # Generate hashes
+            cue_hashes = [sha256_hash(cue) for cue in final_cues]
+            
+            # Select primary tag with context awareness
+            primary_tag = self.select_enhanced_primary_tag(final_cues, content)
         
         # Add security context flag if detected
         if security_context:
@@ -270,7 +274,8 @@ class EnhancedContentProcessor:
     
     async def _extract_from_chunk(self, chunk: str, target_cues: int) -> Tuple[List[str], float]:
         """Extract cues from a single chunk"""
-        if not client:
+        route = current_route()
+        if route.base_url is None and get_llm_client() is None:
             # Fail fast when API client is not configured
             raise ValueError("OpenAI API client not configured. Please set OPENAI_API_KEY environment variable.")
         
@@ -289,20 +294,23 @@ Guidelines:
 
 Text: {chunk[:4000]}"""  # Limit chunk size for API
 
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert at extracting key information from business and technical content."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                timeout=15
-            )
+            with timed_stage("llm_wait", "enhanced"):
+                response = await create_chat_completion(
+                    model=route.model,
+                    base_url=route.base_url,
+                    messages=[
+                        {"role": "system", "content": "You are an expert at extracting key information from business and technical content."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.1,
+                    timeout=settings.enhanced_chunk_timeout_seconds
+                )
             
             content = response.choices[0].message.content.strip()
             
             try:
-                result = json.loads(content)
+                with timed_stage("parse", "enhanced"):
+                    result = json.loads(content)
                 cues = result.get("cues", [])
                 confidence = result.get("confidence", 0.8)
                 return cues, confidence
@@ -0,0 +1,230 @@
+"""
+Extraction Result Cache
+
+Two-tier cache for extract_cues results, keyed by the SHA256 of the normalized
+content plus max_cues and the prompt version (see app.utils.hashing):
+
+- memory: in-process LRU + TTL cache
+- shared: MongoDB collection with a TTL index, shared by all replicas
+  (read-through on memory miss, write-behind after extraction)
+"""
+
+import time
+import asyncio
+import threading
+import contextvars
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from prometheus_client import Counter, Gauge, Histogram
+from loguru import logger
+from app.config import settings
+from app.models.tag import Tag
+from app.services import deadline
+
+# Prometheus metrics
+EXTRACTION_CACHE_HITS = Counter(
+    'mme_extraction_cache_hits_total',
+    'Total number of extraction cache hits',
+    ['tier']
+)
+
+EXTRACTION_CACHE_MISSES = Counter(
+    'mme_extraction_cache_misses_total',
+    'Total number of extraction cache misses',
+    ['tier']
+)
+
+EXTRACTION_CACHE_EVICTIONS = Counter(
+    'mme_extraction_cache_evictions_total',
+    'Total number of extraction cache evictions',
+    ['reason']
+)
+
+EXTRACTION_CACHE_ENTRIES = Gauge(
+    'mme_extraction_cache_entries',
+    'Current number of entries in the in-process extraction cache'
+)
+
+SHARED_CACHE_READ_DURATION = Histogram(
+    'mme_extraction_cache_shared_read_seconds',
+    'Duration of shared extraction cache reads',
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+
+ExtractionResult = Tuple[List[Tag], float, str]
+
+
+def _copy_result(result: ExtractionResult) -> ExtractionResult:
+    """Copy cached tags so callers can't mutate the cached entry."""
+    tags, confidence, primary_tag = result
+    return [tag.model_copy(deep=True) for tag in tags], confidence, primary_tag
+
+
+class ExtractionCache:
+    """Thread-safe LRU cache with per-entry TTL for extraction results."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, ExtractionResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[ExtractionResult]:
+        """Return a copy of the cached result, or None on miss or expiry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                EXTRACTION_CACHE_MISSES.labels(tier="memory").inc()
+                return None
+
+            expires_at, result = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                EXTRACTION_CACHE_EVICTIONS.labels(reason="expired").inc()
+                EXTRACTION_CACHE_MISSES.labels(tier="memory").inc()
+                EXTRACTION_CACHE_ENTRIES.set(len(self._entries))
+                return None
+
+            self._entries.move_to_end(key)
+            EXTRACTION_CACHE_HITS.labels(tier="memory").inc()
+
+        return _copy_result(result)
+
+    def set(self, key: str, result: ExtractionResult):
+        """Store a result, evicting least recently used entries past max_entries."""
+        if self.max_entries <= 0:
+            return
+
+        entry = (time.monotonic() + self.ttl_seconds, _copy_result(result))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                EXTRACTION_CACHE_EVICTIONS.labels(reason="size").inc()
+
+            EXTRACTION_CACHE_ENTRIES.set(len(self._entries))
+
+    def clear(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+            EXTRACTION_CACHE_ENTRIES.set(0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Get cache configuration and current size."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+
+class SharedExtractionCache:
+    """MongoDB-backed extraction cache tier reached through DatabaseService.
+    
+    Reads run in the executor with a hard time budget and count as a miss when
+    exceeded; writes are scheduled as background tasks off the request path.
+    """
+
+    def __init__(self, ttl_seconds: int = 86400, read_timeout_ms: int = 50):
+        self.ttl_seconds = ttl_seconds
+        self.read_timeout_ms = read_timeout_ms
+        self._pending_writes = set()
+
+    @staticmethod
+    def _db():
+        from app.services.database import db_service
+        return db_service
+
+    async def get(self, key: str) -> Optional[ExtractionResult]:
+        """Read-through lookup; any error or timeout is treated as a miss."""
+        read_timeout = deadline.timeout(self.read_timeout_ms / 1000.0)
+        if read_timeout <= 0:
+            EXTRACTION_CACHE_MISSES.labels(tier="shared").inc()
+            return None
+
+        start = time.perf_counter()
+        try:
+            doc = await asyncio.wait_for(
+                self._db().get_cached_extraction_async(key, max(1, int(read_timeout * 1000))),
+                timeout=read_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.debug(f"Shared extraction cache read timed out for {key[:12]}")
+            doc = None
+        except Exception as e:
+            logger.warning(f"Shared extraction cache read failed: {str(e)}")
+            doc = None
+        finally:
+            SHARED_CACHE_READ_DURATION.observe(time.perf_counter() - start)
+
+        if not doc:
+            EXTRACTION_CACHE_MISSES.labels(tier="shared").inc()
+            return None
+
+        try:
+            tags = [Tag(**tag) for tag in doc.get("tags", [])]
+            result = (tags, doc.get("confidence", 0.0), doc.get("primaryTag", ""))
+        except Exception as e:
+            logger.warning(f"Discarding malformed shared cache entry {key[:12]}: {str(e)}")
+            EXTRACTION_CACHE_MISSES.labels(tier="shared").inc()
+            return None
+
+        EXTRACTION_CACHE_HITS.labels(tier="shared").inc()
+        return result
+
+    def set_behind(self, key: str, result: ExtractionResult, prompt_version: str = ""):
+        """Write-behind: persist the result without awaiting the database."""
+        tags, confidence, primary_tag = result
+        entry = {
+            "tags": [tag.model_dump(mode="json") for tag in tags],
+            "confidence": confidence,
+            "primaryTag": primary_tag,
+            "promptVersion": prompt_version
+        }
+
+        # Not tied to the request deadline: the result is worth keeping after the caller leaves
+        task = asyncio.get_running_loop().create_task(
+            self._db().save_cached_extraction_async(key, entry, self.ttl_seconds),
+            context=contextvars.Context()
+        )
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+
+# Global cache instances
+extraction_cache = ExtractionCache(
+    max_entries=settings.extraction_cache_max_entries,
+    ttl_seconds=settings.extraction_cache_ttl_seconds
+)
+
+shared_extraction_cache = SharedExtractionCache(
+    ttl_seconds=settings.shared_cache_ttl_seconds,
+    read_timeout_ms=settings.shared_cache_read_timeout_ms
+)
+
+
+async def get_cached_extraction(key: str) -> Optional[ExtractionResult]:
+    """Look up a result in the memory tier, then the shared tier."""
+    result = extraction_cache.get(key)
+    if result is not None or not settings.shared_cache_enabled:
+        return result
+
+    result = await shared_extraction_cache.get(key)
+    if result is not None:
+        # Promote to the memory tier for subsequent requests on this replica
+        extraction_cache.set(key, result)
+    return result
+
+
+def store_extraction(key: str, result: ExtractionResult, prompt_version: str = ""):
+    """Store a fresh result in the memory tier and write it behind to the shared tier."""
+    extraction_cache.set(key, result)
+    if settings.shared_cache_enabled:
+        shared_extraction_cache.set_behind(key, result, prompt_version)
@@ -0,0 +1,234 @@
+"""
+Extraction Engine
+
+Entry point used by the routes. Dispatches a request to an extraction engine
+according to the selected mode:
+
+- llm: always call the LLM (llm_tagger.extract_cues)
+- heuristic: local sentence-splitting + heuristics only, no API call
+- tiered: run the heuristic first and escalate to the LLM only when its
+  confidence is below the threshold or the content is too complex
+
+LLM extraction of documents longer than the single-call limit goes through
+map-reduce instead of being truncated. Each LLM extraction runs on the model
+route (model, endpoint, cue budget) chosen by app.services.model_router, on
+content pre-compressed by app.services.precompression.
+
+While the LLM circuit breaker is open, LLM-backed extractions are answered
+from the heuristics instead.
+
+Requests with a sessionId are extracted incrementally: only the part of the
+transcript the session has not seen goes to the engines (see
+app.services.session_extraction).
+
+The LLM-backed engine is selectable (EXTRACTION_ENGINE): llm_tagger or
+enhanced. In shadow mode a sampled share of requests is also run through the
+other engine in the background for comparison (see app.services.shadow).
+"""
+
+import time
+from datetime import datetime
+from typing import Optional
+from prometheus_client import Counter
+from loguru import logger
+from app.config import settings
+from app.models.extraction import ExtractionOutcome
+from app.services.llm_tagger import extract_cues, stream_cues, MAX_CONTENT_CHARS
+from app.services.map_reduce import extract_map_reduce
+from app.services.llm_tagger import sentence_to_tag, select_primary_tag, tag_cues
+from app.services.llm_client import get_llm_client, track_usage, llm_breaker
+from app.services.enhanced_extractor import extract_cues_enhanced
+from app.services.shadow import shadow_comparator
+from app.services.model_router import model_router, use_route
+from app.services.precompression import precompress
+from app.services.session_extraction import session_store
+from app.services.stage_timing import timed_stage
+from app.services.heuristic_extractor import (
+    extract_cues_heuristic, split_sentences, content_complexity
+)
+
+EXTRACTION_MODES = ("llm", "heuristic", "tiered")
+
+# Fallback cue prefixes enhanced_extractor emits instead of raising
+ENHANCED_FAILURE_PREFIXES = ("processing_timeout:", "processing_error:", "extraction_error:", "extraction_fallback:")
+
+# Prometheus metrics
+EXTRACTIONS_TOTAL = Counter(
+    'mme_extractions_total',
+    'Total number of extractions by mode and engine that produced the result',
+    ['mode', 'engine']
+)
+
+BREAKER_FALLBACKS = Counter(
+    'mme_llm_breaker_fallbacks_total',
+    'Total number of LLM extractions answered by the heuristics because the circuit was open'
+)
+
+ESCALATIONS_TOTAL = Counter(
+    'mme_extraction_escalations_total',
+    'Total number of tiered extractions escalated from the heuristic to the LLM',
+    ['reason']
+)
+
+
+def resolve_mode(mode: Optional[str]) -> str:
+    """Request mode if given, otherwise the configured default"""
+    mode = mode or settings.extraction_mode
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Unknown extraction mode '{mode}' (expected one of {', '.join(EXTRACTION_MODES)})")
+    return mode
+
+
+async def extract(content: str,
+                  max_cues: int = 20,
+                  use_cache: bool = True,
+                  mode: Optional[str] = None,
+                  session_id: Optional[str] = None) -> ExtractionOutcome:
+    """
+    Extract structured tags from content using the selected mode.
+    With a session_id, only the part of content the session has not seen is extracted.
+    """
+    mode = resolve_mode(mode)
+
+    if session_id and settings.session_incremental_enabled:
+        outcome = await session_store.extract(
+            session_id, content, max_cues, mode,
+            lambda text: _extract_mode(text, max_cues, use_cache, mode)
+        )
+    else:
+        outcome = await _extract_mode(content, max_cues, use_cache, mode)
+
+    EXTRACTIONS_TOTAL.labels(mode=mode, engine=outcome.engine).inc()
+    return outcome
+
+
+async def _extract_mode(content: str, max_cues: int, use_cache: bool, mode: str) -> ExtractionOutcome:
+    if mode == "llm":
+        return await _extract_llm(content, max_cues, use_cache)
+    if mode == "heuristic":
+        return _extract_heuristic(content, max_cues)
+    return await _extract_tiered(content, max_cues, use_cache)
+
+
+async def run_llm_tagger(content: str, max_cues: int, use_cache: bool = True):
+    """llm_tagger engine, with map-reduce for long documents"""
+    if settings.map_reduce_enabled and len(content.strip()) > MAX_CONTENT_CHARS:
+        return await extract_map_reduce(content, max_cues, use_cache=use_cache)
+    return await extract_cues(content, max_cues, use_cache=use_cache)
+
+
+async def run_enhanced(content: str, max_cues: int, use_cache: bool = True):
+    """enhanced_extractor engine, adapted to structured tags"""
+    cues, _, confidence, primary_tag = await extract_cues_enhanced(content, max_cues)
+    if cues and all(cue.startswith(ENHANCED_FAILURE_PREFIXES) for cue in cues):
+        raise ValueError(f"Enhanced extraction failed: {cues[0].split(':', 1)[0]}")
+    
+    with timed_stage("postprocess", "enhanced"):
+        now = datetime.now()
+        tags = [tag for tag in (sentence_to_tag(cue, content, confidence, now) for cue in cues) if tag]
+        return tags, confidence, primary_tag or select_primary_tag(tag_cues(tags), content)
+
+
+# Selectable LLM-backed engines; outcome engine label per engine
+ENGINES = {
+    "llm_tagger": (run_llm_tagger, "llm"),
+    "enhanced": (run_enhanced, "enhanced"),
+}
+
+
+def _shadow_engine(primary: str) -> Optional[str]:
+    if settings.shadow_engine and settings.shadow_engine != primary:
+        return settings.shadow_engine
+    return next((name for name in ENGINES if name != primary), None)
+
+
+async def _extract_llm(content: str, max_cues: int, use_cache: bool) -> ExtractionOutcome:
+    engine_name = settings.extraction_engine
+    if engine_name not in ENGINES:
+        raise ValueError(f"Unknown extraction engine '{engine_name}' (expected one of {', '.join(ENGINES)})")
+    runner, label = ENGINES[engine_name]
+    
+    if llm_breaker.rejecting():
+        return _breaker_fallback(content, max_cues)
+    
+    with timed_stage("precompress", label):
+        content = precompress(content)
+    route = model_router.select(content)
+    max_cues = min(max_cues, route.max_cues)
+    start = time.perf_counter()
+    try:
+        with track_usage() as usage, use_route(route):
+            tags, confidence, primary_tag = await runner(content, max_cues, use_cache)
+    except Exception:
+        # Engines wrap or swallow CircuitOpenError; the breaker state tells
+        if llm_breaker.rejecting():
+            return _breaker_fallback(content, max_cues)
+        raise
+    
+    # Cache hits use no tokens and say nothing about engine cost; only compare real runs
+    if usage.calls:
+        elapsed = time.perf_counter() - start
+        model_router.observe(route, elapsed, usage)
+        shadow_comparator.record_engine(engine_name, "primary", elapsed, usage)
+        shadow_name = _shadow_engine(engine_name)
+        if shadow_name and shadow_comparator.should_sample():
+            shadow_runner = ENGINES[shadow_name][0]
+            shadow_comparator.schedule(
+                engine_name, shadow_name,
+                lambda c, n: shadow_runner(c, n, False),
+                content, max_cues, [tag.label for tag in tags], primary_tag
+            )
+    
+    return ExtractionOutcome(tags=tags, confidence=confidence, primary_tag=primary_tag, engine=label)
+
+
+async def stream_llm(content: str, max_cues: int = 20, use_cache: bool = True):
+    """llm_tagger streaming extraction on the routed model; yields stream_cues events"""
+    with timed_stage("precompress", "llm"):
+        content = precompress(content)
+    route = model_router.select(content)
+    start = time.perf_counter()
+    with track_usage() as usage, use_route(route):
+        async for event, payload in stream_cues(content, min(max_cues, route.max_cues), use_cache):
+            yield event, payload
+    if usage.calls:
+        model_router.observe(route, time.perf_counter() - start, usage)
+
+
+def _breaker_fallback(content: str, max_cues: int) -> ExtractionOutcome:
+    BREAKER_FALLBACKS.inc()
+    logger.warning("LLM circuit open, answering from heuristics")
+    return _extract_heuristic(content, max_cues)
+
+
+def _extract_heuristic(content: str, max_cues: int) -> ExtractionOutcome:
+    with timed_stage("heuristic", "heuristic"):
+        tags, confidence, primary_tag = extract_cues_heuristic(content, max_cues)
+    return ExtractionOutcome(tags=tags, confidence=confidence, primary_tag=primary_tag, engine="heuristic")
+
+
+def escalation_reason(content: str, outcome: ExtractionOutcome) -> Optional[str]:
+    """Why a heuristic result should go to the LLM, or None if it is good enough"""
+    if not outcome.tags:
+        return "no_tags"
+    if outcome.confidence < settings.heuristic_confidence_threshold:
+        return "low_confidence"
+    if content_complexity(content, split_sentences(content)) > settings.heuristic_max_complexity:
+        return "complexity"
+    return None
+
+
+async def _extract_tiered(content: str, max_cues: int, use_cache: bool) -> ExtractionOutcome:
+    heuristic = _extract_heuristic(content, max_cues)
+    reason = escalation_reason(content, heuristic)
+    if reason is None:
+        return heuristic
+
+    if model_router.select(content).base_url is None and get_llm_client() is None:
+        logger.warning(f"Tiered extraction wanted LLM escalation ({reason}) but no API key is configured")
+        return heuristic
+
+    ESCALATIONS_TOTAL.labels(reason=reason).inc()
+    outcome = await _extract_llm(content, max_cues, use_cache)
+    outcome.escalated = True
+    return outcome
@@ -0,0 +1,106 @@
+"""
+Hedged Requests for LLM tail latency
+
+When a completion has not returned by the current latency percentile (p90 by
+default), an identical second request is fired and whichever answers first
+wins; the other is cancelled. A token-bucket budget caps hedges to a small
+share of traffic so hedging cannot amplify load during a provider slowdown.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+from prometheus_client import Counter
+
+T = TypeVar("T")
+
+# Prometheus metrics
+HEDGES = Counter(
+    'mme_llm_hedges_total',
+    'Hedged LLM requests by outcome',
+    ['outcome']
+)
+
+
+class LatencyWindow:
+    """Rolling window of call latencies for percentile estimates."""
+
+    def __init__(self, size: int = 500, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float):
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency at the given percentile, or None until min_samples are seen"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(pct / 100 * len(ordered)))
+        return ordered[index]
+
+
+class HedgeBudget:
+    """Token bucket: every call earns `ratio` tokens, every hedge spends one."""
+
+    def __init__(self, ratio: float = 0.05, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+async def hedged(call: Callable[[], Awaitable[T]], delay: Optional[float], budget: HedgeBudget) -> T:
+    """
+    Run call(); if it hasn't finished after `delay` seconds and the budget
+    allows, start a second call and return the first successful result.
+    Raises the first error only when every started call failed.
+    """
+    budget.deposit()
+    tasks = [asyncio.ensure_future(call())]
+    try:
+        if delay is not None:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                if budget.try_spend():
+                    HEDGES.labels(outcome="fired").inc()
+                    tasks.append(asyncio.ensure_future(call()))
+                else:
+                    HEDGES.labels(outcome="budget_exhausted").inc()
+
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:
+                if task not in done:
+                    continue
+                if task.exception() is None:
+                    if len(tasks) > 1:
+                        HEDGES.labels(outcome="hedge_won" if task is tasks[1] else "primary_won").inc()
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        # Cancel the loser (or everything, if the caller was cancelled)
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()  # mark retrieved
@@ -0,0 +1,82 @@
+"""
+Heuristic Tag Extraction
+
+Local, LLM-free extractor: splits content into sentences and runs them through
+the same semantic heuristics llm_tagger applies to LLM output. Also scores how
+confident that result is and how complex the content is, so the extraction
+engine can decide when to escalate to the LLM.
+"""
+
+import re
+from datetime import datetime
+from typing import List, Tuple
+from app.models.tag import Tag
+from app.services.llm_tagger import sentence_to_tag, select_primary_tag, tag_cues
+
+# Sentence boundaries: terminal punctuation followed by whitespace, or line breaks
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+|\n+')
+_WORD = re.compile(r'\b\w+\b')
+
+
+def split_sentences(content: str) -> List[str]:
+    """Split content into non-empty sentences"""
+    return [s.strip() for s in _SENTENCE_SPLIT.split(content) if s and s.strip()]
+
+
+def content_complexity(content: str, sentences: List[str] = None) -> float:
+    """
+    Score content complexity in [0, 1] from length, sentence count and
+    vocabulary diversity. Short status lines score low.
+    """
+    if sentences is None:
+        sentences = split_sentences(content)
+    words = _WORD.findall(content.lower())
+    if not words:
+        return 0.0
+
+    length_factor = min(1.0, len(content) / 2000)
+    sentence_factor = min(1.0, len(sentences) / 12)
+    vocabulary_factor = len(set(words)) / len(words) if len(words) >= 20 else 0.0
+
+    return round(0.5 * length_factor + 0.3 * sentence_factor + 0.2 * vocabulary_factor, 3)
+
+
+def heuristic_confidence(sentences: List[str], tags: List[Tag]) -> float:
+    """
+    Confidence in a heuristic result: share of sentences that produced a tag,
+    boosted when tags map onto the domain lexicon
+    """
+    if not sentences or not tags:
+        return 0.0
+
+    coverage = min(1.0, len(tags) / len(sentences))
+    domain_ratio = sum(1 for tag in tags if tag.type != "general.concept") / len(tags)
+
+    return round(min(0.95, 0.4 + 0.3 * coverage + 0.25 * domain_ratio), 2)
+
+
+def extract_cues_heuristic(content: str, max_cues: int = 20) -> Tuple[List[Tag], float, str]:
+    """Extract structured tags without calling the LLM"""
+    if not content or not content.strip():
+        raise ValueError("Content cannot be empty or contain only whitespace")
+
+    content = content.strip()
+    sentences = split_sentences(content)
+    now = datetime.now()
+
+    tags = []
+    seen_labels = set()
+    for sentence in sentences:
+        if len(tags) >= max_cues:
+            break
+        tag = sentence_to_tag(sentence, content, None, now)
+        if tag and tag.label not in seen_labels:
+            seen_labels.add(tag.label)
+            tags.append(tag)
+
+    confidence = heuristic_confidence(sentences, tags)
+    for tag in tags:
+        tag.confidence = confidence
+
+    primary_tag = select_primary_tag(tag_cues(tags), content)
+    return tags, confidence, primary_tag
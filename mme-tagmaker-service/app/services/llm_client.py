@@ -0,0 +1,320 @@
+"""
+Shared LLM Client
+
+Single managed AsyncOpenAI client used by every extraction engine. All chat
+completions go through create_chat_completion so connection pooling,
+timeouts (capped by the request deadline), adaptive concurrency limiting,
+retries, hedging, the provider circuit breaker and token accounting are
+handled in one place.
+"""
+
+import time
+import random
+import asyncio
+import httpx
+import openai
+from email.utils import parsedate_to_datetime
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from openai import AsyncOpenAI
+from loguru import logger
+from app.config import settings
+from app.services.concurrency import AdaptiveLimiter
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.hedging import HedgeBudget, LatencyWindow, hedged
+from app.services.metering import token_meter
+from app.services import deadline
+
+_client: Optional[AsyncOpenAI] = None
+_endpoint_clients: Dict[str, AsyncOpenAI] = {}
+
+# Adaptive cap on simultaneous completions across all engines
+llm_limiter = AdaptiveLimiter(
+    initial_limit=settings.llm_limit_initial,
+    min_limit=settings.llm_limit_min,
+    max_limit=settings.llm_limit_max,
+    backoff_ratio=settings.llm_limit_backoff_ratio,
+    latency_tolerance=settings.llm_limit_latency_tolerance
+)
+
+# Trips on consecutive provider failures; the extraction engine then falls back to heuristics
+llm_breaker = CircuitBreaker(
+    "llm",
+    failure_threshold=settings.llm_breaker_failure_threshold,
+    reset_seconds=settings.llm_breaker_reset_seconds
+)
+
+# Completion latencies (for the hedge delay) and the share of calls that may be hedged
+llm_latency = LatencyWindow(min_samples=settings.llm_hedge_min_samples)
+hedge_budget = HedgeBudget(ratio=settings.llm_hedge_budget_ratio)
+
+
+class TokenUsage:
+    """Token usage accumulated over the completions made inside a track_usage() block."""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.calls = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, prompt_tokens: int, completion_tokens: int):
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.calls += 1
+
+
+# Active usage scopes for the current task; nested scopes all receive the usage
+_usage_scopes: ContextVar[Tuple[TokenUsage, ...]] = ContextVar("llm_usage_scopes", default=())
+
+
+@contextmanager
+def track_usage():
+    """Collect token usage of every completion awaited inside the block (including child tasks)."""
+    usage = TokenUsage()
+    token = _usage_scopes.set(_usage_scopes.get() + (usage,))
+    try:
+        yield usage
+    finally:
+        _usage_scopes.reset(token)
+
+
+def _record_usage(resp):
+    usage = getattr(resp, "usage", None)
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    for scope in _usage_scopes.get():
+        scope.add(prompt_tokens, completion_tokens)
+    token_meter.record(prompt_tokens, completion_tokens)
+
+
+def _build_client(api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry_seconds
+        ),
+        timeout=httpx.Timeout(settings.llm_timeout_seconds, connect=5.0)
+    )
+    # Retries are done in create_chat_completion so they pass through the limiter
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=0,
+        timeout=settings.llm_timeout_seconds,
+        http_client=http_client
+    )
+
+
+def get_llm_client(base_url: Optional[str] = None) -> Optional[AsyncOpenAI]:
+    """
+    Get the shared async LLM client, creating it on first use.
+    Returns None when no OpenAI API key is configured.
+    
+    With base_url, returns the client for that OpenAI-compatible endpoint
+    (e.g. the local stand-in), which does not require an API key.
+    """
+    global _client
+    if base_url:
+        if base_url not in _endpoint_clients:
+            _endpoint_clients[base_url] = _build_client(settings.openai_api_key or "local", base_url)
+            logger.info(f"Initialized LLM client for {base_url}")
+        return _endpoint_clients[base_url]
+    if _client is None and settings.openai_api_key:
+        _client = _build_client(settings.openai_api_key)
+        logger.info(f"Initialized shared LLM client (max_connections={settings.llm_max_connections})")
+    return _client
+
+
+def _retry_after(error: openai.APIStatusError) -> Optional[float]:
+    """Seconds to wait from the provider's Retry-After / retry-after-ms headers"""
+    headers = error.response.headers if error.response is not None else {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _LimitedStream:
+    """Streamed completion that keeps its limiter slot until fully consumed or dropped"""
+
+    def __init__(self, stream, start: float):
+        self._stream = stream
+        self._start = start
+        self._released = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        failed = False
+        try:
+            async for chunk in self._stream:
+                # With stream_options include_usage, the last chunk carries the call's usage
+                if getattr(chunk, "usage", None) is not None:
+                    _record_usage(chunk)
+                yield chunk
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._release(None if failed else time.monotonic() - self._start)
+
+    def _release(self, latency: Optional[float] = None):
+        if not self._released:
+            self._released = True
+            llm_limiter.release(latency)
+
+    def __del__(self):
+        self._release()
+
+
+def _overload_reason(error: BaseException) -> Optional[str]:
+    """Provider overload/failure signal for a failed attempt, or None for other errors"""
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limited"
+    if isinstance(error, openai.APITimeoutError):
+        return "timeout"
+    if isinstance(error, openai.InternalServerError):
+        return "server_error"
+    if isinstance(error, openai.APIConnectionError):
+        return "connection_error"
+    return None
+
+
+async def _attempt(client: AsyncOpenAI, call_timeout: float, kwargs: dict):
+    """One completion attempt holding a limiter slot; failures adapt the limit"""
+    await _acquire_before_deadline()
+    start = time.monotonic()
+    attempt_timeout = deadline.timeout(call_timeout)
+    try:
+        resp = await client.chat.completions.create(timeout=attempt_timeout, **kwargs)
+    except Exception as e:
+        if isinstance(e, openai.APITimeoutError) and attempt_timeout < call_timeout:
+            # The caller's deadline ran out, not the provider's patience: no backoff, no breaker failure
+            llm_limiter.release()
+            deadline.DEADLINE_EXCEEDED.labels(stage="llm_call").inc()
+            raise deadline.DeadlineExceeded("llm_call") from e
+        overload = _overload_reason(e)
+        retry_after = _retry_after(e) if isinstance(e, openai.RateLimitError) else None
+        llm_limiter.release(overload=overload, retry_after=retry_after)
+        raise
+    except BaseException:
+        llm_limiter.release()
+        raise
+    
+    if kwargs.get("stream"):
+        return _LimitedStream(resp, start)
+    latency = time.monotonic() - start
+    llm_limiter.release(latency)
+    llm_latency.observe(latency)
+    token_meter.observe_latency(latency)
+    return resp
+
+
+async def create_chat_completion(**kwargs):
+    """
+    Create a chat completion with the shared client.
+    
+    Every call holds an adaptive limiter slot. 429s, timeouts and 5xx shrink the
+    limit and are retried up to LLM_MAX_RETRIES times, honoring Retry-After.
+    The request deadline bounds the queue wait and each attempt's timeout; an
+    attempt cut short by the deadline raises DeadlineExceeded and, unlike a
+    timeout of the full call_timeout, does not count as provider overload.
+    With LLM_HEDGING_ENABLED, a non-streamed attempt still running at the
+    latency percentile is hedged. Calls fail fast with CircuitOpenError while
+    the provider circuit breaker is open. `base_url` sends the call to another
+    OpenAI-compatible endpoint (see model_router).
+    """
+    base_url = kwargs.pop("base_url", None)
+    client = get_llm_client(base_url) if base_url else get_llm_client()
+    if client is None:
+        raise ValueError("OpenAI API key not configured. Please set OPENAI_API_KEY environment variable.")
+    
+    probe = llm_breaker.acquire()
+    call_timeout = kwargs.pop("timeout", settings.llm_timeout_seconds)
+    hedge = settings.llm_hedging_enabled and not kwargs.get("stream")
+    attempts = max(1, settings.llm_max_retries + 1)
+    try:
+        for attempt in range(attempts):
+            try:
+                if hedge:
+                    # No hedging until there are enough samples for a percentile
+                    threshold = llm_latency.percentile(settings.llm_hedge_percentile)
+                    delay = None if threshold is None else max(settings.llm_hedge_min_delay_seconds, threshold)
+                    resp = await hedged(lambda: _attempt(client, call_timeout, kwargs), delay, hedge_budget)
+                else:
+                    resp = await _attempt(client, call_timeout, kwargs)
+            except Exception as e:
+                overload = _overload_reason(e)
+                if overload is None:
+                    raise
+                retry_after = _retry_after(e) if isinstance(e, openai.RateLimitError) else None
+                # Exponential backoff with jitter when the provider gave no Retry-After
+                backoff = 0.0 if retry_after else min(8.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0)
+                left = deadline.remaining()
+                if attempt + 1 >= attempts or (left is not None and left <= max(backoff, retry_after or 0.0)):
+                    raise
+                logger.warning(f"LLM call failed ({overload}), retrying (attempt {attempt + 2}/{attempts})")
+                if backoff:
+                    await asyncio.sleep(backoff)
+                continue
+            
+            llm_breaker.record_success(probe)
+            if not kwargs.get("stream"):
+                _record_usage(resp)
+            return resp
+    except Exception as e:
+        # Rate limiting is the limiter's business; only failures count against the provider
+        if _overload_reason(e) in ("timeout", "server_error", "connection_error"):
+            llm_breaker.record_failure(probe)
+        else:
+            llm_breaker.record_neutral(probe)
+        raise
+    except BaseException:
+        llm_breaker.record_neutral(probe)
+        raise
+
+
+async def _acquire_before_deadline():
+    """Wait for a limiter slot, giving up when the request deadline passes first"""
+    deadline.check("llm_queue")
+    left = deadline.remaining()
+    if left is None:
+        await llm_limiter.acquire()
+        return
+    try:
+        await asyncio.wait_for(llm_limiter.acquire(), timeout=left)
+    except asyncio.TimeoutError:
+        deadline.DEADLINE_EXCEEDED.labels(stage="llm_queue").inc()
+        raise deadline.DeadlineExceeded("llm_queue")
+    if deadline.expired():
+        llm_limiter.release()
+        deadline.check("llm_queue")
+
+
+async def close_llm_client():
+    """Close the shared client and its connection pool."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+        logger.info("Shared LLM client closed")
+    for client in _endpoint_clients.values():
+        await client.close()
+    _endpoint_clients.clear()
@@ -0,0 +1,275 @@
+"""
+Local LLM Stand-In
+
+OpenAI-compatible chat-completions server for tests, benchmarks and load
+tests without the real API. With LLM_BACKEND=local every extraction route
+(llm_tagger, enhanced extractor, packing, streaming) is sent to it at
+LOCAL_LLM_BASE_URL. Latency is drawn from a seeded distribution, a share of
+requests can fail with 500 or 429, `stream=true` is answered with
+server-sent events, and responses can be recorded from a real upstream and
+replayed by prompt hash from a cassette directory. Without a recording,
+cues are synthesized from the prompt text, so results stay deterministic.
+
+Run with: python -m app.services.llm_standin
+"""
+
+import os
+import json
+import random
+import asyncio
+import hashlib
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import urlparse
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from loguru import logger
+from app.config import settings
+from app.utils.tokens import estimate_tokens
+
+STANDIN_MODES = ("off", "record", "replay")
+
+# Synthesized cues per document and characters per streamed delta
+SYNTH_MAX_CUES = 5
+STREAM_CHUNK_CHARS = 16
+
+Latency = Callable[[random.Random], float]
+
+
+def parse_latency(spec: str) -> Latency:
+    """
+    Latency distribution in seconds from a spec string: "0.2" or "fixed:0.2",
+    "uniform:0.1-0.5", "normal:0.3/0.05" (mean/stddev), "exponential:0.3"
+    (mean) or "lognormal:0.3/0.5" (median/sigma). Malformed specs mean no latency.
+    """
+    kind, _, args = (spec or "0").strip().partition(":")
+    if not args:
+        kind, args = "fixed", kind
+    try:
+        if kind == "fixed":
+            value = float(args)
+            return lambda rng: value
+        if kind == "uniform":
+            low, high = (float(v) for v in args.split("-", 1))
+            return lambda rng: rng.uniform(low, high)
+        if kind == "normal":
+            mean, stddev = (float(v) for v in args.split("/", 1))
+            return lambda rng: max(0.0, rng.gauss(mean, stddev))
+        if kind == "exponential":
+            mean = float(args)
+            return lambda rng: rng.expovariate(1 / mean) if mean > 0 else 0.0
+        if kind == "lognormal":
+            median, sigma = (float(v) for v in args.split("/", 1))
+            return lambda rng: median * rng.lognormvariate(0, sigma)
+    except ValueError:
+        pass
+    logger.warning(f"Ignoring malformed stand-in latency spec '{spec}'")
+    return lambda rng: 0.0
+
+
+def prompt_hash(body: dict) -> str:
+    """Replay key: the parts of a request that determine the completion (not stream flags)"""
+    key = {k: body.get(k) for k in ("model", "messages", "temperature", "response_format")}
+    return hashlib.sha256(json.dumps(key, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def synthesize_cues(text: str) -> List[str]:
+    """Deterministic cues from text: its first sentences, cut to a dozen words"""
+    sentences = [s.strip() for s in text.replace("\n", ". ").split(".")]
+    cues = [" ".join(s.split()[:12]) for s in sentences if len(s.split()) >= 2]
+    return cues[:SYNTH_MAX_CUES] or [" ".join(text.split()[:12]) or "empty document"]
+
+
+class Cassette:
+    """Recorded completions as one JSON file per prompt hash."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, completion: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path(key) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(completion, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self._path(key))
+
+
+class StandinLLM:
+    """
+    Chat-completions stand-in. A request takes the next scripted (latency, status)
+    step if any, otherwise latency from the distribution and an injected failure
+    at error_rate (500) or rate_limit_rate (429).
+    """
+
+    def __init__(self, cues: Optional[List[str]] = None, latency: str = "0", error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, seed: Optional[int] = None, mode: str = "off",
+                 cassette_dir: Optional[str] = None, upstream_base_url: Optional[str] = None,
+                 upstream_api_key: Optional[str] = None, usage: Optional[Tuple[int, int]] = None):
+        self.app = FastAPI(title="MME LLM stand-in")
+        self.app.post("/v1/chat/completions")(self._complete)
+        self.app.post("/chat/completions")(self._complete)
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.seed = seed
+        self.mode = mode if mode in STANDIN_MODES else "off"
+        self.cassette = Cassette(cassette_dir) if cassette_dir else None
+        self.upstream_base_url = upstream_base_url
+        self.upstream_api_key = upstream_api_key
+        # Fixed (prompt, completion) tokens per call; estimated from the text otherwise
+        self.usage = usage
+        self.reset(cues)
+
+    def reset(self, cues: Optional[List[str]] = None):
+        """Clear script and counters; cues fixes the answer instead of synthesizing it"""
+        self.cues = cues
+        self.script: List[Tuple[float, int]] = []
+        self.rng = random.Random(self.seed)
+        self.requests = 0
+        self.recorded = 0
+        self.replayed = 0
+        self.replay_misses = 0
+        self.last_request: Optional[dict] = None
+
+    def _next_step(self) -> Tuple[float, int]:
+        if self.script:
+            return self.script.pop(0)
+        latency = self.latency(self.rng)
+        roll = self.rng.random()
+        if roll < self.error_rate:
+            return latency, 500
+        if roll < self.error_rate + self.rate_limit_rate:
+            return latency, 429
+        return latency, 200
+
+    async def _complete(self, request: Request):
+        body = await request.json()
+        self.last_request = body
+        self.requests += 1
+        latency, status = self._next_step()
+        await asyncio.sleep(latency)
+        if status == 429:
+            return JSONResponse({"error": {"message": "injected rate limit", "type": "rate_limit_error"}},
+                                status_code=429, headers={"Retry-After": "1"})
+        if status != 200:
+            return JSONResponse({"error": {"message": "injected failure", "type": "server_error"}}, status_code=status)
+
+        completion = await self._completion(body)
+        if isinstance(completion, JSONResponse):
+            return completion
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+            return StreamingResponse(self._sse(completion, include_usage), media_type="text/event-stream")
+        return completion
+
+    async def _completion(self, body: dict):
+        key = prompt_hash(body)
+        if self.cassette is not None and self.mode == "replay":
+            recorded = self.cassette.get(key)
+            if recorded is not None:
+                self.replayed += 1
+                return recorded
+            self.replay_misses += 1
+            logger.warning(f"No recording for prompt {key[:12]}, synthesizing")
+        if self.cassette is not None and self.mode == "record" and self.upstream_base_url:
+            return await self._record(key, body)
+        return self._synthesize(body)
+
+    async def _record(self, key: str, body: dict):
+        upstream = {k: v for k, v in body.items() if k not in ("stream", "stream_options")}
+        headers = {"Authorization": f"Bearer {self.upstream_api_key}"} if self.upstream_api_key else {}
+        async with httpx.AsyncClient(timeout=settings.llm_timeout_seconds) as client:
+            resp = await client.post(f"{self.upstream_base_url.rstrip('/')}/chat/completions",
+                                     json=upstream, headers=headers)
+        if resp.status_code != 200:
+            return JSONResponse(resp.json(), status_code=resp.status_code)
+        completion = resp.json()
+        self.cassette.put(key, completion)
+        self.recorded += 1
+        return completion
+
+    def _synthesize(self, body: dict) -> dict:
+        messages = body.get("messages") or []
+        system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+        user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+
+        # Packed prompts (one JSON section per document ID) get an answer per document
+        docs = None
+        if "per document" in system:
+            try:
+                docs = json.loads(user)
+            except ValueError:
+                pass
+        if isinstance(docs, dict):
+            answer = {doc_id: {"cues": self.cues or synthesize_cues(str(text)), "confidence": 0.9}
+                      for doc_id, text in docs.items()}
+        else:
+            answer = {"cues": self.cues or synthesize_cues(user), "confidence": 0.9}
+
+        content = json.dumps(answer)
+        prompt_tokens, completion_tokens = self.usage or (
+            sum(estimate_tokens(str(m.get("content", ""))) for m in messages), estimate_tokens(content))
+        return {
+            "id": f"chatcmpl-standin-{self.requests}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body.get("model") or "standin",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}
+        }
+
+    async def _sse(self, completion: dict, include_usage: bool):
+        content = completion["choices"][0]["message"]["content"]
+        base = {"id": completion.get("id", "chatcmpl-standin"), "object": "chat.completion.chunk",
+                "created": 0, "model": completion.get("model", "standin")}
+
+        def _event(choices, usage=None) -> str:
+            return f"data: {json.dumps(dict(base, choices=choices, usage=usage))}\n\n"
+
+        yield _event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for i in range(0, len(content), STREAM_CHUNK_CHARS):
+            yield _event([{"index": 0, "delta": {"content": content[i:i + STREAM_CHUNK_CHARS]}, "finish_reason": None}])
+            await asyncio.sleep(0)
+        yield _event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if include_usage:
+            yield _event([], completion.get("usage"))
+        yield "data: [DONE]\n\n"
+
+
+def standin_from_settings() -> StandinLLM:
+    """Stand-in configured from the STANDIN_* settings"""
+    return StandinLLM(
+        latency=settings.standin_latency,
+        error_rate=settings.standin_error_rate,
+        rate_limit_rate=settings.standin_rate_limit_rate,
+        seed=int(settings.standin_seed) if settings.standin_seed else None,
+        mode=settings.standin_mode,
+        cassette_dir=settings.standin_cassette_dir,
+        upstream_base_url=settings.standin_upstream_base_url,
+        upstream_api_key=settings.openai_api_key
+    )
+
+
+def main():
+    """Serve the stand-in on LOCAL_LLM_BASE_URL's host and port"""
+    import uvicorn
+
+    url = urlparse(settings.local_llm_base_url)
+    standin = standin_from_settings()
+    logger.info(f"LLM stand-in on {url.hostname}:{url.port or 80} (mode={standin.mode})")
+    uvicorn.run(standin.app, host=url.hostname or "127.0.0.1", port=url.port or 80, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
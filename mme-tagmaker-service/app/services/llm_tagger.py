@@ -1,7 +1,6 @@
 import os, hashlib, re, json
-from openai import OpenAI
 from datetime import datetime
-from app.utils.hashing import sha256_hash
+from app.utils.hashing import sha256_hash, content_hash
 from app.models.tag import Tag
 from app.services.domain_lexicon import get_domain_type, get_synonyms
 
@@ -14,9 +13,27 @@ def normalize_label(label: str) -> str:
     return normalized
 from loguru import logger
 
-# Initialize OpenAI client with optional API key for testing
 from app.config import settings
-client = OpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
+from app.services.llm_client import get_llm_client, create_chat_completion
+from app.services.extraction_cache import get_cached_extraction, store_extraction
+from app.services.singleflight import SingleFlight
+from app.services.stream_parser import CueStreamParser
+from app.services.model_router import current_route
+from app.services.prompt_packing import PromptPacker
+from app.services.scheduler import current_lane
+from app.services.metering import current_tenant
+from app.services.stage_timing import timed_stage
+from app.utils.tokens import estimate_tokens
+from app.utils.keyword_scanner import content_keywords
+
+# Bump when the extraction prompt changes so cached results are not reused
+PROMPT_VERSION = "v1"
+
+# Longer content is truncated for a single call (map-reduce handles it instead)
+MAX_CONTENT_CHARS = 8000
+
+# Coalesces concurrent extractions of identical content into one LLM call
+extraction_flight = SingleFlight("extract_cues")
 
 # Expanded stopwords for primary tag filtering
 STOPWORDS = {
@@ -99,99 +116,111 @@ def select_primary_tag(cues: list[str], content: str) -> str:
     
     return "unknown_event"
 
-def determine_tag_type(label: str) -> str:
-    """Determine tag type based on label content"""
-    label_lower = label.lower()
-    
-    # Action words
-    action_words = [
+# Label and content classifier keywords, matched through the shared keyword scanner (checked in order)
+TAG_TYPE_WORDS = (
+    ("action", content_keywords.register([
         "submit", "create", "build", "implement", "deploy", "test", "review",
         "complete", "finish", "start", "begin", "launch", "release", "update",
         "fix", "resolve", "solve", "process", "handle", "manage", "execute",
         "run", "perform", "conduct", "carry", "out", "deliver", "provide"
-    ]
-    
-    # Object words
-    object_words = [
+    ])),
+    ("object", content_keywords.register([
         "form", "document", "file", "report", "proposal", "budget", "plan",
         "system", "application", "database", "api", "service", "module",
         "component", "interface", "model", "framework", "library", "tool",
         "platform", "environment", "configuration", "setting", "parameter"
-    ]
-    
-    # Error words
-    error_words = [
+    ])),
+    ("error", content_keywords.register([
         "error", "fail", "failure", "exception", "bug", "issue", "problem",
         "crash", "timeout", "invalid", "missing", "broken", "corrupt",
         "unavailable", "denied", "rejected", "cancelled", "aborted"
-    ]
-    
-    # Status words
-    status_words = [
+    ])),
+    ("status", content_keywords.register([
         "status", "state", "condition", "ready", "pending", "active",
         "inactive", "enabled", "disabled", "running", "stopped", "completed",
         "failed", "success", "approved", "rejected", "draft", "final",
         "published", "archived", "expired", "valid", "invalid"
-    ]
-    
-    for word in action_words:
-        if word in label_lower:
-            return "action"
-    
-    for word in object_words:
-        if word in label_lower:
-            return "object"
-    
-    for word in error_words:
-        if word in label_lower:
-            return "error"
-    
-    for word in status_words:
-        if word in label_lower:
-            return "status"
-    
+    ])),
+)
+
+SECTION_KEYWORDS = (
+    ("funding-proposal", content_keywords.register(["funding", "proposal", "grant", "budget", "cost", "financial"])),
+    ("technical-implementation", content_keywords.register(["technical", "implementation", "code", "development", "programming"])),
+    ("project-management", content_keywords.register(["project", "management", "timeline", "deadline", "milestone"])),
+    ("research-analysis", content_keywords.register(["research", "analysis", "study", "investigation", "examination"])),
+    ("documentation", content_keywords.register(["documentation", "document", "manual", "guide", "specification"])),
+)
+
+def determine_tag_type(label: str) -> str:
+    """Determine tag type based on label content"""
+    hits = content_keywords.scan(label)
+    for tag_type, words in TAG_TYPE_WORDS:
+        if not words.isdisjoint(hits):
+            return tag_type
     return "concept"
 
 def determine_section(label: str, content: str) -> str:
     """Determine section based on label and content"""
-    label_lower = label.lower()
-    content_lower = content.lower()
-    
-    # Section keywords
-    sections = {
-        "funding-proposal": ["funding", "proposal", "grant", "budget", "cost", "financial"],
-        "technical-implementation": ["technical", "implementation", "code", "development", "programming"],
-        "project-management": ["project", "management", "timeline", "deadline", "milestone"],
-        "research-analysis": ["research", "analysis", "study", "investigation", "examination"],
-        "documentation": ["documentation", "document", "manual", "guide", "specification"]
-    }
-    
-    for section, keywords in sections.items():
-        for keyword in keywords:
-            if keyword in label_lower or keyword in content_lower:
-                return section
-    
+    # The content scan is cached, so every tag of an extraction shares one pass over it
+    label_hits = content_keywords.scan(label)
+    content_hits = content_keywords.scan(content)
+    for section, keywords in SECTION_KEYWORDS:
+        if not keywords.isdisjoint(label_hits) or not keywords.isdisjoint(content_hits):
+            return section
     return "general"
 
-def extract_cues(content: str, max_cues: int = 20):
-    # Fail fast if OpenAI API key is not configured
-    if not client:
-        logger.error("OpenAI API key not configured - LLM tagging service requires valid API key")
-        raise ValueError("OpenAI API key not configured. Please set OPENAI_API_KEY environment variable.")
-    
+async def extract_cues(content: str, max_cues: int = 20, use_cache: bool = True):
     # Validate content is not empty or whitespace
     if not content or not content.strip():
         logger.warning("Empty or whitespace-only content provided for tag extraction")
         raise ValueError("Content cannot be empty or contain only whitespace")
     
-    # Check content length and truncate if too long
-    content = content.strip()
-    if len(content) > 8000:  # Limit to ~8k chars to prevent token overflow
-        logger.warning(f"Content too long ({len(content)} chars), truncating to 8000 chars")
-        content = content[:8000] + "..."
+    # Serve repeated content from the extraction cache
+    use_cache = use_cache and settings.extraction_cache_enabled
+    cache_key = content_hash(content, PROMPT_VERSION, current_route().model, max_cues)
+    if use_cache:
+        with timed_stage("cache_lookup", "llm"):
+            cached = await get_cached_extraction(cache_key)
+        if cached is not None:
+            logger.debug(f"Extraction cache hit for {cache_key[:12]}")
+            return cached
     
-    # Enhanced prompt for better semantic extraction
-    prompt = f"""Analyze the following text and extract key information. Focus on identifying the main actions, events, or concepts.
+    async def _extract_and_store():
+        if _packable(content):
+            # Key packs by org and route so tenants and models are never mixed in one prompt
+            route = current_route()
+            key = (current_tenant()[0], route.model, route.base_url, max_cues)
+            result = await prompt_packer.submit(key, (content, max_cues), estimate_tokens(content))
+        else:
+            result = await _extract_cues_llm(content, max_cues)
+        if use_cache and result[0]:
+            store_extraction(cache_key, result, PROMPT_VERSION)
+        return result
+    
+    # Identical in-flight extractions share a single LLM call. The shared call runs in the
+    # first caller's lane, tenant and route, so only callers that share all three are coalesced
+    route = current_route()
+    lane, org = current_lane()
+    flight_key = f"{lane}:{org}:{route.name}:{route.base_url}:{cache_key}"
+    return await extraction_flight.do(flight_key, _extract_and_store)
+
+def _require_llm_client():
+    """Fail fast if OpenAI API key is not configured (routes to a custom endpoint need none)"""
+    if current_route().base_url is None and get_llm_client() is None:
+        logger.error("OpenAI API key not configured - LLM tagging service requires valid API key")
+        raise ValueError("OpenAI API key not configured. Please set OPENAI_API_KEY environment variable.")
+
+def prepare_content(content: str) -> str:
+    """Strip content and truncate it if too long"""
+    content = content.strip()
+    if len(content) > MAX_CONTENT_CHARS:  # Limit to ~8k chars to prevent token overflow
+        logger.warning(f"Content too long ({len(content)} chars), truncating to {MAX_CONTENT_CHARS} chars")
+        content = content[:MAX_CONTENT_CHARS] + "..."
+    return content
+
+def build_prompt(max_cues: int) -> str:
+    """Enhanced prompt for better semantic extraction"""
+    return f"""Analyze the following text and extract key information. Focus on identifying the main actions, events, or concepts.
 
 Return ONLY a valid JSON object with this exact structure:
 {{"cues": ["action or event description 1", "action or event description 2", ...], "confidence": 0.95}}
@@ -204,21 +233,69 @@ Guidelines for extraction:
 - Include deadlines, submissions, reviews, and deliverables
 
 Text to analyze:"""
+
+def sentence_to_tag(sentence: str, content: str, confidence, now: datetime):
+    """Convert one extracted sentence into a structured Tag, or None if it has no concept"""
+    if not sentence or not sentence.strip():
+        return None
+        
+    concept, detail = extract_semantic_concepts(sentence)
+    if not concept or concept == "unknown_action":
+        return None
+    
+    # Create structured tag with normalized label and domain typing
+    normalized_label = normalize_label(concept)
+    domain_type = get_domain_type(normalized_label)
+    
+    return Tag(
+        label=normalized_label,
+        section=determine_section(concept, content),
+        origin="agent",
+        scope="shared",
+        type=domain_type,
+        confidence=confidence,
+        links=[detail] if detail else [],
+        usageCount=1,
+        lastUsed=now
+    )
+
+def tag_cues(tags: list) -> list:
+    """Legacy head:detail cue strings for a list of tags"""
+    return [f"{tag.label}:{tag.links[0] if tag.links else ''}" for tag in tags]
+
+def cues_to_result(sentences: list, confidence, content: str, max_cues: int):
+    """Turn the LLM's cue sentences for content into (tags, confidence, primary_tag)"""
+    now = datetime.now()
+    tags = [tag for tag in (sentence_to_tag(s, content, confidence, now) for s in sentences[:max_cues]) if tag]
+    
+    # Select primary tag
+    primary_tag = select_primary_tag(tag_cues(tags), content)
+    
+    return tags, confidence, primary_tag
+
+async def _extract_cues_llm(content: str, max_cues: int):
+    """Run the LLM extraction and convert its cues into structured tags"""
+    _require_llm_client()
+    content = prepare_content(content)
     
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": content}
-            ],
-            temperature=0.1,  # Lower temperature for more deterministic output
-        )
+        route = current_route()
+        with timed_stage("llm_wait", "llm"):
+            resp = await create_chat_completion(
+                model=route.model,
+                base_url=route.base_url,
+                messages=[
+                    {"role": "system", "content": build_prompt(max_cues)},
+                    {"role": "user", "content": content}
+                ],
+                temperature=0.1,  # Lower temperature for more deterministic output
+            )
         
         raw = resp.choices[0].message.content.strip()
         
         # Parse JSON response
-        result = json.loads(raw)
+        with timed_stage("parse", "llm"):
+            result = json.loads(raw)
         sentences = result.get("cues", [])
         confidence = result.get("confidence", 0.95)
         
@@ -226,37 +303,170 @@ Text to analyze:"""
             raise ValueError("LLM returned no cues from content analysis")
             
         # Process sentences into structured tags
-        tags = []
-        now = datetime.now()
-        
-        for sentence in sentences[:max_cues]:
-            if not sentence.strip():
-                continue
-                
-            concept, detail = extract_semantic_concepts(sentence)
-            if concept and concept != "unknown_action":
-                # Create structured tag with normalized label and domain typing
-                normalized_label = normalize_label(concept)
-                domain_type = get_domain_type(normalized_label)
-                
-                tag = Tag(
-                    label=normalized_label,
-                    section=determine_section(concept, content),
-                    origin="agent",
-                    scope="shared",
-                    type=domain_type,
-                    confidence=confidence,
-                    links=[detail] if detail else [],
-                    usageCount=1,
-                    lastUsed=now
-                )
-                tags.append(tag)
-        
-        # Select primary tag
-        primary_tag = select_primary_tag([f"{tag.label}:{tag.links[0] if tag.links else ''}" for tag in tags], content)
-        
-        return tags, confidence, primary_tag
+        with timed_stage("postprocess", "llm"):
+            return cues_to_result(sentences, confidence, content, max_cues)
         
     except Exception as e:
         logger.error(f"Error in LLM extraction: {str(e)}")
         raise ValueError(f"LLM extraction failed: {str(e)}")
+
+def _packable(content: str) -> bool:
+    """Small bulk-lane documents go through the prompt packer"""
+    return (settings.prompt_packing_enabled and current_lane()[0] == "bulk"
+            and estimate_tokens(content) <= settings.prompt_packing_max_doc_tokens)
+
+def build_packed_prompt(max_cues: int) -> str:
+    """Prompt for several documents at once, answered with one JSON section per document ID"""
+    return f"""Analyze each of the following documents separately and extract key information from each. Focus on identifying the main actions, events, or concepts.
+
+The documents are given as a JSON object mapping document ID to text. Return ONLY a valid JSON object with one entry per document ID, in this exact structure:
+{{"d1": {{"cues": ["action or event description 1", ...], "confidence": 0.95}}, "d2": {{"cues": [...], "confidence": 0.9}}}}
+
+Guidelines for extraction:
+- Extract {max_cues} or fewer meaningful statements per document
+- Never mix information between documents
+- Focus on actions, decisions, completions, and outcomes
+- Avoid pronouns (we, I, they) in favor of concrete actions
+- Prefer specific events over general statements
+- Include deadlines, submissions, reviews, and deliverables
+
+Documents:"""
+
+async def _extract_packed(docs: dict) -> dict:
+    """
+    One LLM call for several (content, max_cues) documents keyed by document ID.
+    Returns a result per ID whose section parsed; missing IDs are retried alone.
+    """
+    _require_llm_client()
+    contents = {doc_id: prepare_content(content) for doc_id, (content, _) in docs.items()}
+    max_cues = max(cues for _, cues in docs.values())
+    
+    try:
+        route = current_route()
+        with timed_stage("llm_wait", "llm"):
+            resp = await create_chat_completion(
+                model=route.model,
+                base_url=route.base_url,
+                messages=[
+                    {"role": "system", "content": build_packed_prompt(max_cues)},
+                    {"role": "user", "content": json.dumps(contents, ensure_ascii=False)}
+                ],
+                temperature=0.1,
+            )
+    except Exception as e:
+        logger.error(f"Error in packed LLM extraction: {str(e)}")
+        raise ValueError(f"LLM extraction failed: {str(e)}")
+    
+    try:
+        with timed_stage("parse", "llm"):
+            sections = json.loads(resp.choices[0].message.content.strip())
+    except (ValueError, AttributeError) as e:
+        logger.warning(f"Packed LLM response is not JSON: {str(e)}")
+        return {}
+    if not isinstance(sections, dict):
+        return {}
+    
+    results = {}
+    with timed_stage("postprocess", "llm"):
+        for doc_id, (_, doc_max_cues) in docs.items():
+            section = sections.get(doc_id)
+            try:
+                sentences = section["cues"]
+                if not sentences or not isinstance(sentences, list):
+                    continue
+                results[doc_id] = cues_to_result(sentences, section.get("confidence", 0.95), contents[doc_id], doc_max_cues)
+            except Exception as e:
+                logger.debug(f"Unusable packed section {doc_id}: {str(e)}")
+    return results
+
+async def _extract_single(payload):
+    return await _extract_cues_llm(*payload)
+
+# Packs small bulk-lane documents into shared LLM calls
+prompt_packer = PromptPacker(
+    "extract_cues",
+    _extract_packed,
+    _extract_single,
+    max_tokens=settings.prompt_packing_max_tokens,
+    max_docs=settings.prompt_packing_max_docs,
+    window_seconds=settings.prompt_packing_window_ms / 1000
+)
+
+async def stream_cues(content: str, max_cues: int = 20, use_cache: bool = True):
+    """
+    Streaming variant of extract_cues.
+    
+    Yields ("tag", Tag) as soon as each cue is complete in the streamed
+    completion, then a final ("summary", {"confidence", "primary_tag"}).
+    Streamed tags carry confidence=None; the summary holds the confidence.
+    """
+    if not content or not content.strip():
+        logger.warning("Empty or whitespace-only content provided for tag extraction")
+        raise ValueError("Content cannot be empty or contain only whitespace")
+    
+    use_cache = use_cache and settings.extraction_cache_enabled
+    cache_key = content_hash(content, PROMPT_VERSION, current_route().model, max_cues)
+    if use_cache:
+        with timed_stage("cache_lookup", "llm"):
+            cached = await get_cached_extraction(cache_key)
+        if cached is not None:
+            tags, confidence, primary_tag = cached
+            for tag in tags:
+                yield "tag", tag
+            yield "summary", {"confidence": confidence, "primary_tag": primary_tag}
+            return
+    
+    _require_llm_client()
+    content = prepare_content(content)
+    
+    try:
+        route = current_route()
+        # Until the stream opens; the rest of the completion overlaps with parsing
+        with timed_stage("llm_wait", "llm"):
+            stream = await create_chat_completion(
+                model=route.model,
+                base_url=route.base_url,
+                messages=[
+                    {"role": "system", "content": build_prompt(max_cues)},
+                    {"role": "user", "content": content}
+                ],
+                temperature=0.1,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+    except Exception as e:
+        logger.error(f"Error in LLM extraction: {str(e)}")
+        raise ValueError(f"LLM extraction failed: {str(e)}")
+    
+    parser = CueStreamParser()
+    tags = []
+    sentence_count = 0
+    now = datetime.now()
+    
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        
+        for sentence in parser.feed(delta):
+            sentence_count += 1
+            if sentence_count > max_cues:
+                continue
+            tag = sentence_to_tag(sentence, content, None, now)
+            if tag:
+                tags.append(tag)
+                yield "tag", tag
+    
+    if not sentence_count:
+        raise ValueError("LLM extraction failed: LLM returned no cues from content analysis")
+    
+    confidence = parser.confidence()
+    primary_tag = select_primary_tag(tag_cues(tags), content)
+    
+    if use_cache and tags:
+        cached_tags = [tag.model_copy(update={"confidence": confidence}) for tag in tags]
+        store_extraction(cache_key, (cached_tags, confidence, primary_tag), PROMPT_VERSION)
+    
+    yield "summary", {"confidence": confidence, "primary_tag": primary_tag}
@@ -0,0 +1,76 @@
+"""
+Load Shedding for extraction routes
+
+Admission check in front of the LLM: when the estimated wait for LLM capacity
+exceeds the request's budget, the request is answered fast instead of queuing
+until the client gives up. Per route, that means either a 503 with
+Retry-After ("reject") or a heuristic-only result ("degrade"). The budget is
+SHED_WAIT_BUDGET_SECONDS, or less when the request deadline is closer.
+"""
+
+import math
+from typing import Optional
+from prometheus_client import Counter
+from loguru import logger
+from app.config import settings
+from app.services.llm_client import llm_limiter
+from app.services import deadline
+
+SHED_ACTIONS = ("reject", "degrade")
+
+# Prometheus metrics
+LOAD_SHED = Counter(
+    'mme_load_shed_total',
+    'Requests shed because estimated LLM queue wait exceeded their budget',
+    ['route', 'action']
+)
+
+
+class Overloaded(Exception):
+    """Raised when a request is rejected by load shedding"""
+
+    def __init__(self, estimated_wait: float):
+        self.estimated_wait = estimated_wait
+        self.retry_after = max(1, math.ceil(estimated_wait))
+        super().__init__(f"Service overloaded: estimated wait {estimated_wait:.1f}s exceeds budget")
+
+
+class LoadShedder:
+    """Decides per request whether to run, degrade or reject."""
+
+    def route_action(self, route: str) -> str:
+        """Configured action for a route: reject or degrade"""
+        action = {
+            "extract-tags": settings.shed_action_extract_tags,
+            "generate-and-save": settings.shed_action_generate_and_save,
+            "batch": settings.shed_action_batch
+        }.get(route, "reject")
+        return action if action in SHED_ACTIONS else "reject"
+
+    def check(self, route: str, priority: str, budget: Optional[float] = None) -> Optional[str]:
+        """
+        Admission check for one LLM-backed request.
+        Returns None to run normally or "degrade" for a heuristic-only result;
+        raises Overloaded when the route rejects.
+        """
+        if not settings.load_shedding_enabled:
+            return None
+
+        budget = settings.shed_wait_budget_seconds if budget is None else budget
+        left = deadline.remaining()
+        if left is not None:
+            budget = min(budget, left)
+        wait = llm_limiter.estimated_wait(priority)
+        if wait <= budget:
+            return None
+
+        action = self.route_action(route)
+        LOAD_SHED.labels(route=route, action=action).inc()
+        logger.warning(f"Shedding {route} ({priority}): estimated LLM wait {wait:.2f}s > budget {budget:.2f}s, action={action}")
+        if action == "reject":
+            raise Overloaded(wait)
+        return action
+
+
+# Global load shedder instance
+load_shedder = LoadShedder()
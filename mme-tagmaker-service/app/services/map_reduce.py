@@ -0,0 +1,125 @@
+"""
+Map-Reduce Extraction for Long Documents
+
+Splits content that exceeds the single-call limit into chunks, extracts every
+chunk concurrently (bounded by a semaphore and a per-document deadline,
+capped by the request deadline), then merges the per-chunk tags: duplicate
+labels are combined and confidences are weighted by chunk size.
+"""
+
+import math
+import asyncio
+from typing import Dict, List, Tuple
+from prometheus_client import Counter, Histogram
+from loguru import logger
+from app.config import settings
+from app.services import deadline
+from app.models.tag import Tag
+from app.services.llm_tagger import extract_cues, select_primary_tag, tag_cues
+from app.services.enhanced_extractor import EnhancedContentProcessor
+
+# Prometheus metrics
+MAP_REDUCE_CHUNKS = Histogram(
+    'mme_map_reduce_chunks',
+    'Number of chunks per map-reduce extraction',
+    buckets=(2, 3, 5, 8, 13, 21, 34, 50)
+)
+
+MAP_REDUCE_CHUNKS_DROPPED = Counter(
+    'mme_map_reduce_chunks_dropped_total',
+    'Total number of chunks dropped by map-reduce extraction',
+    ['reason']
+)
+
+MAX_LINKS_PER_TAG = 5
+
+
+def chunk_content(content: str) -> List[str]:
+    """Split content on sentence boundaries into chunks of at most map_reduce_chunk_chars"""
+    return EnhancedContentProcessor(max_chunk_size=settings.map_reduce_chunk_chars).chunk_large_content(content)
+
+
+def merge_chunk_results(results: List[Tuple[int, List[Tag], float]], max_cues: int) -> Tuple[List[Tag], float]:
+    """
+    Merge per-chunk (chunk_size, tags, confidence) results.
+    Tags with the same label are combined; labels found in more chunks and
+    larger chunks rank first. Confidences are weighted by chunk size.
+    """
+    merged: Dict[str, Tag] = {}
+    weights: Dict[str, float] = {}
+    weighted_confidence: Dict[str, float] = {}
+    chunk_hits: Dict[str, int] = {}
+
+    total_size = sum(size for size, _, _ in results) or 1
+    document_confidence = sum(size * confidence for size, _, confidence in results) / total_size
+
+    for size, tags, confidence in results:
+        for tag in tags:
+            tag_confidence = tag.confidence if tag.confidence is not None else confidence
+            existing = merged.get(tag.label)
+            if existing is None:
+                merged[tag.label] = tag.model_copy(deep=True)
+                weights[tag.label] = 0.0
+                weighted_confidence[tag.label] = 0.0
+                chunk_hits[tag.label] = 0
+            else:
+                existing.usageCount += tag.usageCount
+                for link in tag.links:
+                    if link not in existing.links and len(existing.links) < MAX_LINKS_PER_TAG:
+                        existing.links.append(link)
+
+            weights[tag.label] += size
+            weighted_confidence[tag.label] += size * tag_confidence
+            chunk_hits[tag.label] += 1
+
+    for label, tag in merged.items():
+        tag.confidence = round(weighted_confidence[label] / weights[label], 3)
+
+    ranked = sorted(merged.values(), key=lambda t: (chunk_hits[t.label], weights[t.label]), reverse=True)
+    return ranked[:max_cues], round(document_confidence, 3)
+
+
+async def extract_map_reduce(content: str, max_cues: int = 20, use_cache: bool = True):
+    """Extract tags from a long document by fanning chunks out concurrently"""
+    content = content.strip()
+    chunks = chunk_content(content)
+    MAP_REDUCE_CHUNKS.observe(len(chunks))
+
+    per_chunk_cues = min(max_cues, max(5, math.ceil(2 * max_cues / len(chunks))))
+    semaphore = asyncio.Semaphore(max(1, settings.map_reduce_concurrency))
+
+    async def _map(chunk: str):
+        async with semaphore:
+            tags, confidence, _ = await extract_cues(chunk, per_chunk_cues, use_cache=use_cache)
+            return len(chunk), tags, confidence
+
+    tasks = [asyncio.ensure_future(_map(chunk)) for chunk in chunks]
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=deadline.timeout(settings.map_reduce_deadline_seconds))
+    finally:
+        # Also runs when the request itself is cancelled
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    if pending:
+        MAP_REDUCE_CHUNKS_DROPPED.labels(reason="deadline").inc(len(pending))
+        logger.warning(f"Map-reduce deadline reached: dropped {len(pending)}/{len(chunks)} chunks")
+
+    results = []
+    for task in tasks:
+        if task not in done:
+            continue
+        if task.exception() is not None:
+            MAP_REDUCE_CHUNKS_DROPPED.labels(reason="error").inc()
+            logger.warning(f"Map-reduce chunk failed: {str(task.exception())}")
+            continue
+        results.append(task.result())
+
+    if not results:
+        raise ValueError(f"LLM extraction failed: none of {len(chunks)} chunks extracted within the deadline")
+
+    tags, confidence = merge_chunk_results(results, max_cues)
+    primary_tag = select_primary_tag(tag_cues(tags), content)
+
+    return tags, confidence, primary_tag
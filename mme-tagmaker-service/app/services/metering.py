@@ -0,0 +1,210 @@
+"""
+Token Metering and Per-Org Token Budgets
+
+Every completion's prompt and completion tokens are attributed to the orgId
+and userId of the request that made it: per-org Prometheus counters for
+dashboards, and a daily per-org/user rollup in MongoDB flushed every
+TOKEN_USAGE_FLUSH_SECONDS. The same counts back per-org budgets (tokens per
+minute and per day), checked at admission so an over-budget org is answered
+with a 429 or the heuristic path before it reaches the LLM. Budget windows
+are counted per replica.
+"""
+
+import math
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from prometheus_client import Counter, Histogram
+from loguru import logger
+from app.config import settings
+from app.services.database import db_service
+from app.services.scheduler import DEFAULT_ORG, metric_org
+
+DEFAULT_USER = "unknown"
+BUDGET_ACTIONS = ("reject", "degrade")
+
+# Prometheus metrics
+LLM_TOKENS = Counter(
+    'mme_llm_tokens_total',
+    'LLM tokens used per org (per-user usage is in the MongoDB rollup)',
+    ['org', 'kind']
+)
+
+LLM_CALL_LATENCY = Histogram(
+    'mme_llm_call_seconds',
+    'Latency of successful LLM calls per org',
+    ['org'],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)
+)
+
+TOKEN_BUDGET_EXCEEDED = Counter(
+    'mme_token_budget_exceeded_total',
+    'Requests refused LLM access because their org was over its token budget',
+    ['org', 'window', 'action']
+)
+
+# Org and user the current request's LLM calls are billed to
+_tenant: ContextVar[Tuple[str, str]] = ContextVar("llm_tenant", default=(DEFAULT_ORG, DEFAULT_USER))
+
+
+@contextmanager
+def request_tenant(org_id: Optional[str], user_id: Optional[str]):
+    """Attribute the LLM calls awaited inside the block (including child tasks) to org_id/user_id"""
+    token = _tenant.set((org_id or DEFAULT_ORG, user_id or DEFAULT_USER))
+    try:
+        yield
+    finally:
+        _tenant.reset(token)
+
+
+def current_tenant() -> Tuple[str, str]:
+    """(org, user) of the current request"""
+    return _tenant.get()
+
+
+class TokenBudgetExceeded(Exception):
+    """Raised when an org is over its token budget and the budget action is reject"""
+
+    def __init__(self, org: str, window: str, retry_after: float):
+        self.org = org
+        self.window = window
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"Token budget exceeded for org '{org}' ({window})")
+
+
+def _parse_org_budgets(spec: str) -> Dict[str, Tuple[int, int]]:
+    """Parse "orgA:60000/2000000,orgB:5000/0" into (per-minute, per-day) budgets; malformed entries are ignored"""
+    budgets = {}
+    for part in spec.split(","):
+        org, _, limits = part.strip().rpartition(":")
+        per_minute, _, per_day = limits.partition("/")
+        try:
+            if org:
+                budgets[org] = (int(per_minute or 0), int(per_day or 0))
+        except ValueError:
+            continue
+    return budgets
+
+
+def _utc_day(now: float) -> str:
+    return datetime.fromtimestamp(now, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+class TokenMeter:
+    """Per-org/user token accounting with per-org minute and day budgets."""
+
+    def __init__(self, per_minute: int = 0, per_day: int = 0,
+                 org_budgets: Optional[Dict[str, Tuple[int, int]]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.org_budgets = org_budgets or {}
+        self._clock = clock
+        self._minute: Dict[str, Tuple[int, int]] = {}   # org -> (minute index, tokens)
+        self._day: Dict[str, Tuple[str, int]] = {}      # org -> (UTC day, tokens)
+        self._pending: Dict[Tuple[str, str, str], list] = {}  # (day, org, user) -> [prompt, completion, calls]
+        self._unflushed: List[Tuple[str, List[Dict]]] = []  # (flush id, rollups) of flushes not yet applied
+        self._lock = threading.Lock()
+
+    def budgets(self, org: str) -> Tuple[int, int]:
+        """(per-minute, per-day) token budget for an org; 0 means unlimited"""
+        return self.org_budgets.get(org, (self.per_minute, self.per_day))
+
+    def record(self, prompt_tokens: int, completion_tokens: int,
+               org: Optional[str] = None, user: Optional[str] = None):
+        """Attribute one completion's tokens to org/user (the current tenant by default)"""
+        tenant_org, tenant_user = current_tenant()
+        org, user = org or tenant_org, user or tenant_user
+        LLM_TOKENS.labels(org=metric_org(org), kind="prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels(org=metric_org(org), kind="completion").inc(completion_tokens)
+
+        now = self._clock()
+        minute, day = int(now // 60), _utc_day(now)
+        total = prompt_tokens + completion_tokens
+        with self._lock:
+            window, used = self._minute.get(org, (minute, 0))
+            self._minute[org] = (minute, (used if window == minute else 0) + total)
+            window, used = self._day.get(org, (day, 0))
+            self._day[org] = (day, (used if window == day else 0) + total)
+            pending = self._pending.setdefault((day, org, user), [0, 0, 0])
+            pending[0] += prompt_tokens
+            pending[1] += completion_tokens
+            pending[2] += 1
+
+    def observe_latency(self, latency: float):
+        LLM_CALL_LATENCY.labels(org=metric_org(current_tenant()[0])).observe(latency)
+
+    def usage(self, org: str) -> Dict[str, int]:
+        """Tokens used by an org in the current minute and UTC day"""
+        now = self._clock()
+        with self._lock:
+            minute, minute_used = self._minute.get(org, (None, 0))
+            day, day_used = self._day.get(org, (None, 0))
+        return {
+            "minute": minute_used if minute == int(now // 60) else 0,
+            "day": day_used if day == _utc_day(now) else 0
+        }
+
+    def check(self, org: Optional[str]) -> Optional[str]:
+        """
+        Admission check against the org's token budgets.
+        Returns None to run normally or "degrade" for a heuristic-only result;
+        raises TokenBudgetExceeded when TOKEN_BUDGET_ACTION is reject.
+        """
+        org = org or DEFAULT_ORG
+        per_minute, per_day = self.budgets(org)
+        if not per_minute and not per_day:
+            return None
+
+        used = self.usage(org)
+        now = self._clock()
+        if per_day and used["day"] >= per_day:
+            window, retry_after = "day", 86400 - now % 86400
+        elif per_minute and used["minute"] >= per_minute:
+            window, retry_after = "minute", 60 - now % 60
+        else:
+            return None
+
+        action = settings.token_budget_action if settings.token_budget_action in BUDGET_ACTIONS else "reject"
+        TOKEN_BUDGET_EXCEEDED.labels(org=metric_org(org), window=window, action=action).inc()
+        logger.warning(f"Org {org} is over its per-{window} token budget, action={action}")
+        if action == "reject":
+            raise TokenBudgetExceeded(org, window, retry_after)
+        return action
+
+    def flush(self) -> int:
+        """Write pending usage to the MongoDB rollup; returns the number of rollups written"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            batches, self._unflushed = self._unflushed, []
+        if pending:
+            batches.append((uuid.uuid4().hex, [
+                {"day": day, "orgId": org, "userId": user,
+                 "promptTokens": counts[0], "completionTokens": counts[1], "calls": counts[2]}
+                for (day, org, user), counts in pending.items()
+            ]))
+
+        written = 0
+        for flush_id, rollups in batches:
+            failed = db_service.increment_token_usage(rollups, flush_id)
+            if failed is None:
+                failed = range(len(rollups))
+            written += len(rollups) - len(failed)
+            if failed:
+                # Retried under the same flush id, so rollups the server did apply are not counted again
+                with self._lock:
+                    self._unflushed.append((flush_id, [rollups[i] for i in failed]))
+                logger.warning(f"Token usage flush {flush_id[:8]} failed, {len(failed)} rollups kept for retry")
+        return written
+
+
+# Global token meter instance
+token_meter = TokenMeter(
+    per_minute=settings.org_token_budget_per_minute,
+    per_day=settings.org_token_budget_per_day,
+    org_budgets=_parse_org_budgets(settings.org_token_budgets)
+)
@@ -0,0 +1,149 @@
+"""
+Model Routing for LLM extraction
+
+Picks the model, endpoint and cue budget of each LLM extraction from the
+content's estimated token count and the tenant: short content goes to the
+cheapest and fastest route, long reports to the largest, and an org can be
+pinned to a route. With LLM_BACKEND=local every route is sent to the
+stand-in at LOCAL_LLM_BASE_URL (tests and load runs). Latency and token cost
+are exported per route so the thresholds can be tuned.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from prometheus_client import Counter, Histogram
+from app.config import settings
+from app.services.metering import current_tenant
+from app.utils.tokens import estimate_tokens
+
+ROUTE_NAMES = ("small", "medium", "large", "local")
+
+# Prometheus metrics
+ROUTE_REQUESTS = Counter(
+    'mme_model_route_requests_total',
+    'LLM extractions per model route',
+    ['route', 'model']
+)
+
+ROUTE_LATENCY = Histogram(
+    'mme_model_route_latency_seconds',
+    'LLM extraction latency per model route',
+    ['route'],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32)
+)
+
+ROUTE_COST = Counter(
+    'mme_model_route_cost_usd_total',
+    'Estimated LLM spend per model route',
+    ['route']
+)
+
+
+class ModelRoute:
+    """Model, endpoint and cue budget for one class of extraction."""
+
+    __slots__ = ("name", "model", "max_cues", "base_url")
+
+    def __init__(self, name: str, model: str, max_cues: int, base_url: Optional[str] = None):
+        self.name = name
+        self.model = model
+        self.max_cues = max_cues
+        self.base_url = base_url  # None for the default OpenAI endpoint
+
+    def __repr__(self):
+        return f"ModelRoute({self.name}, {self.model}, max_cues={self.max_cues})"
+
+
+def _parse_org_routes(spec: str) -> Dict[str, str]:
+    """Parse "orgA:large,orgB:local" into an org -> route map; unknown routes are ignored"""
+    routes = {}
+    for part in spec.split(","):
+        org, _, route = part.strip().rpartition(":")
+        if org and route in ROUTE_NAMES:
+            routes[org] = route
+    return routes
+
+
+def _parse_prices(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse "model:0.15/0.60" into USD per 1M (prompt, completion) tokens; malformed entries are ignored"""
+    prices = {}
+    for part in spec.split(","):
+        model, _, price = part.strip().rpartition(":")
+        prompt, _, completion = price.partition("/")
+        try:
+            if model:
+                prices[model] = (float(prompt), float(completion or prompt))
+        except ValueError:
+            continue
+    return prices
+
+
+# Route of the current extraction; None outside a routed extraction
+_current_route: ContextVar[Optional[ModelRoute]] = ContextVar("model_route", default=None)
+
+
+class ModelRouter:
+    """Chooses a ModelRoute per extraction and records per-route latency and cost."""
+
+    def __init__(self):
+        self.routes = {
+            "small": ModelRoute("small", settings.route_small_model, settings.route_small_max_cues),
+            "medium": ModelRoute("medium", settings.route_medium_model, settings.route_medium_max_cues),
+            "large": ModelRoute("large", settings.route_large_model, settings.route_large_max_cues),
+            "local": ModelRoute("local", settings.local_llm_model, settings.route_large_max_cues, settings.local_llm_base_url),
+        }
+        self.org_routes = _parse_org_routes(settings.route_org_overrides)
+        self.prices = _parse_prices(settings.model_prices)
+
+    def default_route(self) -> ModelRoute:
+        """Route used without content-based routing"""
+        return self.routes["local" if settings.llm_backend == "local" else "large"]
+
+    def select(self, content: str, org: Optional[str] = None) -> ModelRoute:
+        """Route for content on behalf of org (the current tenant by default)"""
+        if settings.llm_backend == "local" or not settings.model_routing_enabled:
+            return self.default_route()
+
+        pinned = self.org_routes.get(org or current_tenant()[0])
+        if pinned:
+            return self.routes[pinned]
+
+        tokens = estimate_tokens(content)
+        if tokens <= settings.route_small_max_tokens:
+            return self.routes["small"]
+        if tokens <= settings.route_medium_max_tokens:
+            return self.routes["medium"]
+        return self.routes["large"]
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Estimated USD cost of a call; 0 for models without a configured price"""
+        prompt_price, completion_price = self.prices.get(model, (0.0, 0.0))
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+    def observe(self, route: ModelRoute, latency: float, usage) -> float:
+        """Record one extraction on route; returns its estimated cost"""
+        cost = self.cost(route.model, usage.prompt_tokens, usage.completion_tokens)
+        ROUTE_REQUESTS.labels(route=route.name, model=route.model).inc()
+        ROUTE_LATENCY.labels(route=route.name).observe(latency)
+        ROUTE_COST.labels(route=route.name).inc(cost)
+        return cost
+
+
+@contextmanager
+def use_route(route: ModelRoute):
+    """Send the LLM extraction calls awaited inside the block to route"""
+    token = _current_route.set(route)
+    try:
+        yield route
+    finally:
+        _current_route.reset(token)
+
+
+def current_route() -> ModelRoute:
+    """Route of the current extraction; the default route when none was selected"""
+    return _current_route.get() or model_router.default_route()
+
+
+# Global model router instance
+model_router = ModelRouter()
@@ -0,0 +1,172 @@
+"""
+Content Pre-Compression before LLM extraction
+
+Agent output is full of text that costs input tokens without adding cues:
+repeated lines and paragraphs, whitespace runs, stack traces, base64/hex
+blobs, pasted JSON and long code blocks. compress() removes duplicates,
+collapses whitespace and replaces the bulky parts with short placeholders, so
+LLM calls are cheaper and faster and more real content fits under the
+single-call limit. Bytes and estimated tokens saved are reported per request.
+"""
+
+import re
+import json
+from typing import Set
+from prometheus_client import Counter, Histogram
+from loguru import logger
+from app.config import settings
+from app.utils.hashing import normalize_content
+from app.utils.tokens import estimate_tokens
+
+# Fenced code blocks longer than this many lines become a placeholder
+CODE_MAX_LINES = 8
+# Unbroken base64/hex/url-safe runs at least this long are treated as encoded blobs
+BLOB_MIN_CHARS = 80
+# Paragraphs this long that parse as JSON become a placeholder
+JSON_MIN_CHARS = 200
+# Shorter lines (braces, separators) are never dropped as duplicates
+DEDUPE_MIN_LINE_CHARS = 8
+
+_FENCED_CODE = re.compile(r'^[ \t]*```[^\n]*\n(.*?)^[ \t]*```[ \t]*$', re.M | re.S)
+_PY_TRACEBACK = re.compile(r'^Traceback \(most recent call last\):\n(?:[ \t]+[^\n]*\n?)+', re.M)
+_AT_FRAMES = re.compile(r'(?:^[ \t]+at [^\n]+\n?){3,}', re.M)
+_BLOB = re.compile(r'(?:data:[\w/+.-]+;base64,)?[A-Za-z0-9+/_-]{%d,}={0,2}' % BLOB_MIN_CHARS)
+_PARAGRAPH_SPLIT = re.compile(r'\n[ \t]*\n')
+_INLINE_WHITESPACE = re.compile(r'[ \t\f\v]+')
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+# Prometheus metrics
+PRECOMPRESSION_BYTES_SAVED = Counter(
+    'mme_precompression_bytes_saved_total',
+    'Bytes removed from LLM input by pre-compression'
+)
+
+PRECOMPRESSION_TOKENS_SAVED = Histogram(
+    'mme_precompression_tokens_saved',
+    'Estimated LLM input tokens saved by pre-compression per request',
+    buckets=(0, 10, 50, 100, 250, 500, 1000, 2500, 5000)
+)
+
+PRECOMPRESSION_REPLACEMENTS = Counter(
+    'mme_precompression_replacements_total',
+    'Content replaced or dropped by pre-compression',
+    ['kind']
+)
+
+
+class CompressionResult:
+    """Compressed text and what it saved."""
+
+    __slots__ = ("text", "original_bytes", "compressed_bytes", "tokens_saved")
+
+    def __init__(self, text: str, original: str):
+        self.text = text
+        self.original_bytes = len(original.encode("utf-8"))
+        self.compressed_bytes = len(text.encode("utf-8"))
+        self.tokens_saved = max(0, estimate_tokens(original) - estimate_tokens(text))
+
+    @property
+    def bytes_saved(self) -> int:
+        return max(0, self.original_bytes - self.compressed_bytes)
+
+
+def _replace_code_blocks(text: str) -> str:
+    def _placeholder(match):
+        lines = match.group(1).count("\n")
+        if lines <= CODE_MAX_LINES:
+            return match.group(0)
+        PRECOMPRESSION_REPLACEMENTS.labels(kind="code").inc()
+        return f"[code block: {lines} lines]"
+    return _FENCED_CODE.sub(_placeholder, text)
+
+
+def _replace_stack_traces(text: str) -> str:
+    def _traceback(match):
+        PRECOMPRESSION_REPLACEMENTS.labels(kind="stack_trace").inc()
+        return f"[stack trace: {match.group(0).count('File ')} frames]\n"
+
+    def _frames(match):
+        PRECOMPRESSION_REPLACEMENTS.labels(kind="stack_trace").inc()
+        return f"[stack trace: {match.group(0).count(chr(10))} frames]\n"
+
+    return _AT_FRAMES.sub(_frames, _PY_TRACEBACK.sub(_traceback, text))
+
+
+def _replace_json(paragraph: str) -> str:
+    stripped = paragraph.strip()
+    if len(stripped) < JSON_MIN_CHARS or stripped[0] not in "{[":
+        return paragraph
+    try:
+        value = json.loads(stripped)
+    except ValueError:
+        return paragraph
+    PRECOMPRESSION_REPLACEMENTS.labels(kind="json").inc()
+    if isinstance(value, dict):
+        return f"[json object: {', '.join(list(value)[:5])}]"
+    return f"[json array: {len(value)} items]"
+
+
+def _replace_blobs(text: str) -> str:
+    def _placeholder(match):
+        PRECOMPRESSION_REPLACEMENTS.labels(kind="blob").inc()
+        return f"[blob: {len(match.group(0))} chars]"
+    return _BLOB.sub(_placeholder, text)
+
+
+def _dedupe(paragraphs) -> list:
+    """Drop repeated paragraphs, then lines already seen earlier in the text"""
+    seen_paragraphs: Set[str] = set()
+    seen_lines: Set[str] = set()
+    kept = []
+    for paragraph in paragraphs:
+        key = normalize_content(paragraph)
+        if not key:
+            continue
+        if key in seen_paragraphs:
+            PRECOMPRESSION_REPLACEMENTS.labels(kind="duplicate_paragraph").inc()
+            continue
+        seen_paragraphs.add(key)
+
+        lines = []
+        for line in paragraph.split("\n"):
+            line_key = normalize_content(line)
+            if len(line_key) >= DEDUPE_MIN_LINE_CHARS:
+                if line_key in seen_lines:
+                    PRECOMPRESSION_REPLACEMENTS.labels(kind="duplicate_line").inc()
+                    continue
+                seen_lines.add(line_key)
+            lines.append(line)
+        if any(line.strip() for line in lines):
+            kept.append("\n".join(lines))
+    return kept
+
+
+def compress(content: str) -> CompressionResult:
+    """Pre-compress content for an LLM prompt"""
+    text = content.replace("\r\n", "\n")
+    text = _replace_code_blocks(text)
+    text = _replace_stack_traces(text)
+    paragraphs = [_replace_json(p) for p in _PARAGRAPH_SPLIT.split(text)]
+    paragraphs = [_replace_blobs(p) for p in paragraphs]
+    paragraphs = [
+        "\n".join(_INLINE_WHITESPACE.sub(" ", line).strip() for line in p.split("\n"))
+        for p in paragraphs
+    ]
+    text = _BLANK_LINES.sub("\n\n", "\n\n".join(_dedupe(paragraphs))).strip()
+    return CompressionResult(text, content)
+
+
+def precompress(content: str) -> str:
+    """compress() when PRECOMPRESSION_ENABLED, recording what it saved; content unchanged otherwise"""
+    if not settings.precompression_enabled:
+        return content
+    result = compress(content)
+    if not result.text:
+        # Nothing left but boilerplate; let the engines see the original
+        return content
+    PRECOMPRESSION_BYTES_SAVED.inc(result.bytes_saved)
+    PRECOMPRESSION_TOKENS_SAVED.observe(result.tokens_saved)
+    if result.bytes_saved:
+        logger.debug(f"Pre-compression saved {result.bytes_saved} bytes (~{result.tokens_saved} tokens) "
+                     f"of {result.original_bytes}")
+    return result.text
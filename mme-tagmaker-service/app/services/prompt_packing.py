@@ -0,0 +1,139 @@
+"""
+Multi-Document Prompt Packing
+
+Micro-batcher for bulk LLM work: small documents submitted within a short
+window (or until a token or document budget is reached) are packed into one
+prompt, so they share one system prompt and one completion round-trip. The
+pack function answers with a result per document ID; documents whose section
+is missing or unusable are retried alone with the single-document function.
+Packs are keyed by the caller (e.g. org and model) so unrelated work is
+never mixed into one prompt. The packed call runs in the context of the
+request that closed the pack. Once every waiter of a pack has gone, the pack
+is dropped before it is sent, or its call is cancelled.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from prometheus_client import Counter, Histogram
+from loguru import logger
+
+# Prometheus metrics
+PACK_DOCUMENTS = Histogram(
+    'mme_prompt_pack_documents',
+    'Documents per packed LLM call',
+    ['packer'],
+    buckets=(1, 2, 4, 8, 12, 16, 24, 32)
+)
+
+PACK_RETRIES = Counter(
+    'mme_prompt_pack_retries_total',
+    'Documents retried alone because their section of a packed response was unusable',
+    ['packer']
+)
+
+PackFn = Callable[[Dict[str, Any]], Awaitable[Dict[str, Optional[Any]]]]
+SingleFn = Callable[[Any], Awaitable[Any]]
+
+
+class _Pack:
+    __slots__ = ("items", "tokens", "timer", "waiters", "task")
+
+    def __init__(self):
+        self.items: Dict[str, tuple] = {}  # doc id -> (payload, future)
+        self.tokens = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.waiters = 0
+        self.task: Optional[asyncio.Task] = None
+
+
+class PromptPacker:
+    """Packs concurrent small documents per key into one LLM call."""
+
+    def __init__(self, name: str, pack: PackFn, single: SingleFn,
+                 max_tokens: int = 3000, max_docs: int = 16, window_seconds: float = 0.02):
+        self.name = name
+        self.pack = pack
+        self.single = single
+        self.max_tokens = max_tokens
+        self.max_docs = max(1, max_docs)
+        self.window_seconds = window_seconds
+        self._packs: Dict[Hashable, _Pack] = {}
+
+    async def submit(self, key: Hashable, payload: Any, tokens: int) -> Any:
+        """Add a document of about `tokens` tokens to the open pack for key and wait for its result"""
+        loop = asyncio.get_running_loop()
+        pack = self._packs.get(key)
+        if pack is not None and pack.tokens + tokens > self.max_tokens:
+            self._flush(key, pack)
+            pack = None
+        if pack is None:
+            pack = self._packs[key] = _Pack()
+            pack.timer = loop.call_later(self.window_seconds, self._flush, key, pack)
+
+        future = loop.create_future()
+        pack.items[f"d{len(pack.items) + 1}"] = (payload, future)
+        pack.tokens += tokens
+        pack.waiters += 1
+        if len(pack.items) >= self.max_docs or pack.tokens >= self.max_tokens:
+            self._flush(key, pack)
+
+        try:
+            # One waiter giving up must not cancel the shared call
+            return await asyncio.shield(future)
+        finally:
+            pack.waiters -= 1
+            if pack.waiters <= 0:
+                # Nobody is waiting for the pack's results any more
+                self._abandon(key, pack)
+
+    def _flush(self, key: Hashable, pack: _Pack):
+        if self._packs.get(key) is not pack:
+            return
+        del self._packs[key]
+        pack.timer.cancel()
+        pack.task = asyncio.ensure_future(self._run(pack))
+
+    def _abandon(self, key: Hashable, pack: _Pack):
+        if self._packs.get(key) is pack:
+            del self._packs[key]
+            pack.timer.cancel()
+        elif pack.task is not None and not pack.task.done():
+            pack.task.cancel()
+
+    async def _run(self, pack: _Pack):
+        docs = {doc_id: payload for doc_id, (payload, _) in pack.items.items()}
+        PACK_DOCUMENTS.labels(packer=self.name).observe(len(docs))
+        results: Dict[str, Optional[Any]] = {}
+        if len(docs) > 1:
+            try:
+                results = await self.pack(docs)
+            except Exception as e:
+                for _, future in pack.items.values():
+                    _resolve(future, error=e)
+                return
+
+        retry = [doc_id for doc_id in docs if results.get(doc_id) is None]
+        for doc_id, result in results.items():
+            if doc_id in pack.items and result is not None:
+                _resolve(pack.items[doc_id][1], result=result)
+        if retry and len(docs) > 1:
+            PACK_RETRIES.labels(packer=self.name).inc(len(retry))
+            logger.warning(f"{len(retry)}/{len(docs)} packed documents unusable, retrying them alone")
+
+        async def _single(doc_id: str):
+            payload, future = pack.items[doc_id]
+            try:
+                _resolve(future, result=await self.single(payload))
+            except Exception as e:
+                _resolve(future, error=e)
+
+        await asyncio.gather(*(_single(doc_id) for doc_id in retry))
+
+
+def _resolve(future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
@@ -0,0 +1,167 @@
+"""
+Priority Lanes and Per-Org Fair Queuing for LLM work
+
+Every LLM call runs in a lane: a priority class (interactive, save, bulk) and
+the orgId it is done for. Callers waiting for LLM capacity are served in strict
+class order; within a class, orgs share capacity by start-time weighted fair
+queuing, so one tenant's backfill cannot starve the others. Per-org metrics
+label only configured orgs; every other orgId is counted as "other".
+"""
+
+import heapq
+import itertools
+from functools import lru_cache
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, FrozenSet, Optional, Tuple
+from prometheus_client import Gauge, Histogram
+from app.config import settings
+
+# Priority classes, highest first
+PRIORITY_CLASSES = ("interactive", "save", "bulk")
+_CLASS_RANK = {name: rank for rank, name in enumerate(PRIORITY_CLASSES)}
+
+DEFAULT_ORG = "unknown"
+OTHER_ORG = "other"
+
+# Prometheus metrics
+SCHEDULER_QUEUE_WAIT = Histogram(
+    'mme_scheduler_queue_wait_seconds',
+    'Time LLM calls waited for capacity per priority class and org',
+    ['priority', 'org'],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+)
+
+SCHEDULER_QUEUE_DEPTH = Gauge(
+    'mme_scheduler_queue_depth',
+    'LLM calls waiting for capacity per priority class',
+    ['priority']
+)
+
+# Lane of the current request; work outside a request (shadow runs, jobs) counts as bulk
+_current_lane: ContextVar[Tuple[str, str]] = ContextVar("llm_lane", default=("bulk", DEFAULT_ORG))
+
+
+@contextmanager
+def request_lane(priority: str, org_id: Optional[str]):
+    """Run the LLM calls awaited inside the block (including child tasks) in the given lane"""
+    if priority not in _CLASS_RANK:
+        raise ValueError(f"Unknown priority class '{priority}'. Expected one of: {', '.join(PRIORITY_CLASSES)}")
+    token = _current_lane.set((priority, org_id or DEFAULT_ORG))
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def current_lane() -> Tuple[str, str]:
+    """(priority, org) of the current request"""
+    return _current_lane.get()
+
+
+def resolve_priority(route_default: str, requested: Optional[str] = None) -> str:
+    """A request may lower its route's priority class but never raise it"""
+    if requested is None:
+        return route_default
+    return max(route_default, requested, key=_CLASS_RANK.__getitem__)
+
+
+def _parse_org_weights(spec: str) -> Dict[str, float]:
+    """Parse "orgA:2,orgB:0.5" into a weight map; malformed entries are ignored"""
+    weights = {}
+    for part in spec.split(","):
+        org, _, weight = part.strip().rpartition(":")
+        try:
+            if org and float(weight) > 0:
+                weights[org] = float(weight)
+        except ValueError:
+            continue
+    return weights
+
+
+@lru_cache(maxsize=8)
+def _labelled_orgs(metric_orgs: str, org_weights: str, org_budgets: str) -> FrozenSet[str]:
+    orgs = {org.strip() for org in metric_orgs.split(",")}
+    orgs.update(_parse_org_weights(org_weights))
+    orgs.update(part.strip().rpartition(":")[0] for part in org_budgets.split(","))
+    orgs.discard("")
+    orgs.add(DEFAULT_ORG)
+    return frozenset(orgs)
+
+
+def metric_org(org: str) -> str:
+    """Prometheus label for an org: configured orgs keep their own, so client-supplied orgIds cannot grow cardinality"""
+    known = _labelled_orgs(settings.metric_orgs, settings.scheduler_org_weights, settings.org_token_budgets)
+    return org if org in known else OTHER_ORG
+
+
+class _QueueEntry:
+    __slots__ = ("item", "priority", "org", "start", "removed")
+
+    def __init__(self, item, priority: str, org: str, start: float):
+        self.item = item
+        self.priority = priority
+        self.org = org
+        self.start = start
+        self.removed = False
+
+
+class FairQueue:
+    """Strict-priority queue of classes, each served by start-time fair queuing over orgs."""
+
+    def __init__(self, org_weights: Optional[Dict[str, float]] = None):
+        self._org_weights = org_weights if org_weights is not None else _parse_org_weights(settings.scheduler_org_weights)
+        self._heap = []
+        self._seq = itertools.count()
+        self._virtual_time: Dict[str, float] = {name: 0.0 for name in PRIORITY_CLASSES}
+        self._last_finish: Dict[Tuple[str, str], float] = {}
+        self._depth: Dict[str, int] = {name: 0 for name in PRIORITY_CLASSES}
+
+    def __len__(self) -> int:
+        return sum(self._depth.values())
+
+    def depth(self, priority: str) -> int:
+        return self._depth[priority]
+
+    def depth_ahead_of(self, priority: str) -> int:
+        """Entries that would be served before a new entry of this class"""
+        rank = _CLASS_RANK[priority]
+        return sum(depth for name, depth in self._depth.items() if _CLASS_RANK[name] <= rank)
+
+    def push(self, item, priority: str, org: str) -> _QueueEntry:
+        """Queue an item; its start tag is the later of the class clock and the org's last finish"""
+        start = max(self._virtual_time[priority], self._last_finish.get((priority, org), 0.0))
+        self._last_finish[(priority, org)] = start + 1.0 / self._org_weights.get(org, 1.0)
+
+        entry = _QueueEntry(item, priority, org, start)
+        heapq.heappush(self._heap, (_CLASS_RANK[priority], start, next(self._seq), entry))
+        self._set_depth(priority, 1)
+        return entry
+
+    def pop(self) -> Optional[_QueueEntry]:
+        """Next entry to serve, or None when empty"""
+        while self._heap:
+            _, start, _, entry = heapq.heappop(self._heap)
+            if entry.removed:
+                continue
+            entry.removed = True
+            self._virtual_time[entry.priority] = max(self._virtual_time[entry.priority], start)
+            self._set_depth(entry.priority, -1)
+            return entry
+        return None
+
+    def remove(self, entry: _QueueEntry):
+        """Drop a queued entry (e.g. its caller was cancelled)"""
+        if not entry.removed:
+            entry.removed = True
+            self._set_depth(entry.priority, -1)
+
+    def _set_depth(self, priority: str, delta: int):
+        self._depth[priority] += delta
+        SCHEDULER_QUEUE_DEPTH.labels(priority=priority).set(self._depth[priority])
+        if not self._depth[priority]:
+            # Idle class: no backlog left to be fair against
+            self._last_finish = {lane: finish for lane, finish in self._last_finish.items() if lane[0] != priority}
+
+    def status(self) -> Dict[str, int]:
+        return dict(self._depth)
@@ -0,0 +1,163 @@
+"""
+Session-Incremental Extraction
+
+Conversational agents re-send the whole growing transcript every turn. For
+requests with a sessionId, the store remembers the length and hash of the
+content already processed and the tags it produced. When the next turn starts
+with that prefix, only the new suffix is extracted and its tags are merged
+into the session's, so per-turn cost follows the new content rather than the
+transcript length. Sessions live in an in-process LRU with TTL expiry and
+are keyed by org as well, so tenants never share state.
+"""
+
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional
+from prometheus_client import Counter, Gauge
+from loguru import logger
+from app.config import settings
+from app.models.extraction import ExtractionOutcome
+from app.models.tag import Tag
+from app.services.llm_tagger import select_primary_tag, tag_cues
+from app.services.metering import current_tenant
+
+# Shorter suffixes ("ok, thanks") are not extracted on their own; they stay unseen until the next turn
+MIN_SUFFIX_CHARS = 16
+
+# Prometheus metrics
+SESSION_EXTRACTIONS = Counter(
+    'mme_session_extractions_total',
+    'Session extractions by how much of the content was extracted',
+    ['result']
+)
+
+SESSION_CHARS_SKIPPED = Counter(
+    'mme_session_prefix_chars_skipped_total',
+    'Transcript characters not re-extracted because the session had already seen them'
+)
+
+SESSION_ENTRIES = Gauge(
+    'mme_session_entries',
+    'Sessions currently held by the session extraction store'
+)
+
+Extractor = Callable[[str], Awaitable[ExtractionOutcome]]
+
+
+def _prefix_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class _SessionState:
+    __slots__ = ("prefix_len", "prefix_hash", "outcome", "expires_at")
+
+    def __init__(self, content: str, outcome: ExtractionOutcome, expires_at: float):
+        self.prefix_len = len(content)
+        self.prefix_hash = _prefix_hash(content)
+        self.outcome = outcome.model_copy(deep=True)
+        self.expires_at = expires_at
+
+
+def merge_session_tags(previous: List[Tag], new: List[Tag], max_cues: int) -> List[Tag]:
+    """
+    Session tags followed by the suffix's tags; a repeated label keeps one tag
+    with its usage counted. Over max_cues, the oldest tags are dropped.
+    """
+    merged = {tag.label: tag.model_copy(deep=True) for tag in previous}
+    for tag in new:
+        old = merged.pop(tag.label, None)
+        if old is not None:
+            tag = tag.model_copy(update={"usageCount": old.usageCount + tag.usageCount})
+        merged[tag.label] = tag
+    return list(merged.values())[-max_cues:]
+
+
+class SessionStore:
+    """Thread-safe LRU of per-session extraction state with TTL expiry."""
+
+    def __init__(self, max_sessions: int = 5000, ttl_seconds: float = 1800):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, _SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[_SessionState]:
+        with self._lock:
+            state = self._sessions.get(key)
+            if state is None:
+                return None
+            if state.expires_at <= time.monotonic():
+                del self._sessions[key]
+                SESSION_ENTRIES.set(len(self._sessions))
+                return None
+            self._sessions.move_to_end(key)
+            return state
+
+    def _set(self, key: str, content: str, outcome: ExtractionOutcome):
+        state = _SessionState(content, outcome, time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            self._sessions[key] = state
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            SESSION_ENTRIES.set(len(self._sessions))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def extract(self, session_id: str, content: str, max_cues: int, mode: str,
+                      extractor: Extractor) -> ExtractionOutcome:
+        """
+        Extract content for a session turn with extractor(text), running it only
+        on the part of content the session has not seen yet.
+        """
+        key = f"{current_tenant()[0]}:{mode}:{max_cues}:{session_id}"
+        state = self._get(key)
+
+        if state is None or len(content) < state.prefix_len or \
+                _prefix_hash(content[:state.prefix_len]) != state.prefix_hash:
+            outcome = await extractor(content)
+            SESSION_EXTRACTIONS.labels(result="full").inc()
+            self._set(key, content, outcome)
+            return outcome
+
+        suffix = content[state.prefix_len:]
+        SESSION_CHARS_SKIPPED.inc(state.prefix_len)
+        if not suffix.strip():
+            SESSION_EXTRACTIONS.labels(result="unchanged").inc()
+            return state.outcome.model_copy(deep=True)
+        if len(suffix.strip()) < MIN_SUFFIX_CHARS:
+            SESSION_EXTRACTIONS.labels(result="short_suffix").inc()
+            return state.outcome.model_copy(deep=True)
+
+        try:
+            new = await extractor(suffix)
+        except ValueError as e:
+            # Nothing extractable in the new turn; the session's tags still stand and the
+            # suffix is retried as part of the next turn's
+            logger.debug(f"Session suffix extraction failed, keeping previous tags: {e}")
+            SESSION_EXTRACTIONS.labels(result="suffix_failed").inc()
+            return state.outcome.model_copy(deep=True)
+        SESSION_EXTRACTIONS.labels(result="incremental").inc()
+        previous = state.outcome
+        tags = merge_session_tags(previous.tags, new.tags, max_cues)
+        total = len(previous.tags) + len(new.tags)
+        confidence = (previous.confidence * len(previous.tags) + new.confidence * len(new.tags)) / total if total else new.confidence
+        outcome = ExtractionOutcome(
+            tags=tags,
+            confidence=confidence,
+            primary_tag=select_primary_tag(tag_cues(tags), content) if tags else new.primary_tag,
+            engine=new.engine,
+            escalated=new.escalated
+        )
+        self._set(key, content, outcome)
+        return outcome
+
+
+# Global session store instance
+session_store = SessionStore(
+    max_sessions=settings.session_max_entries,
+    ttl_seconds=settings.session_ttl_seconds
+)
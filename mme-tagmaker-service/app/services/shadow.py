@@ -0,0 +1,168 @@
+"""
+Shadow-Mode Engine Comparison
+
+Runs a sampled share of production extractions through the alternate engine
+in the background and compares it with the engine that served the request:
+latency, token usage, cue overlap (Jaccard over tag labels) and primary-tag
+agreement. Results go to Prometheus and to an in-memory rolling summary.
+"""
+
+import time
+import random
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional
+from prometheus_client import Counter, Histogram
+from loguru import logger
+from app.config import settings
+from app.services.llm_client import TokenUsage, track_usage
+
+# Prometheus metrics
+ENGINE_LATENCY = Histogram(
+    'mme_engine_latency_seconds',
+    'Extraction latency per engine',
+    ['engine', 'role'],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32)
+)
+
+ENGINE_TOKENS = Counter(
+    'mme_engine_tokens_total',
+    'LLM tokens used per engine',
+    ['engine', 'role', 'kind']
+)
+
+SHADOW_CUE_JACCARD = Histogram(
+    'mme_shadow_cue_jaccard',
+    'Jaccard overlap of tag labels between primary and shadow engine',
+    ['primary', 'shadow'],
+    buckets=(0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+)
+
+SHADOW_PRIMARY_AGREEMENT = Counter(
+    'mme_shadow_primary_tag_agreement_total',
+    'Shadow comparisons by whether both engines chose the same primary tag',
+    ['primary', 'shadow', 'agree']
+)
+
+SHADOW_RUNS = Counter(
+    'mme_shadow_runs_total',
+    'Shadow extraction runs by outcome',
+    ['shadow', 'status']
+)
+
+EngineRunner = Callable[[str, int], Awaitable[tuple]]
+
+
+def jaccard(a: List[str], b: List[str]) -> float:
+    """Jaccard similarity of two label collections"""
+    set_a, set_b = set(a), set(b)
+    if not set_a and not set_b:
+        return 1.0
+    return len(set_a & set_b) / len(set_a | set_b)
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 4)
+
+
+class ShadowComparator:
+    """Samples requests for shadow runs and keeps a rolling comparison summary."""
+
+    def __init__(self, window: int = 1000):
+        self._latencies: Dict[str, deque] = {}
+        self._tokens: Dict[str, deque] = {}
+        self._comparisons: deque = deque(maxlen=window)
+        self._window = window
+        self._lock = threading.Lock()
+        self._inflight = set()
+
+    def record_engine(self, engine: str, role: str, latency: float, usage: TokenUsage):
+        """Record latency and token usage for one engine run"""
+        ENGINE_LATENCY.labels(engine=engine, role=role).observe(latency)
+        ENGINE_TOKENS.labels(engine=engine, role=role, kind="prompt").inc(usage.prompt_tokens)
+        ENGINE_TOKENS.labels(engine=engine, role=role, kind="completion").inc(usage.completion_tokens)
+        with self._lock:
+            self._latencies.setdefault(engine, deque(maxlen=self._window)).append(latency)
+            self._tokens.setdefault(engine, deque(maxlen=self._window)).append(usage.total_tokens)
+
+    def should_sample(self) -> bool:
+        """Sampling decision, bounded by the max number of in-flight shadow runs"""
+        rate = settings.shadow_sample_rate
+        if rate <= 0 or len(self._inflight) >= settings.shadow_max_inflight:
+            return False
+        return random.random() < rate
+
+    def schedule(self, primary_engine: str, shadow_engine: str, runner: EngineRunner,
+                 content: str, max_cues: int, primary_labels: List[str], primary_tag: str):
+        """Run the shadow engine in the background; never affects the request"""
+        # Fresh context so shadow tokens aren't attributed to the request's usage scopes
+        task = asyncio.get_running_loop().create_task(
+            self._run(primary_engine, shadow_engine, runner, content, max_cues, primary_labels, primary_tag),
+            context=contextvars.Context()
+        )
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run(self, primary_engine: str, shadow_engine: str, runner: EngineRunner,
+                   content: str, max_cues: int, primary_labels: List[str], primary_tag: str):
+        start = time.perf_counter()
+        try:
+            with track_usage() as usage:
+                tags, _, shadow_primary = await runner(content, max_cues)
+        except Exception as e:
+            SHADOW_RUNS.labels(shadow=shadow_engine, status="error").inc()
+            logger.warning(f"Shadow extraction with {shadow_engine} failed: {str(e)}")
+            return
+
+        latency = time.perf_counter() - start
+        self.record_engine(shadow_engine, "shadow", latency, usage)
+        SHADOW_RUNS.labels(shadow=shadow_engine, status="ok").inc()
+
+        overlap = jaccard(primary_labels, [tag.label for tag in tags])
+        agree = primary_tag == shadow_primary
+        SHADOW_CUE_JACCARD.labels(primary=primary_engine, shadow=shadow_engine).observe(overlap)
+        SHADOW_PRIMARY_AGREEMENT.labels(primary=primary_engine, shadow=shadow_engine, agree=str(agree).lower()).inc()
+
+        with self._lock:
+            self._comparisons.append({
+                "primary": primary_engine,
+                "shadow": shadow_engine,
+                "jaccard": overlap,
+                "agree": agree
+            })
+
+    def summary(self) -> Dict:
+        """Rolling summary of engine latency, tokens and agreement"""
+        with self._lock:
+            engines = {}
+            for engine, latencies in self._latencies.items():
+                values = list(latencies)
+                tokens = list(self._tokens.get(engine, []))
+                engines[engine] = {
+                    "samples": len(values),
+                    "latency_p50_seconds": _percentile(values, 50),
+                    "latency_p90_seconds": _percentile(values, 90),
+                    "latency_p99_seconds": _percentile(values, 99),
+                    "avg_tokens": round(sum(tokens) / len(tokens), 1) if tokens else None
+                }
+
+            comparisons = list(self._comparisons)
+
+        return {
+            "primary_engine": settings.extraction_engine,
+            "shadow_sample_rate": settings.shadow_sample_rate,
+            "engines": engines,
+            "comparisons": len(comparisons),
+            "mean_cue_jaccard": round(sum(c["jaccard"] for c in comparisons) / len(comparisons), 3) if comparisons else None,
+            "primary_tag_agreement": round(sum(1 for c in comparisons if c["agree"]) / len(comparisons), 3) if comparisons else None
+        }
+
+
+# Global comparator instance
+shadow_comparator = ShadowComparator()
@@ -0,0 +1,105 @@
+"""
+Single-flight request coalescing
+
+Concurrent callers asking for the same key share one in-flight coroutine and
+all receive its result (or exception) instead of each starting their own call.
+"""
+
+import asyncio
+import contextvars
+from typing import Awaitable, Callable, Dict, TypeVar
+from prometheus_client import Counter, Gauge
+from app.services import deadline
+
+T = TypeVar("T")
+
+# Prometheus metrics
+COALESCED_WAITERS_TOTAL = Counter(
+    'mme_singleflight_coalesced_total',
+    'Total number of callers that joined an in-flight call instead of starting one',
+    ['operation']
+)
+
+INFLIGHT_CALLS = Gauge(
+    'mme_singleflight_inflight_calls',
+    'Number of distinct in-flight calls',
+    ['operation']
+)
+
+
+class SingleFlight:
+    """De-duplicates concurrent async calls by key.
+
+    The shared call runs as its own task, so a caller being cancelled (e.g. a
+    client disconnect or an expired deadline) does not cancel the call for the
+    other waiters. Once every waiter has gone, the call is cancelled.
+
+    The call runs under the latest request deadline among its callers: it
+    starts with the first caller's and is extended (or lifted) as callers with
+    a later deadline (or none) join, so its stages still derive their timeouts
+    from the deadline but a short one cannot fail callers willing to wait
+    longer. Each caller also applies its own deadline while waiting.
+    """
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self._contexts: Dict[asyncio.Task, contextvars.Context] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn once per key at a time; concurrent callers await the same result."""
+        task = self._calls.get(key)
+        if task is not None:
+            COALESCED_WAITERS_TOTAL.labels(operation=self.operation).inc()
+            self._extend_deadline(task)
+        else:
+            context = contextvars.copy_context()
+            task = asyncio.get_running_loop().create_task(fn(), context=context)
+            self._calls[key] = task
+            self._contexts[task] = context
+            INFLIGHT_CALLS.labels(operation=self.operation).inc()
+            task.add_done_callback(lambda t, k=key: self._finish(k, t))
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            left = deadline.remaining()
+            if left is None:
+                return await asyncio.shield(task)
+            try:
+                return await asyncio.wait_for(asyncio.shield(task), max(0.0, left))
+            except asyncio.TimeoutError:
+                if task.done():
+                    raise
+                deadline.DEADLINE_EXCEEDED.labels(stage=self.operation).inc()
+                raise deadline.DeadlineExceeded(self.operation)
+        finally:
+            self._waiters[task] = self._waiters.get(task, 1) - 1
+            if self._waiters[task] <= 0 and not task.done():
+                # Nobody is waiting for the result any more
+                task.cancel()
+
+    def _extend_deadline(self, task: asyncio.Task):
+        """Give the shared call the joining caller's deadline if it is later"""
+        context = self._contexts.get(task)
+        if context is None:
+            return
+        shared = context.run(deadline.absolute)
+        joining = deadline.absolute()
+        if shared is not None and (joining is None or joining > shared):
+            # The call's task is suspended while this caller runs, so its context can be entered
+            context.run(deadline.set_absolute, joining)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        self._waiters.pop(task, None)
+        self._contexts.pop(task, None)
+        INFLIGHT_CALLS.labels(operation=self.operation).dec()
+        # Mark the exception retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def inflight(self) -> int:
+        """Number of distinct keys currently in flight."""
+        return len(self._calls)
@@ -0,0 +1,116 @@
+"""
+Per-Stage Pipeline Timing
+
+The HTTP instrumentator only sees whole requests. The extraction and save
+pipeline is timed per stage instead: admission, cache lookup,
+pre-compression, LLM wait, JSON parsing, post-processing (concept
+extraction, sections, primary tag), heuristics, build_delta and the
+post_delta hop. Each stage is observed in a histogram labeled by stage,
+engine and HTTP route. Content size and cue count per extraction go
+alongside. The durations of a request are also collected in a contextvar,
+so the route can return them in a Server-Timing header. Stages that run
+concurrently (chunks, batch items) are summed.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from prometheus_client import Histogram
+from app.config import settings
+
+# Engine label for stages outside any extraction engine
+NO_ENGINE = "none"
+# Route label for stages run outside an HTTP request (e.g. scheduled jobs)
+NO_ROUTE = "none"
+
+# Prometheus metrics
+STAGE_SECONDS = Histogram(
+    'mme_pipeline_stage_seconds',
+    'Time spent per extraction/save pipeline stage',
+    ['stage', 'engine', 'route'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+CONTENT_BYTES = Histogram(
+    'mme_extraction_content_bytes',
+    'Size of content submitted for extraction',
+    ['engine', 'route'],
+    buckets=(100, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000)
+)
+
+CUE_COUNT = Histogram(
+    'mme_extraction_cues',
+    'Tags returned per extraction',
+    ['engine', 'route'],
+    buckets=(0, 1, 2, 3, 5, 8, 10, 15, 20, 30)
+)
+
+
+class StageTimings:
+    """Stage durations (seconds) collected for one request."""
+
+    __slots__ = ("route", "stages")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.stages: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def header(self) -> str:
+        """Server-Timing header value, durations in milliseconds"""
+        return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.stages.items())
+
+
+_current_timings: ContextVar[Optional[StageTimings]] = ContextVar("stage_timings", default=None)
+
+
+@contextmanager
+def request_timing(route: str):
+    """Collect stage timings for the request on route; yields the StageTimings"""
+    timings = StageTimings(route)
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def current_timings() -> Optional[StageTimings]:
+    """Timings of the request being served, if any"""
+    return _current_timings.get()
+
+
+def _route() -> str:
+    timings = _current_timings.get()
+    return timings.route if timings else NO_ROUTE
+
+
+@contextmanager
+def timed_stage(stage: str, engine: str = NO_ENGINE):
+    """Time the block as one pipeline stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage=stage, engine=engine, route=_route()).observe(elapsed)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add(stage, elapsed)
+
+
+def observe_extraction(content: str, cues: int, engine: str):
+    """Record content size and tag count of one finished extraction"""
+    route = _route()
+    CONTENT_BYTES.labels(engine=engine, route=route).observe(len(content.encode("utf-8")))
+    CUE_COUNT.labels(engine=engine, route=route).observe(cues)
+
+
+def server_timing_header(timings: StageTimings) -> Optional[str]:
+    """Server-Timing value when SERVER_TIMING_ENABLED and any stage ran"""
+    if not settings.server_timing_enabled or not timings.stages:
+        return None
+    return timings.header()
@@ -0,0 +1,71 @@
+"""
+Incremental parser for streamed extraction completions
+
+Consumes the `{"cues": [...], "confidence": 0.95}` JSON object piece by piece
+as it is streamed from the LLM and emits each cue string as soon as its
+closing quote arrives.
+"""
+
+import re
+import json
+from typing import List, Optional
+
+_CUES_ARRAY_START = re.compile(r'"cues"\s*:\s*\[')
+_CONFIDENCE = re.compile(r'"confidence"\s*:\s*([0-9.]+)')
+
+
+class CueStreamParser:
+    """State machine over the streamed text that extracts completed cues."""
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0            # next unscanned index into buffer
+        self._in_array = False
+        self._array_done = False
+        self._string_start: Optional[int] = None
+        self._escaped = False
+
+    def feed(self, text: str) -> List[str]:
+        """Append streamed text and return any cues completed by it."""
+        self.buffer += text
+        cues = []
+
+        if not self._in_array and not self._array_done:
+            match = _CUES_ARRAY_START.search(self.buffer)
+            if not match:
+                return cues
+            self._in_array = True
+            self._pos = match.end()
+
+        while self._in_array and self._pos < len(self.buffer):
+            char = self.buffer[self._pos]
+
+            if self._string_start is not None:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    raw = self.buffer[self._string_start:self._pos + 1]
+                    self._string_start = None
+                    try:
+                        cues.append(json.loads(raw))
+                    except json.JSONDecodeError:
+                        pass
+            elif char == '"':
+                self._string_start = self._pos
+            elif char == "]":
+                self._in_array = False
+                self._array_done = True
+
+            self._pos += 1
+
+        return cues
+
+    def confidence(self, default: float = 0.95) -> float:
+        """Confidence from the complete response, once streaming has finished."""
+        try:
+            return float(json.loads(self.buffer).get("confidence", default))
+        except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+            match = _CONFIDENCE.search(self.buffer)
+            return float(match.group(1)) if match else default
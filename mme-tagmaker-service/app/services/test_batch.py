@@ -0,0 +1,130 @@
+"""
+Unit tests for batch execution and the batch extraction routes.
+"""
+
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from app import router as router_module
+from app.models.extraction import ExtractionOutcome
+from app.models.tag import Tag
+from app.services.batch import run_batch
+from app.utils import fast_json
+
+
+class TestRunBatch:
+    """Tests for ordering, per-item errors and bounded concurrency."""
+
+    @pytest.mark.asyncio
+    async def test_results_keep_input_order(self):
+        async def handler(delay):
+            # Later items finish first
+            await asyncio.sleep(delay)
+            return {"delay": delay}
+
+        result = await run_batch([0.03, 0.02, 0.01, 0.0], handler, 4, "test")
+
+        assert [r["index"] for r in result["results"]] == [0, 1, 2, 3]
+        assert [r["delay"] for r in result["results"]] == [0.03, 0.02, 0.01, 0.0]
+        assert (result["total"], result["succeeded"], result["failed"]) == (4, 4, 0)
+
+    @pytest.mark.asyncio
+    async def test_failing_items_are_reported_per_item(self):
+        async def handler(item):
+            if item == "empty":
+                raise HTTPException(400, "No extractable content found")
+            if item == "boom":
+                raise RuntimeError("LLM unavailable")
+            return {"item": item}
+
+        result = await run_batch(["a", "empty", "boom", "b"], handler, 2, "test")
+
+        assert [r["status"] for r in result["results"]] == ["ok", "error", "error", "ok"]
+        assert result["results"][1]["error"] == {"code": 400, "detail": "No extractable content found"}
+        assert result["results"][2]["error"]["code"] == 500
+        assert (result["succeeded"], result["failed"]) == (2, 2)
+
+    @pytest.mark.asyncio
+    async def test_concurrency_never_exceeds_limit(self):
+        in_flight = peak = 0
+
+        async def handler(item):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.005)
+            in_flight -= 1
+            return {}
+
+        await run_batch(list(range(20)), handler, 3, "test")
+
+        assert peak == 3
+
+
+class TestBatchRoutes:
+    """Tests for the /extract-tags/batch route."""
+
+    @pytest.fixture
+    def peak(self):
+        return {"in_flight": 0, "max": 0}
+
+    @pytest.fixture
+    def client(self, monkeypatch, peak):
+        async def fake_extract(content, **kwargs):
+            peak["in_flight"] += 1
+            peak["max"] = max(peak["max"], peak["in_flight"])
+            await asyncio.sleep(0.005)
+            peak["in_flight"] -= 1
+            tags = [] if content.startswith("Nothing") else [Tag(label=content.split()[0].lower(), usageCount=1)]
+            return ExtractionOutcome(tags=tags, confidence=0.9, primary_tag=tags[0].label if tags else "", engine="llm")
+
+        monkeypatch.setattr(router_module, "extract", fake_extract)
+        monkeypatch.setattr(router_module.settings, "batch_max_items", 3)
+        monkeypatch.setattr(router_module.settings, "batch_max_concurrency", 2)
+        app = FastAPI()
+        app.include_router(router_module.router)
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    @pytest.mark.asyncio
+    async def test_batch_reports_items_in_order(self, client):
+        items = [{"content": text, "userId": "u1"} for text in ("Budget approved", "Nothing here", "Audit booked")]
+        async with client:
+            resp = await client.post("/extract-tags/batch", json={"items": items})
+
+        body = resp.json()
+        assert resp.status_code == 200
+        assert [r["status"] for r in body["results"]] == ["ok", "error", "ok"]
+        assert [r["primary_tag"] for r in body["results"] if r["status"] == "ok"] == ["budget", "audit"]
+        assert body["results"][1]["error"]["code"] == 400
+
+    @pytest.mark.asyncio
+    async def test_requested_concurrency_is_capped_by_service_limit(self, client, peak):
+        items = [{"content": f"Budget {i} approved", "userId": "u1"} for i in range(3)]
+        async with client:
+            resp = await client.post("/extract-tags/batch", json={"items": items, "concurrency": 10})
+
+        assert resp.json()["succeeded"] == 3
+        assert peak["max"] == 2
+
+    @pytest.mark.asyncio
+    async def test_oversized_batch_is_rejected(self, client):
+        items = [{"content": "Budget approved", "userId": "u1"}] * 4
+        async with client:
+            resp = await client.post("/extract-tags/batch", json={"items": items})
+
+        assert resp.status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_default_encoding_when_fast_json_disabled(self, client, monkeypatch):
+        def no_orjson(obj):
+            raise AssertionError("orjson path used")
+
+        monkeypatch.setattr(router_module.settings, "fast_json_responses", False)
+        monkeypatch.setattr(router_module, "dumps", no_orjson)
+        monkeypatch.setattr(fast_json, "dumps", no_orjson)
+        async with client:
+            resp = await client.post("/extract-tags/batch", json={"items": [{"content": "Budget approved", "userId": "u1"}]})
+
+        assert resp.status_code == 200
+        assert resp.json()["succeeded"] == 1
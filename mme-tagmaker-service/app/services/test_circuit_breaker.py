@@ -0,0 +1,102 @@
+"""
+Unit tests for the LLM circuit breaker and heuristic fallback.
+"""
+
+import time
+import asyncio
+import openai
+import pytest
+from app.services import llm_client
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.extraction_engine import extract
+
+CONTENT = "The IRAP submission deadline is March 3. Budget approved for the pilot."
+
+
+class TestCircuitBreaker:
+    """Tests for breaker state transitions."""
+
+    def test_trips_after_consecutive_failures(self):
+        breaker = CircuitBreaker("t", failure_threshold=3, reset_seconds=60)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.rejecting()
+        with pytest.raises(CircuitOpenError):
+            breaker.acquire()
+
+    def test_half_open_allows_single_probe(self):
+        breaker = CircuitBreaker("t", failure_threshold=1, reset_seconds=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+
+        assert breaker.state == "half_open"
+        assert breaker.acquire() is True
+        assert breaker.rejecting()
+        with pytest.raises(CircuitOpenError):
+            breaker.acquire()
+
+        breaker.record_success(probe=True)
+        assert breaker.state == "closed"
+        assert breaker.acquire() is False
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker("t", failure_threshold=1, reset_seconds=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+
+        probe = breaker.acquire()
+        breaker.record_failure(probe)
+        assert breaker.state == "open"
+
+
+class TestBreakerAgainstStandin:
+    """Breaker and heuristic fallback against the failure-injecting stand-in server."""
+
+    @pytest.mark.asyncio
+    async def test_provider_failures_trip_and_probe_recovers(self, standin_llm):
+        standin_llm.script = [(0.0, 500)] * 3
+
+        for _ in range(3):
+            with pytest.raises(openai.InternalServerError):
+                await llm_client.create_chat_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "x"}])
+        assert llm_client.llm_breaker.state == "open"
+
+        # Open: the extraction engine answers from the heuristics without calling the provider
+        outcome = await extract(CONTENT, use_cache=False, mode="llm")
+        assert outcome.engine == "heuristic"
+        assert outcome.tags
+        assert standin_llm.requests == 3
+
+        # After the reset timeout one probe goes through; its success closes the circuit
+        await asyncio.sleep(0.15)
+        outcome = await extract(CONTENT, use_cache=False, mode="llm")
+        assert outcome.engine == "llm"
+        assert llm_client.llm_breaker.state == "closed"
+        assert standin_llm.requests == 4
+
+    @pytest.mark.asyncio
+    async def test_slow_provider_timeouts_count_as_failures(self, standin_llm):
+        standin_llm.script = [(0.2, 200)] * 3
+
+        for _ in range(3):
+            with pytest.raises(openai.APITimeoutError):
+                await llm_client.create_chat_completion(
+                    model="gpt-4o-mini", messages=[{"role": "user", "content": "x"}], timeout=0.05
+                )
+        assert llm_client.llm_breaker.state == "open"
+
+    @pytest.mark.asyncio
+    async def test_rate_limits_do_not_trip(self, standin_llm):
+        standin_llm.script = [(0.0, 429)] * 4
+
+        for _ in range(4):
+            with pytest.raises(openai.RateLimitError):
+                await llm_client.create_chat_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "x"}])
+        assert llm_client.llm_breaker.state == "closed"
@@ -0,0 +1,171 @@
+"""
+Unit tests for the adaptive LLM concurrency limiter.
+"""
+
+import asyncio
+import httpx
+import openai
+import pytest
+from app.services import llm_client
+from app.services.concurrency import AdaptiveLimiter
+
+
+class TestAdaptiveLimiter:
+    """Tests for AIMD limit adaptation and queueing."""
+
+    @pytest.mark.asyncio
+    async def test_limit_grows_while_latency_is_stable(self):
+        limiter = AdaptiveLimiter(initial_limit=2, max_limit=10)
+        for _ in range(20):
+            await limiter.acquire()
+            limiter.release(latency=0.1)
+
+        assert limiter.limit > 2
+
+    @pytest.mark.asyncio
+    async def test_limit_stops_growing_when_latency_degrades(self):
+        limiter = AdaptiveLimiter(initial_limit=4, max_limit=10, latency_tolerance=2.0)
+        await limiter.acquire()
+        limiter.release(latency=0.1)
+        for _ in range(8):
+            await limiter.acquire()
+            limiter.release(latency=5.0)
+
+        assert limiter.limit == 4
+
+    @pytest.mark.asyncio
+    async def test_overload_shrinks_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=10, min_limit=2, backoff_ratio=0.5)
+        await limiter.acquire()
+        limiter.release(overload="rate_limited")
+        assert limiter.limit == 5
+
+        for _ in range(5):
+            await limiter.acquire()
+            limiter.release(overload="timeout")
+        assert limiter.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_callers_beyond_limit_queue_in_order(self):
+        limiter = AdaptiveLimiter(initial_limit=1)
+        order = []
+
+        async def call(i):
+            await limiter.acquire()
+            order.append(i)
+            await asyncio.sleep(0.01)
+            limiter.release(latency=0.01)
+
+        tasks = [asyncio.ensure_future(call(i)) for i in range(4)]
+        await asyncio.sleep(0)
+        assert limiter.inflight == 1
+        assert limiter.queue_depth == 3
+
+        await asyncio.gather(*tasks)
+        assert order == [0, 1, 2, 3]
+        assert limiter.inflight == 0
+        assert limiter.queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_new_calls(self):
+        limiter = AdaptiveLimiter(initial_limit=4)
+        await limiter.acquire()
+        limiter.release(overload="rate_limited", retry_after=0.05)
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await limiter.acquire()
+        assert loop.time() - start >= 0.04
+        limiter.release(latency=0.01)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        limiter = AdaptiveLimiter(initial_limit=1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert limiter.queue_depth == 0
+        limiter.release(latency=0.01)
+        assert limiter.inflight == 0
+
+
+def _rate_limit_error(headers):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+class TestCreateChatCompletion:
+    """Tests for limiter-aware retries in the shared client."""
+
+    @pytest.fixture
+    def fake_client(self, monkeypatch):
+        limiter = AdaptiveLimiter(initial_limit=4)
+        monkeypatch.setattr(llm_client, "llm_limiter", limiter)
+        monkeypatch.setattr(llm_client.settings, "llm_max_retries", 2)
+
+        class FakeCompletions:
+            def __init__(self):
+                self.outcomes = []
+                self.calls = 0
+
+            async def create(self, **kwargs):
+                self.calls += 1
+                outcome = self.outcomes.pop(0)
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+
+        completions = FakeCompletions()
+        client = type("FakeClient", (), {})()
+        client.chat = type("Chat", (), {"completions": completions})()
+        monkeypatch.setattr(llm_client, "get_llm_client", lambda: client)
+        return completions, limiter
+
+    def test_retry_after_header_parsing(self):
+        assert llm_client._retry_after(_rate_limit_error({"retry-after": "3"})) == 3.0
+        assert llm_client._retry_after(_rate_limit_error({"retry-after-ms": "250"})) == 0.25
+        assert llm_client._retry_after(_rate_limit_error({})) is None
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_is_retried_and_backs_off(self, fake_client):
+        completions, limiter = fake_client
+        completions.outcomes = [_rate_limit_error({"retry-after-ms": "10"}), "ok"]
+
+        result = await llm_client.create_chat_completion(model="m", messages=[])
+
+        assert result == "ok"
+        assert completions.calls == 2
+        assert limiter.limit < 4
+        assert limiter.inflight == 0
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, fake_client):
+        completions, limiter = fake_client
+        completions.outcomes = [_rate_limit_error({"retry-after-ms": "1"}) for _ in range(3)]
+
+        with pytest.raises(openai.RateLimitError):
+            await llm_client.create_chat_completion(model="m", messages=[])
+
+        assert completions.calls == 3
+        assert limiter.inflight == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_holds_slot_until_consumed(self, fake_client):
+        completions, limiter = fake_client
+
+        async def chunks():
+            yield "a"
+            yield "b"
+
+        completions.outcomes = [chunks()]
+        stream = await llm_client.create_chat_completion(model="m", messages=[], stream=True)
+        assert limiter.inflight == 1
+
+        received = [chunk async for chunk in stream]
+        assert received == ["a", "b"]
+        assert limiter.inflight == 0
@@ -0,0 +1,74 @@
+"""
+Unit tests for the extractability pre-filter.
+"""
+
+import json
+import base64
+import pytest
+from app.services import content_filter as filter_module
+from app.services.content_filter import ContentFilter, char_entropy
+
+PROSE = (
+    "The IRAP funding proposal was submitted to the review board on Monday. "
+    "Finance approved the revised budget after the deadline was moved to Friday, "
+    "and the team will present the milestone report at the next planning meeting."
+)
+
+
+@pytest.fixture
+def content_filter(monkeypatch):
+    monkeypatch.setattr(filter_module.settings, "content_filter_enabled", True)
+    monkeypatch.setattr(filter_module.settings, "content_filter_action", "reject")
+    return ContentFilter()
+
+
+class TestContentFilter:
+    """Tests for the extractability verdicts and admission actions."""
+
+    def test_prose_and_short_content_are_extractable(self, content_filter):
+        assert content_filter.classify(PROSE) is None
+        assert content_filter.classify("Deploy done.") is None
+        assert content_filter.classify("Budget approved.\n" + PROSE + "\nERROR: retry later") is None
+        assert content_filter.classify("## Done\n- **Budget**: approved ✅\n- **Deadline**: moved to `2025-07-10`\n") is None
+        assert content_filter.classify("```bash\ncurl -X POST http://localhost:8000/extract-tags -d @req.json\n```") is None
+
+    def test_non_latin_prose_is_extractable(self, content_filter):
+        russian = ("Предложение по финансированию IRAP было отправлено в понедельник. Финансовый отдел утвердил "
+                   "пересмотренный бюджет, а команда представит отчёт о ходе работ на следующей встрече.")
+        chinese = "我们在周一提交了研发资助申请。财务部门批准了修订后的预算，截止日期改到了周五，团队将在下次会议上汇报进度。"
+        japanese = "月曜日に資金申請を提出しました。財務部は修正予算を承認し、締め切りは金曜日に延期されました。"
+        greek = "Η πρόταση χρηματοδότησης υποβλήθηκε τη Δευτέρα και ο προϋπολογισμός εγκρίθηκε από το οικονομικό τμήμα."
+
+        for prose in (russian, chinese, japanese, greek, chinese + "\n" + PROSE):
+            assert content_filter.classify(prose) is None, prose[:20]
+
+    def test_machine_payloads(self, content_filter):
+        blob = base64.b64encode(bytes(range(256)) * 2).decode()
+        logs = "\n".join(f"2025-07-08 15:44:0{i} INFO worker-{i} heartbeat ok" for i in range(6))
+        dump = "".join(chr(i % 32) for i in range(200))
+        numbers = " ".join(f"{i * 7919} {i * 0.25:.2f} 0x{i:04x}" for i in range(40))
+        identifiers = " ".join(f"user_id={i} session=s{i}/{i * 3}" for i in range(20))
+        keywords = " ".join(f"tag_{i} budget_{i} approved deadline_{i} review" for i in range(20))
+
+        assert content_filter.classify(json.dumps({"id": 1, "status": "ok", "items": list(range(20))})) == "machine_json"
+        assert content_filter.classify(blob) == "high_entropy"
+        assert content_filter.classify(logs) == "log_lines"
+        assert content_filter.classify(dump) == "binary"
+        assert content_filter.classify(numbers) == "no_language"
+        assert content_filter.classify(identifiers) == "machine_tokens"
+        assert content_filter.classify(keywords) == "no_language"
+
+    def test_entropy(self):
+        assert char_entropy("aaaa") == 0.0
+        assert char_entropy("abcd") == pytest.approx(2.0)
+
+    def test_actions(self, content_filter, monkeypatch):
+        logs = "\n".join(f"[ERROR] job {i} failed" for i in range(5))
+        assert content_filter.check(PROSE) is None
+        with pytest.raises(ValueError, match="not extractable: log lines"):
+            content_filter.check(logs)
+
+        monkeypatch.setattr(filter_module.settings, "content_filter_action", "degrade")
+        assert content_filter.check(logs) == "degrade"
+        monkeypatch.setattr(filter_module.settings, "content_filter_enabled", False)
+        assert content_filter.check(logs) is None
@@ -0,0 +1,56 @@
+"""
+Unit tests for the shared extraction cache operations of the database service.
+"""
+
+import pytest
+from loguru import logger
+from pymongo.errors import AutoReconnect
+from app.services import database
+from app.services.database import db_service
+
+
+class FailingCollection:
+    def find_one(self, *args, **kwargs):
+        raise AutoReconnect("mongo unavailable")
+
+    def replace_one(self, *args, **kwargs):
+        raise AutoReconnect("mongo unavailable")
+
+
+@pytest.fixture
+def unavailable_cache(monkeypatch):
+    monkeypatch.setattr(db_service, "client", object())
+    monkeypatch.setattr(db_service, "_connection_state", "connected")
+    monkeypatch.setattr(db_service, "extraction_cache_collection", FailingCollection())
+    monkeypatch.setattr(db_service, "_reconnect", lambda: False)
+    monkeypatch.setattr(db_service, "_best_effort_logged", {})
+    monkeypatch.setattr(db_service, "_operation_count", 0)
+    monkeypatch.setattr(db_service, "_error_count", 0)
+    records = []
+    handler = logger.add(lambda message: records.append(message.record["level"].name), level="DEBUG")
+    yield records
+    logger.remove(handler)
+
+
+class TestSharedExtractionCache:
+    """Tests that shared cache failures are counted once and logged without flooding."""
+
+    @pytest.mark.asyncio
+    async def test_failures_are_counted_once(self, unavailable_cache):
+        assert await db_service.get_cached_extraction_async("k") is None
+        assert await db_service.save_cached_extraction_async("k", {"tags": []}, 60) is False
+
+        assert (db_service._operation_count, db_service._error_count) == (2, 2)
+
+    @pytest.mark.asyncio
+    async def test_failures_log_rate_limited_warnings(self, unavailable_cache, monkeypatch):
+        for _ in range(5):
+            await db_service.get_cached_extraction_async("k")
+        db_service.save_cached_extraction("k", {"tags": []}, 60)
+
+        assert "ERROR" not in unavailable_cache
+        assert unavailable_cache.count("WARNING") == 2
+
+        monkeypatch.setattr(database, "BEST_EFFORT_LOG_INTERVAL_SECONDS", 0)
+        await db_service.get_cached_extraction_async("k")
+        assert unavailable_cache.count("WARNING") == 3
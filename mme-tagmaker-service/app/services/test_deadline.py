@@ -0,0 +1,138 @@
+"""
+Unit tests for request deadline propagation.
+"""
+
+import time
+import asyncio
+import httpx
+import openai
+import pytest
+from app.services import deadline, llm_client
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.concurrency import AdaptiveLimiter
+from app.services.deadline import DeadlineExceeded, request_deadline
+
+
+class TestDeadlineHeaders:
+    """Tests for parsing X-Request-Deadline and grpc-timeout."""
+
+    def test_grpc_timeout_units(self):
+        assert deadline.parse_grpc_timeout("2S") == 2.0
+        assert deadline.parse_grpc_timeout("500m") == pytest.approx(0.5)
+        assert deadline.parse_grpc_timeout("1M") == 60.0
+        with pytest.raises(ValueError):
+            deadline.parse_grpc_timeout("5 seconds")
+
+    def test_request_deadline_formats(self):
+        now = time.time()
+        assert deadline.parse_request_deadline(str(now + 10)) == pytest.approx(10, abs=0.5)
+        assert deadline.parse_request_deadline(str(int((now + 10) * 1000))) == pytest.approx(10, abs=0.5)
+        assert deadline.parse_request_deadline("2020-01-01T00:00:00Z") < 0
+        with pytest.raises(ValueError):
+            deadline.parse_request_deadline("2020-01-01T00:00:00")
+        with pytest.raises(ValueError):
+            deadline.parse_request_deadline("tomorrow")
+
+    def test_stricter_header_wins(self):
+        budget = deadline.budget_from_headers(str(time.time() + 30), "5S")
+        assert budget == 5.0
+        assert deadline.budget_from_headers(None, None) is None
+        assert deadline.budget_from_headers(None, None, default=20) == 20
+
+
+class TestRequestDeadline:
+    """Tests for the deadline context."""
+
+    def test_nested_deadline_only_tightens(self):
+        assert deadline.remaining() is None
+        with request_deadline(10):
+            with request_deadline(60):
+                assert deadline.remaining() <= 10
+            with request_deadline(1):
+                assert deadline.remaining() <= 1
+        assert deadline.remaining() is None
+
+    def test_timeout_is_capped_by_remaining(self):
+        assert deadline.timeout(30) == 30
+        with request_deadline(2):
+            assert deadline.timeout(30) <= 2
+            assert deadline.timeout(1) == 1
+
+    def test_check_raises_once_expired(self):
+        with request_deadline(0.001):
+            time.sleep(0.002)
+            assert deadline.expired()
+            with pytest.raises(DeadlineExceeded):
+                deadline.check("test")
+
+
+class TestLLMDeadline:
+    """Tests for deadline handling in create_chat_completion."""
+
+    @pytest.fixture
+    def fake_client(self, monkeypatch):
+        limiter = AdaptiveLimiter(initial_limit=1)
+        monkeypatch.setattr(llm_client, "llm_limiter", limiter)
+        calls = []
+
+        class FakeCompletions:
+            async def create(self, **kwargs):
+                calls.append(kwargs)
+                if kwargs["messages"] == ["slow"]:
+                    await asyncio.sleep(kwargs["timeout"])
+                    raise openai.APITimeoutError(request=httpx.Request("POST", "http://llm"))
+                return "ok"
+
+        client = type("FakeClient", (), {})()
+        client.chat = type("Chat", (), {"completions": FakeCompletions()})()
+        monkeypatch.setattr(llm_client, "get_llm_client", lambda: client)
+        return calls, limiter
+
+    @pytest.mark.asyncio
+    async def test_call_timeout_capped_by_deadline(self, fake_client):
+        calls, _ = fake_client
+        with request_deadline(2):
+            await llm_client.create_chat_completion(model="m", messages=[], timeout=15)
+
+        assert calls[0]["timeout"] <= 2
+
+    @pytest.mark.asyncio
+    async def test_queue_wait_past_deadline_is_dropped(self, fake_client):
+        calls, limiter = fake_client
+        await limiter.acquire()
+
+        with request_deadline(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await llm_client.create_chat_completion(model="m", messages=[])
+
+        assert calls == []
+        assert limiter.queue_depth == 0
+        limiter.release()
+        assert limiter.inflight == 0
+
+    @pytest.mark.asyncio
+    async def test_expired_deadline_never_calls(self, fake_client):
+        calls, limiter = fake_client
+        with request_deadline(0.001):
+            await asyncio.sleep(0.002)
+            with pytest.raises(DeadlineExceeded):
+                await llm_client.create_chat_completion(model="m", messages=[])
+
+        assert calls == []
+        assert limiter.inflight == 0
+
+    @pytest.mark.asyncio
+    async def test_deadline_capped_timeout_is_not_overload(self, fake_client, monkeypatch):
+        limiter = AdaptiveLimiter(initial_limit=4)
+        monkeypatch.setattr(llm_client, "llm_limiter", limiter)
+        breaker = CircuitBreaker("test", failure_threshold=1)
+        monkeypatch.setattr(llm_client, "llm_breaker", breaker)
+        limit = limiter.limit
+
+        with request_deadline(0.02):
+            with pytest.raises(DeadlineExceeded):
+                await llm_client.create_chat_completion(model="m", messages=["slow"], timeout=15)
+
+        assert limiter.limit == limit
+        assert limiter.inflight == 0
+        assert breaker.state == "closed"
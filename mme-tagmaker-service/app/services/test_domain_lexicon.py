@@ -0,0 +1,140 @@
+"""
+Unit tests for the compiled domain lexicon.
+"""
+
+import json
+import time
+import pytest
+from app.services import domain_lexicon as lexicon_module
+from app.services.domain_lexicon import (
+    DOMAIN_LEXICON, CompiledLexicon, DomainLexicon, _lexicon_from_documents, get_domain_type, get_synonyms
+)
+
+LABELS = [
+    "Budget proposal", "Q1 budget review", "SOX audit findings", "Quarterly forecast update",
+    "Vendor contract renewal", "Invoice approval", "Random team lunch", "", "BUDGET", "policy exception",
+]
+
+
+def _walk_domain_type(lexicon, label):
+    """The lookup the index replaces: first match walking the lexicon in order"""
+    label_lower = label.lower()
+    for domain, categories in lexicon.items():
+        for category, info in categories.items():
+            domain_type = info.get("type", f"{domain}.{category}")
+            if category in label_lower or any(s.lower() in label_lower for s in info.get("synonyms", [])):
+                return domain_type
+            for subtype, subtype_synonyms in info.get("subtypes", {}).items():
+                if any(s.lower() in label_lower for s in subtype_synonyms):
+                    return f"{domain_type}.{subtype}"
+    return "general.concept"
+
+
+def _walk_synonyms(lexicon, label):
+    label_lower = label.lower()
+    for categories in lexicon.values():
+        for category, info in categories.items():
+            if category in label_lower or any(s.lower() in label_lower for s in info.get("synonyms", [])):
+                return info.get("synonyms", [])
+    return []
+
+
+def _generated_lexicon(categories=300, synonyms=10):
+    """A few thousand synonyms spread over generated categories"""
+    return {
+        f"domain{d}": {
+            f"category{d}x{c}": {
+                "type": f"domain{d}.category{c}",
+                "synonyms": [f"term {d} {c} {s}" for s in range(synonyms)],
+                "subtypes": {"detail": [f"detail {d} {c}"]}
+            }
+            for c in range(categories // 10)
+        }
+        for d in range(10)
+    }
+
+
+class TestCompiledLexicon:
+    """Tests for lookup equivalence with the lexicon walk and lookup latency."""
+
+    def test_matches_lexicon_walk(self):
+        index = CompiledLexicon(DOMAIN_LEXICON)
+        labels = LABELS + [term for categories in DOMAIN_LEXICON.values() for category, info in categories.items()
+                           for term in [category] + info.get("synonyms", []) + sum(info.get("subtypes", {}).values(), [])]
+
+        for label in labels:
+            assert index.domain_type(label) == _walk_domain_type(DOMAIN_LEXICON, label), label
+            assert index.synonyms(label) == _walk_synonyms(DOMAIN_LEXICON, label), label
+
+    def test_earlier_category_wins_over_later_match(self):
+        lexicon = {"a": {"first": {"type": "a.first", "synonyms": ["review"]},
+                         "second": {"type": "a.second", "synonyms": ["budget review"],
+                                    "subtypes": {"q1": ["q1"]}}}}
+        index = CompiledLexicon(lexicon)
+
+        assert index.domain_type("Budget review") == "a.first"
+        assert index.domain_type("Q1 plan") == "a.second.q1"
+        # Subtype synonyms type a label but carry no synonym list
+        assert index.synonyms("Q1 plan") == []
+
+    def test_lookup_latency_with_thousands_of_synonyms(self):
+        lexicon = _generated_lexicon()
+        index = CompiledLexicon(lexicon)
+        assert index.terms > 3000
+        labels = [f"term 7 {c} 3 follow-up" for c in range(30)] + ["Unrelated label about nothing in particular"] * 30
+
+        start = time.perf_counter()
+        for label in labels:
+            index.domain_type(label)
+        per_lookup = (time.perf_counter() - start) / len(labels)
+
+        assert index.domain_type("term 7 12 3 follow-up") == "domain7.category12"
+        assert per_lookup < 0.001
+
+
+class TestDomainLexiconReload:
+    """Tests for loading from a file or collection and swapping at runtime."""
+
+    @pytest.fixture
+    def lexicon_file(self, tmp_path, monkeypatch):
+        path = tmp_path / "lexicon.json"
+        path.write_text(json.dumps({"ops": {"incident": {"type": "ops.incident", "synonyms": ["outage", "sev1"]}}}))
+        monkeypatch.setattr(lexicon_module.settings, "domain_lexicon_path", str(path))
+        return path
+
+    def test_reload_from_file_swaps_index(self, lexicon_file, monkeypatch):
+        lexicon = DomainLexicon()
+        monkeypatch.setattr(lexicon_module, "domain_lexicon", lexicon)
+        builtin = lexicon.index
+        assert get_domain_type("Sev1 outage") == "general.concept"
+
+        info = lexicon.reload("file")
+
+        assert info["source"] == "file" and info["terms"] == 3 and info["version"] != builtin.version
+        assert get_domain_type("Sev1 outage") == "ops.incident"
+        assert get_synonyms("sev1") == ["outage", "sev1"]
+        # Lookups already holding the old index are unaffected
+        assert builtin.domain_type("Budget proposal") == "finance.budget"
+
+    def test_failed_reload_keeps_current_index(self, lexicon_file):
+        lexicon = DomainLexicon()
+        lexicon.reload("file")
+        lexicon_file.write_text("{not json")
+
+        info = lexicon.reload("file")
+
+        assert info["source"] == "file"
+        assert lexicon.index.domain_type("outage") == "ops.incident"
+        with pytest.raises(ValueError):
+            lexicon.reload("redis")
+
+    def test_collection_documents_keep_their_order(self):
+        documents = [
+            {"domain": "ops", "category": "change", "type": "ops.change", "synonyms": ["rollout"], "order": 2},
+            {"domain": "ops", "category": "incident", "type": "ops.incident", "synonyms": ["rollout failed"], "order": 1},
+        ]
+
+        index = CompiledLexicon(_lexicon_from_documents(documents), "mongo")
+
+        assert list(_lexicon_from_documents(documents)["ops"]) == ["incident", "change"]
+        assert index.domain_type("Rollout failed overnight") == "ops.incident"
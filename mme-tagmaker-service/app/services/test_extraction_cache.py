@@ -0,0 +1,92 @@
+"""
+Unit tests for the in-process extraction result cache.
+"""
+
+import time
+import asyncio
+import pytest
+from app.models.tag import Tag
+from app.services import extraction_cache as cache_module
+from app.services.extraction_cache import ExtractionCache
+from app.utils.hashing import content_hash
+
+
+def _result(label: str):
+    return [Tag(label=label, links=[label])], 0.9, label
+
+
+class TestExtractionCache:
+    """Tests for LRU + TTL behaviour of ExtractionCache."""
+
+    def test_content_hash_normalizes_whitespace(self):
+        assert content_hash("  budget  approved\n", "v1", 20) == content_hash("budget approved", "v1", 20)
+        assert content_hash("budget approved", "v1", 20) != content_hash("budget approved", "v1", 10)
+        assert content_hash("budget approved", "v1", 20) != content_hash("budget approved", "v2", 20)
+
+    def test_hit_returns_copy(self):
+        cache = ExtractionCache(max_entries=10, ttl_seconds=60)
+        cache.set("k", _result("budget"))
+
+        tags, confidence, primary_tag = cache.get("k")
+        tags[0].label = "mutated"
+
+        assert cache.get("k")[0][0].label == "budget"
+        assert confidence == 0.9
+        assert primary_tag == "budget"
+
+    def test_lru_eviction(self):
+        cache = ExtractionCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", _result("a"))
+        cache.set("b", _result("b"))
+        cache.get("a")  # touch a so b is least recently used
+        cache.set("c", _result("c"))
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_ttl_expiry(self):
+        cache = ExtractionCache(max_entries=10, ttl_seconds=0.01)
+        cache.set("k", _result("k"))
+        time.sleep(0.02)
+
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+
+class FakeDatabaseService:
+    """In-memory stand-in for the DatabaseService shared cache methods."""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def get_cached_extraction_async(self, key, max_time_ms=50):
+        return self.docs.get(key)
+
+    async def save_cached_extraction_async(self, key, entry, ttl_seconds):
+        self.docs[key] = entry
+        return True
+
+
+class TestSharedExtractionCache:
+    """Tests for the read-through/write-behind shared tier."""
+
+    @pytest.mark.asyncio
+    async def test_write_behind_then_read_through(self, monkeypatch):
+        fake_db = FakeDatabaseService()
+        memory = ExtractionCache(max_entries=10, ttl_seconds=60)
+        monkeypatch.setattr(cache_module, "extraction_cache", memory)
+        monkeypatch.setattr(cache_module.SharedExtractionCache, "_db", staticmethod(lambda: fake_db))
+        monkeypatch.setattr(cache_module.settings, "shared_cache_enabled", True)
+
+        cache_module.store_extraction("k", _result("budget"), "v1")
+        await asyncio.sleep(0)  # let the write-behind task run
+        assert fake_db.docs["k"]["primaryTag"] == "budget"
+
+        # Another replica: empty memory tier, served from the shared tier
+        memory.clear()
+        tags, confidence, primary_tag = await cache_module.get_cached_extraction("k")
+        assert [tag.label for tag in tags] == ["budget"]
+        assert primary_tag == "budget"
+        assert memory.get("k") is not None
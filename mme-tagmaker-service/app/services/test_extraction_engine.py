@@ -0,0 +1,65 @@
+"""
+Unit tests for extraction mode dispatch in the extraction engine.
+"""
+
+import pytest
+from app.models.tag import Tag
+from app.services import extraction_engine
+
+STATUS_LINE = "Deployment of the billing service completed successfully."
+LONG_REPORT = "The quarterly budget forecast was approved by finance. Deadline for submission is Friday. " * 20
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """Replace the LLM engine with a counting stub."""
+    calls = []
+
+    async def fake_extract_cues(content, max_cues=20, use_cache=True):
+        calls.append(content)
+        return [Tag(label="budget", confidence=0.9)], 0.9, "budget"
+
+    monkeypatch.setattr(extraction_engine, "extract_cues", fake_extract_cues)
+    monkeypatch.setattr(extraction_engine, "get_llm_client", lambda: object())
+    return calls
+
+
+class TestExtractionModes:
+    """Tests for llm / heuristic / tiered modes."""
+
+    @pytest.mark.asyncio
+    async def test_heuristic_mode_never_calls_llm(self, stub_llm):
+        outcome = await extraction_engine.extract(STATUS_LINE, mode="heuristic")
+
+        assert outcome.engine == "heuristic"
+        assert [tag.label for tag in outcome.tags] == ["deployment"]
+        assert stub_llm == []
+
+    @pytest.mark.asyncio
+    async def test_tiered_keeps_confident_simple_result(self, stub_llm):
+        outcome = await extraction_engine.extract(STATUS_LINE, mode="tiered")
+
+        assert outcome.engine == "heuristic"
+        assert not outcome.escalated
+        assert stub_llm == []
+
+    @pytest.mark.asyncio
+    async def test_tiered_escalates_complex_content(self, stub_llm):
+        outcome = await extraction_engine.extract(LONG_REPORT, mode="tiered")
+
+        assert outcome.engine == "llm"
+        assert outcome.escalated
+        assert len(stub_llm) == 1
+
+    @pytest.mark.asyncio
+    async def test_tiered_without_api_key_falls_back_to_heuristic(self, stub_llm, monkeypatch):
+        monkeypatch.setattr(extraction_engine, "get_llm_client", lambda: None)
+        outcome = await extraction_engine.extract(LONG_REPORT, mode="tiered")
+
+        assert outcome.engine == "heuristic"
+        assert stub_llm == []
+
+    @pytest.mark.asyncio
+    async def test_unknown_mode_rejected(self):
+        with pytest.raises(ValueError):
+            await extraction_engine.extract(STATUS_LINE, mode="magic")
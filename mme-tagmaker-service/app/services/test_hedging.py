@@ -0,0 +1,100 @@
+"""
+Unit tests for hedged LLM requests.
+"""
+
+import time
+import asyncio
+import pytest
+from app.services import llm_client
+from app.services.hedging import HedgeBudget, LatencyWindow, hedged
+
+
+class TestHedgingPrimitives:
+    """Tests for the latency window, budget and hedged()."""
+
+    def test_percentile_needs_min_samples(self):
+        window = LatencyWindow(min_samples=10)
+        for i in range(9):
+            window.observe(i / 10)
+        assert window.percentile(90) is None
+
+        window.observe(0.9)
+        assert window.percentile(90) == pytest.approx(0.9)
+        assert window.percentile(50) == pytest.approx(0.5)
+
+    def test_budget_limits_hedge_share(self):
+        budget = HedgeBudget(ratio=0.05)
+        spent = 0
+        for _ in range(100):
+            budget.deposit()
+            spent += budget.try_spend()
+        assert spent == 5
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged(self):
+        delays = [0.5, 0.01]
+
+        async def call():
+            delay = delays.pop(0)
+            await asyncio.sleep(delay)
+            return delay
+
+        assert await hedged(call, 0.02, HedgeBudget(ratio=1.0)) == 0.01
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_budget(self):
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "primary"
+
+        assert await hedged(call, 0.01, HedgeBudget(ratio=0.0)) == "primary"
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_call_falls_through_to_other(self):
+        outcomes = [ValueError("boom"), "ok"]
+
+        async def call():
+            outcome = outcomes.pop(0)
+            await asyncio.sleep(0.03 if isinstance(outcome, ValueError) else 0.05)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        assert await hedged(call, 0.01, HedgeBudget(ratio=1.0)) == "ok"
+
+
+class TestHedgingAgainstStandin:
+    """create_chat_completion hedging against the latency-injecting stand-in server."""
+
+    @pytest.mark.asyncio
+    async def test_tail_request_is_hedged(self, standin_llm, monkeypatch):
+        monkeypatch.setattr(llm_client.settings, "llm_hedging_enabled", True)
+        for _ in range(10):
+            llm_client.llm_latency.observe(0.02)
+
+        standin_llm.script = [(1.0, 200)]
+        start = time.monotonic()
+        resp = await llm_client.create_chat_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "x"}])
+
+        assert resp.choices[0].message.content
+        assert time.monotonic() - start < 0.5
+        assert standin_llm.requests == 2
+        # The losing request is cancelled and hands back its limiter slot
+        await asyncio.sleep(0.01)
+        assert llm_client.llm_limiter.inflight == 0
+
+    @pytest.mark.asyncio
+    async def test_hedging_is_opt_in(self, standin_llm, monkeypatch):
+        monkeypatch.setattr(llm_client.settings, "llm_hedging_enabled", False)
+        for _ in range(10):
+            llm_client.llm_latency.observe(0.02)
+
+        standin_llm.script = [(0.1, 200)]
+        await llm_client.create_chat_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "x"}])
+
+        assert standin_llm.requests == 1
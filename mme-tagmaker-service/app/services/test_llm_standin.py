@@ -0,0 +1,107 @@
+"""
+Unit tests for the bundled LLM stand-in server.
+"""
+
+import json
+import random
+import httpx
+import pytest
+from app.services import llm_tagger
+from app.services.llm_standin import StandinLLM, parse_latency, prompt_hash
+
+REQUEST = {
+    "model": "gpt-4o-mini",
+    "messages": [{"role": "system", "content": "Extract cues"},
+                 {"role": "user", "content": "The budget proposal was submitted. Review meeting on Friday."}],
+    "temperature": 0.1,
+}
+
+
+async def _post(standin: StandinLLM, body: dict) -> httpx.Response:
+    transport = httpx.ASGITransport(app=standin.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://standin") as client:
+        return await client.post("/v1/chat/completions", json=body)
+
+
+def _answer(resp: httpx.Response) -> dict:
+    return json.loads(resp.json()["choices"][0]["message"]["content"])
+
+
+class TestStandinBehaviour:
+    """Tests for latency specs, injected failures and synthesized answers."""
+
+    def test_latency_specs(self):
+        rng = random.Random(1)
+        assert parse_latency("0.25")(rng) == 0.25
+        assert parse_latency("fixed:0.1")(rng) == 0.1
+        assert all(0.1 <= parse_latency("uniform:0.1-0.3")(rng) <= 0.3 for _ in range(50))
+        assert all(parse_latency("normal:0.01/0.5")(rng) >= 0 for _ in range(50))
+        assert parse_latency("gamma:1")(rng) == 0.0
+
+    def test_seeded_failure_injection_is_reproducible(self):
+        runs = []
+        for _ in range(2):
+            standin = StandinLLM(error_rate=0.2, rate_limit_rate=0.1, seed=7)
+            runs.append([standin._next_step()[1] for _ in range(500)])
+
+        assert runs[0] == runs[1]
+        assert 70 <= runs[0].count(500) <= 130
+        assert 25 <= runs[0].count(429) <= 75
+
+    @pytest.mark.asyncio
+    async def test_synthesized_and_packed_answers(self):
+        standin = StandinLLM()
+
+        single = await _post(standin, REQUEST)
+        assert _answer(single)["cues"] == ["The budget proposal was submitted", "Review meeting on Friday"]
+        assert single.json()["usage"]["prompt_tokens"] > 0
+
+        packed = dict(REQUEST, messages=[
+            {"role": "system", "content": llm_tagger.build_packed_prompt(5)},
+            {"role": "user", "content": json.dumps({"d1": "Audit booked for May.", "d2": "Budget approved today."})}
+        ])
+        assert set(_answer(await _post(standin, packed))) == {"d1", "d2"}
+
+    @pytest.mark.asyncio
+    async def test_injected_rate_limit_carries_retry_after(self):
+        standin = StandinLLM()
+        standin.script = [(0.0, 429)]
+
+        resp = await _post(standin, REQUEST)
+
+        assert resp.status_code == 429
+        assert resp.headers["retry-after"] == "1"
+
+
+class TestRecordReplay:
+    """Tests for recording upstream responses and replaying them by prompt hash."""
+
+    @pytest.mark.asyncio
+    async def test_recorded_response_is_replayed(self, standin_server, tmp_path):
+        upstream, base_url = standin_server
+        upstream.reset(["Recorded cue from upstream"])
+        recorder = StandinLLM(mode="record", cassette_dir=str(tmp_path), upstream_base_url=base_url)
+
+        recorded = await _post(recorder, dict(REQUEST, stream=False))
+        assert (tmp_path / f"{prompt_hash(REQUEST)}.json").exists()
+
+        replayer = StandinLLM(mode="replay", cassette_dir=str(tmp_path))
+        replayed = await _post(replayer, REQUEST)
+        missed = await _post(replayer, dict(REQUEST, temperature=0.7))
+
+        assert _answer(replayed) == _answer(recorded) == {"cues": ["Recorded cue from upstream"], "confidence": 0.9}
+        assert upstream.requests == 1
+        assert (replayer.replayed, replayer.replay_misses) == (1, 1)
+        assert _answer(missed)["cues"] != ["Recorded cue from upstream"]
+
+
+class TestStreaming:
+    """Tests for server-sent event streaming through the LLM tagger."""
+
+    @pytest.mark.asyncio
+    async def test_stream_cues_against_standin(self, standin_llm):
+        events = [event async for event in llm_tagger.stream_cues("The budget proposal was submitted.", use_cache=False)]
+
+        assert [kind for kind, _ in events] == ["tag", "tag", "summary"]
+        assert events[-1][1]["confidence"] == 0.9
+        assert standin_llm.last_request["stream"] is True
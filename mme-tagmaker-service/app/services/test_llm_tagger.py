@@ -0,0 +1,117 @@
+"""
+Unit tests for the extract_cues pipeline with a stubbed LLM completion.
+"""
+
+import json
+import asyncio
+import pytest
+from types import SimpleNamespace
+from app.services import llm_tagger
+from app.services.extraction_cache import ExtractionCache
+from app.services.metering import request_tenant
+from app.services.scheduler import current_lane, request_lane
+
+
+def _completion(cues, confidence=0.9):
+    message = SimpleNamespace(content=json.dumps({"cues": cues, "confidence": confidence}))
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """Replace the shared LLM client with a counting stub."""
+    calls = []
+
+    async def fake_completion(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.01)
+        return _completion(["Budget proposal submitted to finance team", "Deadline review meeting scheduled"])
+
+    monkeypatch.setattr(llm_tagger, "get_llm_client", lambda: object())
+    monkeypatch.setattr(llm_tagger, "create_chat_completion", fake_completion)
+    monkeypatch.setattr("app.services.extraction_cache.extraction_cache", ExtractionCache(max_entries=10, ttl_seconds=60))
+    monkeypatch.setattr(llm_tagger.settings, "shared_cache_enabled", False)
+    return calls
+
+
+class TestExtractCues:
+    """Tests for caching and coalescing around the LLM call."""
+
+    @pytest.mark.asyncio
+    async def test_extracts_structured_tags(self, stub_llm):
+        tags, confidence, primary_tag = await llm_tagger.extract_cues("The budget proposal was submitted.")
+
+        assert len(tags) == 2
+        assert confidence == 0.9
+        assert primary_tag
+        assert stub_llm[0]["model"] == "gpt-4o-mini"
+
+    @pytest.mark.asyncio
+    async def test_repeat_request_served_from_cache(self, stub_llm):
+        await llm_tagger.extract_cues("The budget proposal was submitted.")
+        await llm_tagger.extract_cues("  The budget   proposal was submitted. ")
+
+        assert len(stub_llm) == 1
+
+    @pytest.mark.asyncio
+    async def test_bypass_cache(self, stub_llm):
+        await llm_tagger.extract_cues("The budget proposal was submitted.")
+        await llm_tagger.extract_cues("The budget proposal was submitted.", use_cache=False)
+
+        assert len(stub_llm) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_coalesce(self, stub_llm):
+        results = await asyncio.gather(*[
+            llm_tagger.extract_cues("Deadline review meeting scheduled.", use_cache=False)
+            for _ in range(5)
+        ])
+
+        assert len(stub_llm) == 1
+        assert all(r[2] == results[0][2] for r in results)
+
+    @pytest.mark.asyncio
+    async def test_only_same_lane_and_org_coalesce(self, stub_llm, monkeypatch):
+        lanes = []
+
+        async def fake_completion(**kwargs):
+            lanes.append(current_lane())
+            await asyncio.sleep(0.01)
+            return _completion(["Deadline review meeting scheduled"])
+
+        monkeypatch.setattr(llm_tagger, "create_chat_completion", fake_completion)
+
+        async def call(lane, org):
+            with request_lane(lane, org), request_tenant(org, "u1"):
+                return await llm_tagger.extract_cues("Deadline review meeting scheduled.", use_cache=False)
+
+        await asyncio.gather(call("bulk", "org-a"), call("interactive", "org-a"),
+                             call("bulk", "org-b"), call("bulk", "org-a"))
+
+        # The interactive request never waits in the bulk call, and org-b is never billed to org-a
+        assert sorted(lanes) == [("bulk", "org-a"), ("bulk", "org-b"), ("interactive", "org-a")]
+
+    @pytest.mark.asyncio
+    async def test_stream_emits_tags_then_summary(self, monkeypatch, stub_llm):
+        raw = json.dumps({"cues": ["Budget proposal submitted to finance team", "Deadline review meeting scheduled"], "confidence": 0.8})
+
+        async def fake_stream():
+            for i in range(0, len(raw), 7):
+                delta = SimpleNamespace(content=raw[i:i + 7])
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+        async def fake_completion(**kwargs):
+            assert kwargs["stream"] is True
+            return fake_stream()
+
+        monkeypatch.setattr(llm_tagger, "create_chat_completion", fake_completion)
+
+        events = [e async for e in llm_tagger.stream_cues("The budget proposal was submitted.")]
+
+        assert [name for name, _ in events] == ["tag", "tag", "summary"]
+        assert events[-1][1]["confidence"] == 0.8
+
+        # Streamed result is cached for the non-streaming path
+        tags, confidence, _ = await llm_tagger.extract_cues("The budget proposal was submitted.")
+        assert len(tags) == 2 and confidence == 0.8
+        assert stub_llm == []
@@ -0,0 +1,67 @@
+"""
+Unit tests for load shedding of extraction requests.
+"""
+
+import pytest
+from app.services import load_shedding
+from app.services.concurrency import AdaptiveLimiter
+from app.services.load_shedding import LoadShedder, Overloaded
+from app.services.scheduler import FairQueue
+
+
+@pytest.fixture
+def busy_limiter(monkeypatch):
+    """Limiter with one slot and a 1s latency baseline"""
+    limiter = AdaptiveLimiter(initial_limit=1, queue=FairQueue(org_weights={}))
+    monkeypatch.setattr(load_shedding, "llm_limiter", limiter)
+    monkeypatch.setattr(load_shedding.settings, "load_shedding_enabled", True)
+    monkeypatch.setattr(load_shedding.settings, "shed_wait_budget_seconds", 2.0)
+    monkeypatch.setattr(load_shedding.settings, "shed_action_extract_tags", "degrade")
+    monkeypatch.setattr(load_shedding.settings, "shed_action_generate_and_save", "reject")
+    limiter._baseline_latency = 1.0
+    return limiter
+
+
+class TestLoadShedder:
+    """Tests for admission decisions under overload."""
+
+    def test_idle_limiter_admits(self, busy_limiter):
+        assert busy_limiter.estimated_wait("interactive") == 0.0
+        assert LoadShedder().check("generate-and-save", "save") is None
+
+    @pytest.mark.asyncio
+    async def test_backlog_rejects_or_degrades_per_route(self, busy_limiter):
+        await busy_limiter.acquire()
+        for _ in range(3):
+            busy_limiter._waiters.push(object(), "save", "org")
+
+        assert busy_limiter.estimated_wait("save") == pytest.approx(4.0)
+        shedder = LoadShedder()
+        assert shedder.check("extract-tags", "save") == "degrade"
+        with pytest.raises(Overloaded) as exc:
+            shedder.check("generate-and-save", "save")
+        assert exc.value.retry_after == 4
+
+    @pytest.mark.asyncio
+    async def test_lower_classes_do_not_count_against_higher(self, busy_limiter):
+        await busy_limiter.acquire()
+        for _ in range(10):
+            busy_limiter._waiters.push(object(), "bulk", "big")
+
+        assert busy_limiter.estimated_wait("interactive") == pytest.approx(1.0)
+        assert LoadShedder().check("generate-and-save", "interactive") is None
+        with pytest.raises(Overloaded):
+            LoadShedder().check("generate-and-save", "bulk")
+
+    @pytest.mark.asyncio
+    async def test_disabled_never_sheds(self, busy_limiter, monkeypatch):
+        monkeypatch.setattr(load_shedding.settings, "load_shedding_enabled", False)
+        await busy_limiter.acquire()
+        for _ in range(10):
+            busy_limiter._waiters.push(object(), "save", "org")
+
+        assert LoadShedder().check("generate-and-save", "save") is None
+
+    def test_unknown_action_falls_back_to_reject(self, monkeypatch):
+        monkeypatch.setattr(load_shedding.settings, "shed_action_batch", "drop")
+        assert LoadShedder().route_action("batch") == "reject"
@@ -0,0 +1,64 @@
+"""
+Unit tests for map-reduce extraction of long documents.
+"""
+
+import time
+import asyncio
+import pytest
+from app.models.tag import Tag
+from app.services import map_reduce
+
+SENTENCE = "The quarterly budget review meeting was completed and the proposal was submitted. "
+
+
+@pytest.fixture
+def stub_chunk_extraction(monkeypatch):
+    """Replace per-chunk extraction with a fixed-latency stub."""
+    calls = []
+
+    async def fake_extract_cues(chunk, max_cues=20, use_cache=True):
+        calls.append(chunk)
+        label = "budget" if len(calls) % 2 else "deadline"
+        await asyncio.sleep(0.05)
+        return [Tag(label=label, confidence=0.8, links=[chunk[:20]]), Tag(label="review", confidence=0.6)], 0.8, label
+
+    monkeypatch.setattr(map_reduce, "extract_cues", fake_extract_cues)
+    monkeypatch.setattr(map_reduce.settings, "map_reduce_chunk_chars", 1000)
+    monkeypatch.setattr(map_reduce.settings, "map_reduce_concurrency", 16)
+    return calls
+
+
+class TestMapReduce:
+    """Tests for chunk fan-out and merging."""
+
+    @pytest.mark.asyncio
+    async def test_chunks_run_concurrently(self, stub_chunk_extraction):
+        content = SENTENCE * 120  # ~10 KB -> ~10 chunks
+        start = time.perf_counter()
+        tags, confidence, primary_tag = await map_reduce.extract_map_reduce(content)
+        elapsed = time.perf_counter() - start
+
+        assert len(stub_chunk_extraction) >= 8
+        assert elapsed < 0.05 * 4  # roughly one chunk's latency, not N
+        assert [tag.label for tag in tags].count("review") == 1
+        assert tags[0].label == "review"  # found in every chunk
+        assert confidence == 0.8
+
+    @pytest.mark.asyncio
+    async def test_deadline_drops_slow_chunks(self, stub_chunk_extraction, monkeypatch):
+        monkeypatch.setattr(map_reduce.settings, "map_reduce_deadline_seconds", 0.001)
+
+        with pytest.raises(ValueError):
+            await map_reduce.extract_map_reduce(SENTENCE * 120)
+
+    def test_merge_weights_confidence_by_chunk_size(self):
+        results = [
+            (3000, [Tag(label="budget", confidence=0.9, links=["a"])], 0.9),
+            (1000, [Tag(label="budget", confidence=0.5, links=["b"])], 0.5),
+        ]
+        tags, confidence = map_reduce.merge_chunk_results(results, max_cues=20)
+
+        assert len(tags) == 1
+        assert tags[0].confidence == 0.8
+        assert tags[0].links == ["a", "b"]
+        assert confidence == 0.8
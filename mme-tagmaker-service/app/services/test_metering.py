@@ -0,0 +1,151 @@
+"""
+Unit tests for per-org token metering and token budgets.
+"""
+
+import pytest
+from app.services import llm_client, metering
+from app.services.metering import TokenMeter, TokenBudgetExceeded, request_tenant, _parse_org_budgets
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRollupStore:
+    """Rollup collection applying each flush id once per document, like the MongoDB write."""
+
+    def __init__(self):
+        self.tokens = {}
+        self.applied = set()
+        self.fail_users = set()
+        self.lose_reply = False
+
+    def increment(self, rollups, flush_id):
+        failed = []
+        for i, rollup in enumerate(rollups):
+            user = rollup["userId"]
+            if user in self.fail_users:
+                failed.append(i)
+            elif (user, flush_id) not in self.applied:
+                self.applied.add((user, flush_id))
+                self.tokens[user] = self.tokens.get(user, 0) + rollup["promptTokens"]
+        return None if self.lose_reply else failed
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestTokenMeter:
+    """Tests for token attribution, budget windows and rollup flushing."""
+
+    def test_parse_org_budgets(self):
+        assert _parse_org_budgets("a:100/5000, b:50/0,bad:x/1,:1/1,c:/200") == {
+            "a": (100, 5000), "b": (50, 0), "c": (0, 200)
+        }
+
+    def test_record_attributes_to_current_tenant(self, clock):
+        meter = TokenMeter(clock=clock)
+        with request_tenant("org-a", "user-1"):
+            meter.record(50, 20)
+        meter.record(5, 5)
+
+        assert meter.usage("org-a") == {"minute": 70, "day": 70}
+        assert meter.usage("unknown") == {"minute": 10, "day": 10}
+
+    def test_metric_labels_are_bounded(self, clock, monkeypatch):
+        monkeypatch.setattr(metering.settings, "metric_orgs", "org-a")
+        meter = TokenMeter(clock=clock)
+        before = metering.LLM_TOKENS.labels(org="other", kind="prompt")._value.get()
+        with request_tenant("org-z", "user-1"):
+            meter.record(50, 20)
+        with request_tenant("org-a", "user-1"):
+            meter.record(5, 5)
+
+        assert metering.LLM_TOKENS.labels(org="other", kind="prompt")._value.get() - before == 50
+        assert meter.usage("org-z") == {"minute": 70, "day": 70}
+        assert ("org-z", "user-1") in {(org, user) for _, org, user in meter._pending}
+
+    def test_minute_window_rolls_over(self, clock):
+        meter = TokenMeter(per_minute=100, clock=clock)
+        meter.record(80, 30, org="org-a")
+        with pytest.raises(TokenBudgetExceeded) as exc:
+            meter.check("org-a")
+        assert exc.value.window == "minute"
+        assert 1 <= exc.value.retry_after <= 60
+
+        clock.now += 60
+        assert meter.usage("org-a")["minute"] == 0
+        assert meter.check("org-a") is None
+
+    def test_day_budget_and_org_override(self, clock):
+        meter = TokenMeter(per_day=1000, org_budgets={"big": (0, 0)}, clock=clock)
+        meter.record(1000, 0, org="small")
+        meter.record(5000, 0, org="big")
+
+        with pytest.raises(TokenBudgetExceeded) as exc:
+            meter.check("small")
+        assert exc.value.window == "day"
+        assert meter.check("big") is None
+        assert meter.check("other") is None
+
+    def test_degrade_action(self, clock, monkeypatch):
+        monkeypatch.setattr(metering.settings, "token_budget_action", "degrade")
+        meter = TokenMeter(per_minute=10, clock=clock)
+        meter.record(10, 0, org="org-a")
+        assert meter.check("org-a") == "degrade"
+
+    def test_flush_writes_rollups_and_keeps_them_on_failure(self, clock, monkeypatch):
+        meter = TokenMeter(clock=clock)
+        meter.record(50, 20, org="org-a", user="u1")
+        meter.record(10, 5, org="org-a", user="u1")
+        meter.record(1, 1, org="org-a", user="u2")
+
+        monkeypatch.setattr(metering.db_service, "increment_token_usage", lambda rollups, flush_id: None)
+        assert meter.flush() == 0
+
+        written = []
+        monkeypatch.setattr(metering.db_service, "increment_token_usage",
+                            lambda rollups, flush_id: written.extend(rollups) or [])
+        assert meter.flush() == 2
+        u1 = next(r for r in written if r["userId"] == "u1")
+        assert (u1["promptTokens"], u1["completionTokens"], u1["calls"]) == (60, 25, 2)
+        assert u1["orgId"] == "org-a" and u1["day"] == "2023-11-14"
+        assert meter.flush() == 0
+
+    def test_partial_failure_never_counts_applied_rollups_twice(self, clock, monkeypatch):
+        store = FakeRollupStore()
+        monkeypatch.setattr(metering.db_service, "increment_token_usage", store.increment)
+        meter = TokenMeter(clock=clock)
+        for user in ("u1", "u2", "u3"):
+            meter.record(100, 0, org="org-a", user=user)
+
+        # u2's write fails; the other two are applied
+        store.fail_users = {"u2"}
+        assert meter.flush() == 2
+        # The retry times out after the server applied it
+        store.fail_users, store.lose_reply = set(), True
+        meter.record(7, 0, org="org-a", user="u1")
+        assert meter.flush() == 0
+        store.lose_reply = False
+        assert meter.flush() == 2
+
+        assert store.tokens == {"u1": 107, "u2": 100, "u3": 100}
+        assert meter.flush() == 0
+
+    @pytest.mark.asyncio
+    async def test_completion_usage_is_metered(self, standin_llm, monkeypatch):
+        meter = TokenMeter()
+        monkeypatch.setattr(llm_client, "token_meter", meter)
+        with request_tenant("org-a", "user-1"):
+            await llm_client.create_chat_completion(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": "hi"}]
+            )
+
+        assert meter.usage("org-a")["day"] == 70
@@ -0,0 +1,81 @@
+"""
+Unit tests for content-size and tenant-aware model routing.
+"""
+
+import pytest
+from app.config import Settings
+from app.services import llm_client, model_router as router_module
+from app.services.extraction_engine import extract
+from app.services.metering import request_tenant
+from app.services.model_router import ModelRouter, _parse_org_routes, _parse_prices, current_route, use_route
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(router_module.settings, "model_routing_enabled", True)
+    monkeypatch.setattr(router_module.settings, "llm_backend", "openai")
+    monkeypatch.setattr(router_module.settings, "route_small_max_tokens", 10)
+    monkeypatch.setattr(router_module.settings, "route_medium_max_tokens", 100)
+    monkeypatch.setattr(router_module.settings, "route_small_max_cues", 5)
+    monkeypatch.setattr(router_module.settings, "route_medium_max_cues", 10)
+    monkeypatch.setattr(router_module.settings, "route_org_overrides", "pinned:large")
+    monkeypatch.setattr(router_module.settings, "model_prices", "gpt-4o-mini:0.15/0.60")
+    return ModelRouter()
+
+
+class TestModelRouter:
+    """Tests for route selection, cost estimates and the local backend."""
+
+    def test_routes_by_estimated_tokens(self, router):
+        assert router.select("Budget approved.").name == "small"
+        assert router.select("x" * 200).name == "medium"
+        assert router.select("x" * 800).name == "large"
+        assert router.select("Budget approved.").max_cues < router.select("x" * 800).max_cues
+
+    def test_org_override_uses_current_tenant(self, router):
+        assert router.select("Budget approved.", org="pinned").name == "large"
+        with request_tenant("pinned", "u1"):
+            assert router.select("Budget approved.").name == "large"
+
+    def test_local_backend_and_disabled_routing(self, router, monkeypatch):
+        monkeypatch.setattr(router_module.settings, "llm_backend", "local")
+        route = router.select("Budget approved.")
+        assert route.name == "local" and route.base_url
+
+        monkeypatch.setattr(router_module.settings, "llm_backend", "openai")
+        monkeypatch.setattr(router_module.settings, "model_routing_enabled", False)
+        assert router.select("Budget approved.").name == "large"
+
+    def test_default_routes_keep_callers_max_cues(self, monkeypatch):
+        monkeypatch.setattr(router_module, "settings", Settings())
+        router = ModelRouter()
+
+        for content in ("Budget approved.", "x" * 2000, "x" * 8000):
+            assert router.select(content).max_cues >= 20
+
+    def test_parsers_and_cost(self, router):
+        assert _parse_org_routes("a:small, b:nope,:large") == {"a": "small"}
+        assert _parse_prices("m:1/2,bad:x,n:3") == {"m": (1.0, 2.0), "n": (3.0, 3.0)}
+        assert router.cost("gpt-4o-mini", 1_000_000, 1_000_000) == pytest.approx(0.75)
+        assert router.cost("unpriced", 1000, 1000) == 0.0
+
+    def test_use_route_scopes_current_route(self, router):
+        small = router.routes["small"]
+        with use_route(small):
+            assert current_route() is small
+        assert current_route() is not small
+
+    @pytest.mark.asyncio
+    async def test_local_route_sends_extraction_to_standin(self, standin_llm, standin_server, monkeypatch):
+        _, base_url = standin_server
+        monkeypatch.setattr(router_module.settings, "llm_backend", "local")
+        monkeypatch.setitem(router_module.model_router.routes, "local",
+                            router_module.ModelRoute("local", "standin-model", 3, base_url))
+        monkeypatch.setattr(llm_client, "_endpoint_clients", {})
+
+        outcome = await extract("The budget proposal was submitted before the deadline.", use_cache=False, mode="llm")
+
+        assert outcome.engine == "llm"
+        assert standin_llm.requests == 1
+        assert standin_llm.last_request["model"] == "standin-model"
+        await llm_client._endpoint_clients[base_url].close()
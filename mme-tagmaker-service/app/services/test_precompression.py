@@ -0,0 +1,55 @@
+"""
+Unit tests for content pre-compression.
+"""
+
+from app.services import precompression
+from app.services.precompression import compress, precompress
+
+
+class TestPrecompression:
+    """Tests for dedupe, whitespace collapsing and placeholders."""
+
+    def test_plain_prose_is_unchanged(self):
+        text = "The budget proposal was submitted.\nReview is scheduled for Friday."
+        result = compress(text)
+        assert result.text == text
+        assert result.bytes_saved == 0 and result.tokens_saved == 0
+
+    def test_duplicates_and_whitespace(self):
+        text = "Deploy   finished\t\tok.\n\n\n\nDeploy finished ok.\n\nBudget approved today.\nBudget approved today.\n}\n}"
+        assert compress(text).text == "Deploy finished ok.\n\nBudget approved today.\n}\n}"
+
+    def test_stack_traces_keep_the_error_line(self):
+        text = (
+            "Traceback (most recent call last):\n"
+            '  File "a.py", line 1, in <module>\n    main()\n'
+            '  File "b.py", line 9, in main\n    raise KeyError("x")\n'
+            "KeyError: 'x'\n\n"
+            "Handler failed\n    at a.B.c(B.java:1)\n    at a.B.d(B.java:2)\n    at a.B.e(B.java:3)\n"
+        )
+        assert compress(text).text == (
+            "[stack trace: 2 frames]\nKeyError: 'x'\n\nHandler failed\n[stack trace: 3 frames]"
+        )
+
+    def test_blobs_code_and_json_become_placeholders(self):
+        code = "```python\n" + "\n".join(f"x{i} = {i}" for i in range(12)) + "\n```"
+        short_code = "```\nprint('hi')\n```"
+        blob = "data:image/png;base64," + "iVBORw0KGgo" * 20
+        pasted = '{"status": "ok", "items": [' + ", ".join(str(i) for i in range(100)) + "]}"
+        text = f"Screenshot {blob} attached.\n\n{code}\n\n{short_code}\n\n{pasted}"
+
+        result = compress(text)
+
+        assert result.text == (
+            "Screenshot [blob: 242 chars] attached.\n\n[code block: 12 lines]\n\n"
+            f"{short_code}\n\n[json object: status, items]"
+        )
+        assert result.bytes_saved > 500
+        assert result.tokens_saved > 100
+
+    def test_precompress_respects_setting(self, monkeypatch):
+        text = "Budget approved.\n\n\n\nBudget approved."
+        monkeypatch.setattr(precompression.settings, "precompression_enabled", False)
+        assert precompress(text) == text
+        monkeypatch.setattr(precompression.settings, "precompression_enabled", True)
+        assert precompress(text) == "Budget approved."
@@ -0,0 +1,168 @@
+"""
+Unit tests for multi-document prompt packing.
+"""
+
+import json
+import asyncio
+import pytest
+from types import SimpleNamespace
+from app.services import llm_tagger
+from app.services.prompt_packing import PromptPacker
+from app.services.scheduler import request_lane
+
+
+class FakePackedLLM:
+    """Pack function answering for every document except those listed in broken."""
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.packs = []
+        self.singles = []
+
+    async def pack(self, docs):
+        self.packs.append(dict(docs))
+        await asyncio.sleep(0)
+        return {doc_id: f"packed:{text}" for doc_id, text in docs.items() if text not in self.broken}
+
+    async def single(self, text):
+        self.singles.append(text)
+        return f"single:{text}"
+
+
+class TestPromptPacker:
+    """Tests for pack boundaries and per-document retries."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_documents_share_one_call(self):
+        llm = FakePackedLLM()
+        packer = PromptPacker("test", llm.pack, llm.single, window_seconds=0.01)
+
+        results = await asyncio.gather(*(packer.submit("org", f"doc{i}", 10) for i in range(5)))
+
+        assert results == [f"packed:doc{i}" for i in range(5)]
+        assert len(llm.packs) == 1
+        assert list(llm.packs[0]) == ["d1", "d2", "d3", "d4", "d5"]
+
+    @pytest.mark.asyncio
+    async def test_token_and_document_budgets_close_packs(self):
+        llm = FakePackedLLM()
+        packer = PromptPacker("test", llm.pack, llm.single, max_tokens=100, max_docs=3, window_seconds=1)
+
+        await asyncio.gather(*(packer.submit("org", f"doc{i}", 40) for i in range(4)))
+        assert [len(p) for p in llm.packs] == [2, 2]
+
+        llm.packs.clear()
+        await asyncio.gather(*(packer.submit("org", f"doc{i}", 1) for i in range(6)))
+        assert [len(p) for p in llm.packs] == [3, 3]
+
+    @pytest.mark.asyncio
+    async def test_keys_are_never_mixed(self):
+        llm = FakePackedLLM()
+        packer = PromptPacker("test", llm.pack, llm.single, window_seconds=0.01)
+
+        await asyncio.gather(packer.submit("orgA", "a1", 1), packer.submit("orgB", "b1", 1),
+                             packer.submit("orgA", "a2", 1))
+
+        assert sorted(sorted(p.values()) for p in llm.packs) == [["a1", "a2"]]
+        assert llm.singles == ["b1"]
+
+    @pytest.mark.asyncio
+    async def test_only_unparsed_documents_are_retried(self):
+        llm = FakePackedLLM(broken={"doc1"})
+        packer = PromptPacker("test", llm.pack, llm.single, window_seconds=0.01)
+
+        results = await asyncio.gather(*(packer.submit("org", f"doc{i}", 10) for i in range(3)))
+
+        assert results == ["packed:doc0", "single:doc1", "packed:doc2"]
+        assert llm.singles == ["doc1"]
+
+    @pytest.mark.asyncio
+    async def test_failed_call_fails_every_waiter(self):
+        async def failing(docs):
+            raise ValueError("LLM extraction failed: boom")
+
+        packer = PromptPacker("test", failing, FakePackedLLM().single, window_seconds=0.01)
+        results = await asyncio.gather(*(packer.submit("org", f"doc{i}", 10) for i in range(2)),
+                                       return_exceptions=True)
+
+        assert all(isinstance(r, ValueError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_abandoned_packs_are_not_sent_or_are_cancelled(self):
+        llm = FakePackedLLM()
+        packer = PromptPacker("test", llm.pack, llm.single, window_seconds=0.01)
+        waiters = [asyncio.ensure_future(packer.submit("org", f"doc{i}", 10)) for i in range(2)]
+        await asyncio.sleep(0)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.sleep(0.02)
+
+        assert llm.packs == [] and packer._packs == {}
+
+        started, cancelled = asyncio.Event(), asyncio.Event()
+
+        async def slow(docs):
+            started.set()
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        packer = PromptPacker("test", slow, llm.single, window_seconds=0.01)
+        waiters = [asyncio.ensure_future(packer.submit("org", f"doc{i}", 10)) for i in range(2)]
+        await started.wait()
+        waiters[0].cancel()
+        await asyncio.sleep(0)
+        assert not cancelled.is_set()
+        waiters[1].cancel()
+        await asyncio.wait_for(cancelled.wait(), 0.1)
+
+
+class TestPackedExtraction:
+    """Tests for the packed prompt in the LLM tagger."""
+
+    @pytest.fixture
+    def packed_llm(self, monkeypatch):
+        calls = []
+
+        async def fake_completion(**kwargs):
+            calls.append(kwargs)
+            system, user = (m["content"] for m in kwargs["messages"])
+            if "per document" not in system:
+                cues = {"cues": [f"{user} scheduled for review"], "confidence": 0.7}
+                return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(cues)))])
+            # The second document's section comes back malformed
+            docs = json.loads(user)
+            sections = {doc_id: {"cues": [f"{text} submitted for review"], "confidence": 0.9} for doc_id, text in docs.items()}
+            sections["d2"] = {"cues": "not a list"}
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(sections)))])
+
+        monkeypatch.setattr(llm_tagger, "get_llm_client", lambda: object())
+        monkeypatch.setattr(llm_tagger, "create_chat_completion", fake_completion)
+        monkeypatch.setattr(llm_tagger.settings, "prompt_packing_enabled", True)
+        monkeypatch.setattr(llm_tagger.settings, "extraction_cache_enabled", False)
+        monkeypatch.setattr(llm_tagger, "prompt_packer", PromptPacker(
+            "test", llm_tagger._extract_packed, llm_tagger._extract_single, window_seconds=0.01))
+        return calls
+
+    @pytest.mark.asyncio
+    async def test_bulk_documents_are_packed_and_split(self, packed_llm):
+        docs = ["Budget proposal", "Audit report", "Deadline extension"]
+        with request_lane("bulk", "org1"):
+            results = await asyncio.gather(*(llm_tagger.extract_cues(doc) for doc in docs))
+
+        # One packed call, then the malformed section's document alone
+        assert len(packed_llm) == 2
+        assert json.loads(packed_llm[0]["messages"][1]["content"]) == {"d1": docs[0], "d2": docs[1], "d3": docs[2]}
+        assert packed_llm[1]["messages"][1]["content"] == "Audit report"
+        assert [r[1] for r in results] == [0.9, 0.7, 0.9]
+        assert all(tags for tags, _, _ in results)
+
+    @pytest.mark.asyncio
+    async def test_interactive_documents_are_not_packed(self, packed_llm):
+        with request_lane("interactive", "org1"):
+            await asyncio.gather(*(llm_tagger.extract_cues(doc) for doc in ["Budget proposal", "Audit report"]))
+
+        assert len(packed_llm) == 2
+        assert all("per document" not in c["messages"][0]["content"] for c in packed_llm)
@@ -0,0 +1,116 @@
+"""
+Unit tests for priority lanes and per-org fair queuing.
+"""
+
+import asyncio
+import pytest
+from app.services.concurrency import AdaptiveLimiter
+from app.services.scheduler import (
+    FairQueue, _parse_org_weights, current_lane, metric_org, request_lane, resolve_priority
+)
+from app.services import scheduler
+
+
+def _drain(queue: FairQueue):
+    items = []
+    while True:
+        entry = queue.pop()
+        if entry is None:
+            return items
+        items.append(entry.item)
+
+
+class TestFairQueue:
+    """Tests for class priority and weighted fair queuing between orgs."""
+
+    def test_higher_class_is_served_first(self):
+        queue = FairQueue(org_weights={})
+        queue.push("bulk", "bulk", "a")
+        queue.push("save", "save", "a")
+        queue.push("interactive", "interactive", "a")
+
+        assert _drain(queue) == ["interactive", "save", "bulk"]
+
+    def test_orgs_share_a_class_fairly(self):
+        queue = FairQueue(org_weights={})
+        for i in range(6):
+            queue.push(f"big-{i}", "bulk", "big")
+        queue.push("small-0", "bulk", "small")
+        queue.push("small-1", "bulk", "small")
+
+        order = _drain(queue)
+        # The small org is not stuck behind the big org's backlog
+        assert order.index("small-0") <= 1
+        assert order.index("small-1") <= 3
+
+    def test_org_weights_scale_share(self):
+        queue = FairQueue(org_weights={"heavy": 2.0})
+        for i in range(4):
+            queue.push(f"heavy-{i}", "save", "heavy")
+            queue.push(f"light-{i}", "save", "light")
+
+        first_six = _drain(queue)[:6]
+        assert sum(1 for item in first_six if item.startswith("heavy")) == 4
+
+    def test_removed_entries_are_skipped(self):
+        queue = FairQueue(org_weights={})
+        entry = queue.push("gone", "interactive", "a")
+        queue.push("kept", "interactive", "a")
+        queue.remove(entry)
+
+        assert len(queue) == 1
+        assert _drain(queue) == ["kept"]
+        assert queue.depth("interactive") == 0
+
+    def test_parse_org_weights(self):
+        assert _parse_org_weights("a:2, b:0.5,bad,c:x,d:0") == {"a": 2.0, "b": 0.5}
+        assert _parse_org_weights("") == {}
+
+    def test_only_configured_orgs_get_their_own_metric_label(self, monkeypatch):
+        monkeypatch.setattr(scheduler.settings, "metric_orgs", "org-a, org-b")
+        monkeypatch.setattr(scheduler.settings, "scheduler_org_weights", "org-c:2")
+        monkeypatch.setattr(scheduler.settings, "org_token_budgets", "org-d:100/0")
+
+        assert [metric_org(org) for org in ("org-a", "org-b", "org-c", "org-d", "unknown")] == \
+            ["org-a", "org-b", "org-c", "org-d", "unknown"]
+        assert metric_org("org-from-client-123") == "other"
+
+
+class TestLanes:
+    """Tests for request lanes and priority resolution."""
+
+    def test_request_can_only_lower_priority(self):
+        assert resolve_priority("interactive", None) == "interactive"
+        assert resolve_priority("interactive", "bulk") == "bulk"
+        assert resolve_priority("bulk", "interactive") == "bulk"
+
+    def test_request_lane_sets_and_restores(self):
+        assert current_lane() == ("bulk", "unknown")
+        with request_lane("interactive", "org-1"):
+            assert current_lane() == ("interactive", "org-1")
+        assert current_lane() == ("bulk", "unknown")
+
+    def test_unknown_priority_rejected(self):
+        with pytest.raises(ValueError):
+            with request_lane("urgent", "org-1"):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_interactive_overtakes_queued_bulk(self):
+        limiter = AdaptiveLimiter(initial_limit=1, queue=FairQueue(org_weights={}))
+        order = []
+
+        async def call(name, priority, org):
+            with request_lane(priority, org):
+                await limiter.acquire()
+            order.append(name)
+            await asyncio.sleep(0.01)
+            limiter.release(latency=0.01)
+
+        tasks = [asyncio.ensure_future(call(f"bulk-{i}", "bulk", "big")) for i in range(4)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(call("interactive", "interactive", "small")))
+        await asyncio.gather(*tasks)
+
+        # bulk-0 already held the only slot; the interactive call goes next
+        assert order[:2] == ["bulk-0", "interactive"]
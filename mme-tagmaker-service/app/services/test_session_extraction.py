@@ -0,0 +1,102 @@
+"""
+Unit tests for session-incremental extraction.
+"""
+
+import time
+import pytest
+from app.models.extraction import ExtractionOutcome
+from app.models.tag import Tag
+from app.services.metering import request_tenant
+from app.services.session_extraction import SessionStore, merge_session_tags
+
+
+class RecordingExtractor:
+    """Returns one tag per line of the text it is given and records the inputs."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, text: str) -> ExtractionOutcome:
+        self.calls.append(text)
+        labels = [line.split()[0].lower() for line in text.splitlines() if line.strip()]
+        tags = [Tag(label=label, links=[label], usageCount=1) for label in labels]
+        return ExtractionOutcome(tags=tags, confidence=0.8, primary_tag=labels[0] if labels else "")
+
+
+class TestSessionStore:
+    """Tests for prefix reuse, merging and eviction of session state."""
+
+    @pytest.mark.asyncio
+    async def test_only_the_new_suffix_is_extracted(self):
+        store, extractor = SessionStore(), RecordingExtractor()
+        turn1 = "Budget approved by finance.\n"
+        turn2 = turn1 + "Deadline moved to Friday.\n"
+
+        first = await store.extract("s1", turn1, 20, "llm", extractor)
+        second = await store.extract("s1", turn2, 20, "llm", extractor)
+        unchanged = await store.extract("s1", turn2, 20, "llm", extractor)
+
+        assert extractor.calls == [turn1, "Deadline moved to Friday.\n"]
+        assert [t.label for t in first.tags] == ["budget"]
+        assert [t.label for t in second.tags] == ["budget", "deadline"]
+        assert [t.label for t in unchanged.tags] == ["budget", "deadline"]
+
+    @pytest.mark.asyncio
+    async def test_edited_prefix_or_other_tenant_extracts_everything(self):
+        store, extractor = SessionStore(), RecordingExtractor()
+        await store.extract("s1", "Budget approved.\n", 20, "llm", extractor)
+
+        await store.extract("s1", "Budget rejected.\nReview later.\n", 20, "llm", extractor)
+        with request_tenant("other-org", "u1"):
+            await store.extract("s1", "Budget rejected.\nReview later.\nAudit booked.\n", 20, "llm", extractor)
+
+        assert extractor.calls[1] == "Budget rejected.\nReview later.\n"
+        assert extractor.calls[2] == "Budget rejected.\nReview later.\nAudit booked.\n"
+
+    @pytest.mark.asyncio
+    async def test_short_or_failing_suffix_keeps_session_tags(self):
+        store, extractor = SessionStore(), RecordingExtractor()
+        turn1 = "Budget approved by finance.\n"
+        turn2 = turn1 + "ok, thanks\n"
+        turn3 = turn2 + "Nothing worth tagging in this turn.\n"
+        turn4 = turn3 + "Deadline moved to Friday.\n"
+
+        async def failing(text):
+            if text.startswith("ok"):
+                raise ValueError("LLM returned no cues from content analysis")
+            return await extractor(text)
+
+        await store.extract("s1", turn1, 20, "llm", extractor)
+        short = await store.extract("s1", turn2, 20, "llm", failing)
+        failed = await store.extract("s1", turn3, 20, "llm", failing)
+        recovered = await store.extract("s1", turn4, 20, "llm", extractor)
+
+        assert [t.label for t in short.tags] == [t.label for t in failed.tags] == ["budget"]
+        # Skipped and failed turns are retried as part of the next suffix
+        assert extractor.calls == [turn1, turn4[len(turn1):]]
+        assert [t.label for t in recovered.tags] == ["budget", "ok,", "nothing", "deadline"]
+
+    def test_merge_counts_repeats_and_keeps_newest(self):
+        previous = [Tag(label=label, usageCount=1) for label in ("a", "b", "c")]
+        new = [Tag(label="b", usageCount=1), Tag(label="d", usageCount=1)]
+
+        merged = merge_session_tags(previous, new, max_cues=3)
+
+        assert [t.label for t in merged] == ["c", "b", "d"]
+        assert merged[1].usageCount == 2
+        assert previous[1].usageCount == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_and_ttl_eviction(self, monkeypatch):
+        store, extractor = SessionStore(max_sessions=2, ttl_seconds=60), RecordingExtractor()
+        for session in ("s1", "s2", "s3"):
+            await store.extract(session, "Budget approved.\n", 20, "llm", extractor)
+        assert len(store) == 2
+
+        await store.extract("s1", "Budget approved.\n", 20, "llm", extractor)
+        assert len(extractor.calls) == 4  # s1 was evicted, so it was extracted again
+
+        now = time.monotonic()
+        monkeypatch.setattr("app.services.session_extraction.time.monotonic", lambda: now + 61)
+        await store.extract("s1", "Budget approved.\n", 20, "llm", extractor)
+        assert len(extractor.calls) == 5
@@ -0,0 +1,66 @@
+"""
+Unit tests for shadow-mode engine comparison.
+"""
+
+import asyncio
+import pytest
+from types import SimpleNamespace
+from app.models.tag import Tag
+from app.services import extraction_engine, llm_client
+from app.services.shadow import ShadowComparator, jaccard
+
+
+def _engine(labels, primary_tag, tokens):
+    async def run(content, max_cues, use_cache=True):
+        usage = SimpleNamespace(prompt_tokens=tokens, completion_tokens=tokens // 10)
+        llm_client._record_usage(SimpleNamespace(usage=usage))
+        return [Tag(label=label) for label in labels], 0.9, primary_tag
+    return run
+
+
+class TestShadowMode:
+    """Tests for sampled background comparison of engines."""
+
+    def test_jaccard(self):
+        assert jaccard(["a", "b"], ["b", "c"]) == pytest.approx(1 / 3)
+        assert jaccard([], []) == 1.0
+
+    @pytest.mark.asyncio
+    async def test_sampled_request_runs_alternate_engine(self, monkeypatch):
+        comparator = ShadowComparator()
+        monkeypatch.setattr(extraction_engine, "shadow_comparator", comparator)
+        monkeypatch.setattr(extraction_engine, "ENGINES", {
+            "llm_tagger": (_engine(["budget", "deadline"], "budget", 100), "llm"),
+            "enhanced": (_engine(["budget", "review"], "review", 300), "enhanced"),
+        })
+        monkeypatch.setattr(extraction_engine.settings, "extraction_engine", "llm_tagger")
+        monkeypatch.setattr(extraction_engine.settings, "shadow_sample_rate", 1.0)
+
+        with llm_client.track_usage() as request_usage:
+            outcome = await extraction_engine.extract("The budget was approved.", mode="llm")
+            await asyncio.sleep(0.01)  # let the shadow task finish
+
+        assert outcome.engine == "llm"
+        assert [tag.label for tag in outcome.tags] == ["budget", "deadline"]
+        # Shadow tokens are not attributed to the request
+        assert request_usage.total_tokens == 110
+
+        summary = comparator.summary()
+        assert summary["comparisons"] == 1
+        assert summary["mean_cue_jaccard"] == pytest.approx(1 / 3, abs=1e-3)
+        assert summary["primary_tag_agreement"] == 0.0
+        assert summary["engines"]["enhanced"]["avg_tokens"] == 330
+        assert summary["engines"]["llm_tagger"]["samples"] == 1
+
+    @pytest.mark.asyncio
+    async def test_no_shadow_when_rate_is_zero(self, monkeypatch):
+        comparator = ShadowComparator()
+        monkeypatch.setattr(comparator, "schedule", lambda *a, **k: pytest.fail("shadow scheduled"))
+        monkeypatch.setattr(extraction_engine, "shadow_comparator", comparator)
+        monkeypatch.setattr(extraction_engine, "ENGINES", {
+            "llm_tagger": (_engine(["budget"], "budget", 100), "llm"),
+            "enhanced": (_engine(["budget"], "budget", 100), "enhanced"),
+        })
+        monkeypatch.setattr(extraction_engine.settings, "shadow_sample_rate", 0.0)
+
+        await extraction_engine.extract("The budget was approved.", mode="llm")
@@ -0,0 +1,125 @@
+"""
+Unit tests for single-flight request coalescing.
+"""
+
+import asyncio
+import pytest
+from app.services import deadline
+from app.services.deadline import DeadlineExceeded, request_deadline
+from app.services.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight de-duplication."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight("test")
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*[flight.do("k", work) for _ in range(5)])
+
+        assert results == ["result"] * 5
+        assert calls == 1
+        assert flight.inflight() == 0
+
+    @pytest.mark.asyncio
+    async def test_exception_propagates_to_all_waiters(self):
+        flight = SingleFlight("test")
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(*[flight.do("k", work) for _ in range(3)], return_exceptions=True)
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.inflight() == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_call(self):
+        flight = SingleFlight("test")
+
+        async def work():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "done"
+
+    @pytest.mark.asyncio
+    async def test_call_cancelled_when_every_waiter_leaves(self):
+        flight = SingleFlight("test")
+        finished = False
+
+        async def work():
+            nonlocal finished
+            await asyncio.sleep(0.05)
+            finished = True
+
+        caller = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0.06)
+
+        assert not finished
+        assert flight.inflight() == 0
+
+    @pytest.mark.asyncio
+    async def test_each_waiter_applies_its_own_deadline(self):
+        flight = SingleFlight("test")
+        seen_deadlines = []
+
+        async def work():
+            seen_deadlines.append(deadline.remaining())
+            await asyncio.sleep(0.05)
+            seen_deadlines.append(deadline.remaining())
+            return "done"
+
+        async def call(budget):
+            with request_deadline(budget):
+                return await flight.do("k", work)
+
+        # The call is started by the caller with the shortest deadline
+        results = await asyncio.gather(call(0.01), call(None), call(1.0), return_exceptions=True)
+
+        assert isinstance(results[0], DeadlineExceeded)
+        assert results[1:] == ["done", "done"]
+        # Lifted once a caller without a deadline joined
+        assert seen_deadlines == [None, None]
+        assert flight.inflight() == 0
+
+        # A lone caller's deadline still reaches the shared call
+        seen_deadlines.clear()
+        assert await call(1.0) == "done"
+        assert 0 < seen_deadlines[0] <= 1.0
+
+    @pytest.mark.asyncio
+    async def test_shared_call_runs_under_latest_waiter_deadline(self):
+        flight = SingleFlight("test")
+        seen_deadlines = []
+
+        async def work():
+            await asyncio.sleep(0.02)
+            seen_deadlines.append(deadline.remaining())
+            return "done"
+
+        async def call(budget):
+            with request_deadline(budget):
+                return await flight.do("k", work)
+
+        results = await asyncio.gather(call(0.5), call(1.0), call(0.2))
+
+        assert results == ["done"] * 3
+        # Extended to the 1 s caller's deadline, never shortened by the 0.2 s one
+        assert 0.5 < seen_deadlines[0] <= 1.0
@@ -0,0 +1,67 @@
+"""
+Unit tests for per-stage pipeline timing.
+"""
+
+import pytest
+from prometheus_client import REGISTRY
+from app.services import stage_timing
+from app.services.extraction_engine import extract
+from app.services.stage_timing import request_timing, timed_stage, observe_extraction, server_timing_header
+
+CONTENT = "The budget proposal was submitted to finance. The review meeting is scheduled for Friday."
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestStageTiming:
+    """Tests for stage histograms, per-request collection and the Server-Timing header."""
+
+    def test_stages_are_summed_per_request(self):
+        with request_timing("extract-tags") as timings:
+            with timed_stage("llm_wait", "llm"):
+                pass
+            with timed_stage("llm_wait", "llm"):
+                pass
+            with timed_stage("parse", "llm"):
+                pass
+
+        assert list(timings.stages) == ["llm_wait", "parse"]
+        assert timings.header().startswith("llm_wait;dur=")
+        assert ", parse;dur=" in timings.header()
+
+    def test_histograms_are_labeled_by_stage_engine_and_route(self):
+        before = _sample("mme_pipeline_stage_seconds_count", stage="build_delta", engine="llm", route="generate-and-save")
+        with request_timing("generate-and-save"), timed_stage("build_delta", "llm"):
+            pass
+        with timed_stage("build_delta", "llm"):
+            pass
+
+        assert _sample("mme_pipeline_stage_seconds_count", stage="build_delta", engine="llm",
+                       route="generate-and-save") == before + 1
+        assert _sample("mme_pipeline_stage_seconds_count", stage="build_delta", engine="llm", route="none") >= 1
+
+    def test_content_size_and_cue_count(self):
+        before = _sample("mme_extraction_cues_sum", engine="heuristic", route="batch")
+        with request_timing("batch"):
+            observe_extraction("ü" * 10, 4, "heuristic")
+
+        assert _sample("mme_extraction_cues_sum", engine="heuristic", route="batch") == before + 4
+        assert _sample("mme_extraction_content_bytes_bucket", engine="heuristic", route="batch", le="100.0") >= 1
+
+    def test_header_is_opt_in(self, monkeypatch):
+        with request_timing("extract-tags") as timings, timed_stage("admission"):
+            pass
+
+        monkeypatch.setattr(stage_timing.settings, "server_timing_enabled", False)
+        assert server_timing_header(timings) is None
+        monkeypatch.setattr(stage_timing.settings, "server_timing_enabled", True)
+        assert server_timing_header(timings).startswith("admission;dur=")
+
+    @pytest.mark.asyncio
+    async def test_engine_stages_reach_the_request(self):
+        with request_timing("extract-tags") as timings:
+            await extract(CONTENT, mode="heuristic")
+
+        assert "heuristic" in timings.stages
@@ -0,0 +1,33 @@
+"""
+Unit tests for the incremental streamed-completion cue parser.
+"""
+
+from app.services.stream_parser import CueStreamParser
+
+
+class TestCueStreamParser:
+    """Tests for CueStreamParser."""
+
+    def test_emits_cues_as_they_complete(self):
+        parser = CueStreamParser()
+        raw = '{"cues": ["Budget approved", "Deadline \\"moved\\" to Q3"], "confidence": 0.87}'
+
+        emitted = []
+        for i in range(0, len(raw), 3):
+            emitted.append(parser.feed(raw[i:i + 3]))
+
+        flat = [cue for chunk in emitted for cue in chunk]
+        assert flat == ["Budget approved", 'Deadline "moved" to Q3']
+        # First cue is available before the stream finishes
+        first_index = next(i for i, chunk in enumerate(emitted) if chunk)
+        assert first_index < len(emitted) - 1
+        assert parser.confidence() == 0.87
+
+    def test_ignores_strings_after_array(self):
+        parser = CueStreamParser()
+        assert parser.feed('{"cues": ["a"], "note": "not a cue"}') == ["a"]
+
+    def test_confidence_default_on_truncated_stream(self):
+        parser = CueStreamParser()
+        parser.feed('{"cues": ["a"')
+        assert parser.confidence(0.5) == 0.5
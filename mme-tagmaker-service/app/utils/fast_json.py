@@ -0,0 +1,42 @@
+"""
+Fast JSON serialization for extraction responses.
+
+Endpoints that return a dict full of Tag models make FastAPI run
+jsonable_encoder over it, which re-dumps every model field by field in
+Python before the standard json encoder runs. For 20 tags that is most of
+the response's CPU. Here the result is written by orjson in one pass, with
+pydantic models taken from their field values, and handed to a response
+class that sends the bytes as they are. The output is the same JSON:
+compact separators, non-ASCII kept, datetimes in ISO-8601 with `Z` for UTC.
+"""
+
+from typing import Any
+import orjson
+from pydantic import BaseModel
+from starlette.responses import Response
+
+OPTIONS = orjson.OPT_UTC_Z
+
+
+def _default(obj: Any):
+    # Response models here (Tag) have no aliases, computed fields or custom serializers,
+    # so their field values are what model_dump would produce
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize obj (dicts, lists, pydantic models, datetimes) to JSON bytes"""
+    return orjson.dumps(obj, default=_default, option=OPTIONS)
+
+
+class RawJSONResponse(Response):
+    """JSON response whose content is written as-is when already bytes, or with dumps otherwise."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
@@ -1,5 +1,20 @@
 import hashlib
+import re
 
 def sha256_hash(text: str) -> str:
     """Generate SHA256 hash of input text"""
     return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def normalize_content(text: str) -> str:
+    """Normalize content for hashing: trim and collapse whitespace runs"""
+    if not text:
+        return ""
+    return re.sub(r'\s+', ' ', text.strip())
+
+def content_hash(content: str, *parts) -> str:
+    """
+    Generate a content-addressed key: SHA256 of the normalized content
+    plus any extra key parts (e.g. max_cues, prompt version)
+    """
+    prefix = "|".join(str(part) for part in parts)
+    return sha256_hash(f"{prefix}|{normalize_content(content)}")
@@ -0,0 +1,125 @@
+"""
+Shared multi-pattern keyword scanner.
+
+Classifiers (sections, tag types, security context, conflict resolution)
+register their keyword lists with one Aho-Corasick automaton. A document is
+lowercased and scanned once, and every classifier reads its hits from the
+result, instead of each one lowercasing the whole text and running its own
+substring loop. Matching keeps `keyword in text.lower()` semantics:
+keywords match anywhere, including inside words and overlapping each other.
+Recent scans of long texts are cached, so the per-tag classifiers of one
+extraction reuse a single pass over the content.
+"""
+
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+# Shorter texts (labels, cues) are scanned directly rather than cached
+CACHE_MIN_CHARS = 256
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton compiled to a DFA over the keywords' alphabet."""
+
+    __slots__ = ("delta", "output")
+
+    def __init__(self, keywords: Iterable[str]):
+        goto: List[Dict[str, int]] = [{}]
+        output: List[FrozenSet[str]] = [frozenset()]
+        for keyword in keywords:
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    output.append(frozenset())
+                    nxt = goto[state][ch] = len(goto) - 1
+                state = nxt
+            output[state] = output[state] | {keyword}
+
+        # Breadth-first: a state's failure link and transitions only depend on shallower states
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            output[state] = output[state] | output[fail[state]]
+            # Missing transitions follow the failure link; chars outside every keyword go to the root
+            transitions = dict(delta[fail[state]])
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                transitions[ch] = nxt
+                queue.append(nxt)
+            delta[state] = transitions
+
+        self.delta = delta
+        self.output = output
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        delta, output = self.delta, self.output
+        hits = set()
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if output[state]:
+                hits.update(output[state])
+        return frozenset(hits)
+
+
+class KeywordScanner:
+    """Thread-safe keyword registry with a lazily compiled automaton and an LRU of recent scans."""
+
+    def __init__(self, keywords: Iterable[str] = (), cache_size: int = 64):
+        self.cache_size = cache_size
+        self._keywords: set = set()
+        self._automaton: Optional[KeywordAutomaton] = None
+        self._cache: "OrderedDict[str, FrozenSet[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.register(keywords)
+
+    def register(self, keywords: Iterable[str]) -> FrozenSet[str]:
+        """Add keywords to the scanner; returns them lowercased for membership tests on scan results"""
+        words = frozenset(k.lower() for k in keywords if k)
+        with self._lock:
+            if not words <= self._keywords:
+                self._keywords |= words
+                self._automaton = None
+                self._cache.clear()
+        return words
+
+    @property
+    def keywords(self) -> FrozenSet[str]:
+        return frozenset(self._keywords)
+
+    def _compiled(self) -> KeywordAutomaton:
+        automaton = self._automaton
+        if automaton is None:
+            with self._lock:
+                if self._automaton is None:
+                    self._automaton = KeywordAutomaton(sorted(self._keywords))
+                automaton = self._automaton
+        return automaton
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        """All registered keywords occurring in text, case-insensitively"""
+        if not text:
+            return frozenset()
+        if len(text) < CACHE_MIN_CHARS:
+            return self._compiled().scan(text.lower())
+
+        with self._lock:
+            hits = self._cache.get(text)
+            if hits is not None:
+                self._cache.move_to_end(text)
+                return hits
+        hits = self._compiled().scan(text.lower())
+        with self._lock:
+            self._cache[text] = hits
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return hits
+
+
+# Global scanner shared by the content classifiers
+content_keywords = KeywordScanner()
@@ -0,0 +1,49 @@
+"""
+Unit tests for the fast JSON response path.
+"""
+
+from datetime import datetime, timezone
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.models.tag import Tag
+from app.utils.fast_json import RawJSONResponse, dumps
+
+
+def _result(tags: int) -> dict:
+    return {
+        "tags": [Tag(label=f"décision_{i}", section="finance", type="finance.budget", confidence=0.9,
+                     links=["Q1 review"] if i % 2 else [], usageCount=1,
+                     lastUsed=datetime(2025, 7, 8, 15, 44, i, 1234, tzinfo=timezone.utc) if i % 3 else datetime(2025, 7, 8))
+                 for i in range(tags)],
+        "confidence": 0.95,
+        "primary_tag": "décision_0",
+        "engine": "llm"
+    }
+
+
+class TestFastJSON:
+    """Tests that the fast path writes the same JSON as FastAPI's default encoding."""
+
+    @pytest.mark.parametrize("tags", [1, 20])
+    def test_matches_default_response_body(self, tags):
+        result = _result(tags)
+        assert dumps(result) == JSONResponse(jsonable_encoder(result)).body
+
+    def test_batch_results_with_errors(self):
+        batch = {"results": [{"index": 0, "status": "ok", **_result(2)},
+                             {"index": 1, "status": "error", "error": {"code": 400, "detail": "No extractable content found"}}],
+                 "total": 2, "succeeded": 1, "failed": 1}
+        assert dumps(batch) == JSONResponse(jsonable_encoder(batch)).body
+
+    def test_raw_response_sends_bytes_unchanged(self):
+        body = dumps(_result(1))
+        response = RawJSONResponse(body)
+
+        assert response.body is body
+        assert response.headers["content-type"] == "application/json"
+        assert RawJSONResponse({"engine": "llm"}).body == b'{"engine":"llm"}'
+
+    def test_unknown_types_are_rejected(self):
+        with pytest.raises(TypeError):
+            dumps({"value": object()})
@@ -0,0 +1,70 @@
+"""
+Unit tests for the shared keyword scanner and the classifiers built on it.
+"""
+
+import random
+from app.services.conflict_resolver import conflict_resolver
+from app.services.enhanced_extractor import enhanced_processor
+from app.services.llm_tagger import determine_section, determine_tag_type
+from app.utils.keyword_scanner import KeywordScanner
+
+
+class TestKeywordScanner:
+    """Tests for matching semantics and the scan cache."""
+
+    def test_matches_like_substring_search(self):
+        rng = random.Random(5)
+        for _ in range(200):
+            keywords = ["".join(rng.choice("ab c") for _ in range(rng.randint(1, 4))) for _ in range(8)]
+            scanner = KeywordScanner(keywords)
+            text = "".join(rng.choice("abcAB ") for _ in range(rng.randint(0, 300)))
+            expected = {k.lower() for k in keywords if k.lower() in text.lower()}
+            assert scanner.scan(text) == expected
+
+    def test_overlapping_and_nested_keywords(self):
+        scanner = KeywordScanner(["security audit", "audit", "curity", "rm -rf /"])
+
+        assert scanner.scan("Quarterly SECURITY AUDIT done; never run rm -rf / here") == \
+            {"security audit", "audit", "curity", "rm -rf /"}
+        assert scanner.scan("auditorium") == {"audit"}
+
+    def test_registering_keywords_recompiles(self):
+        scanner = KeywordScanner(["budget"])
+        text = "Budget and deadline review " * 20
+        assert scanner.scan(text) == {"budget"}
+
+        words = scanner.register(["Deadline"])
+
+        assert words == {"deadline"}
+        assert scanner.scan(text) == {"budget", "deadline"}
+
+
+class TestClassifiers:
+    """The classifiers keep their keyword-loop results."""
+
+    def test_section_from_label_or_content(self):
+        content = "The team agreed on the quarterly plan. " * 50
+
+        assert determine_section("release", content) == "general"
+        assert determine_section("grant_application", content) == "funding-proposal"
+        assert determine_section("release", content + "The deadline is Friday.") == "project-management"
+
+    def test_tag_type_order(self):
+        assert determine_tag_type("deploy_report") == "action"
+        assert determine_tag_type("budget") == "object"
+        assert determine_tag_type("crash") == "error"
+        assert determine_tag_type("approved") == "status"
+        assert determine_tag_type("weather") == "concept"
+
+    def test_security_context_scores(self):
+        assert enhanced_processor.detect_security_context("This tutorial explains how to prevent SQL injection.")
+        assert not enhanced_processor.detect_security_context("Run the practice match on Friday.")
+
+        context = conflict_resolver._analyze_content_context(
+            "Security audit and penetration test notes: training material on best practices.")
+        assert (context["educational_score"], context["security_work_score"]) == (8, 8)
+
+    def test_critical_threats(self):
+        assert conflict_resolver._has_critical_threats("then run DROP   TABLE users;")
+        assert conflict_resolver._has_critical_threats("a classic :(){ :|:& };: fork")
+        assert not conflict_resolver._has_critical_threats("Drop the table from the agenda.")
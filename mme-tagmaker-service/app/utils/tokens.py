@@ -0,0 +1,10 @@
+import math
+
+# Average characters per token for English text with the OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of text without running a tokenizer"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
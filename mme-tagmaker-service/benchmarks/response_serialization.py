@@ -0,0 +1,67 @@
+"""
+Benchmark: extraction response serialization at 1, 20 and 500 tags.
+
+Times the CPU an extraction response costs after the tags exist, the
+FastAPI default (jsonable_encoder over the result dict, then JSONResponse)
+against the fast path (orjson straight to bytes, RawJSONResponse). Tag
+construction is timed too, validated `Tag(...)` against `Tag.model_construct`,
+since skipping validation is only worth it when it is actually cheaper.
+
+Run from mme-tagmaker-service/: python -m benchmarks.response_serialization
+"""
+
+import os
+import timeit
+from datetime import datetime
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017/")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from app.models.tag import Tag  # noqa: E402
+from app.utils.fast_json import RawJSONResponse, dumps  # noqa: E402
+
+TAG_COUNTS = (1, 20, 500)
+
+
+def _fields(i: int, now: datetime) -> dict:
+    return dict(label=f"budget_proposal_{i}", section="funding-proposal", origin="agent", scope="shared",
+                type="finance.budget", confidence=0.9, links=[f"budget proposal {i} submitted"],
+                usageCount=1, lastUsed=now)
+
+
+def _result(tags: list) -> dict:
+    return {"tags": tags, "confidence": 0.9, "primary_tag": tags[0].label, "engine": "llm"}
+
+
+def default_response(result: dict) -> bytes:
+    return JSONResponse(jsonable_encoder(result)).body
+
+
+def fast_response(result: dict) -> bytes:
+    return RawJSONResponse(dumps(result)).body
+
+
+def _best_us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1_000_000
+
+
+def main():
+    now = datetime.now()
+    print(f"{'tags':>5s} {'validate':>10s} {'construct':>10s} {'default':>10s} {'fast':>10s} {'saved':>10s}")
+    for count in TAG_COUNTS:
+        fields = [_fields(i, now) for i in range(count)]
+        result = _result([Tag(**f) for f in fields])
+        assert default_response(result) == fast_response(result), "fast path output differs"
+
+        number = max(1, 2000 // count)
+        validate = _best_us(lambda: [Tag(**f) for f in fields], number)
+        construct = _best_us(lambda: [Tag.model_construct(**f) for f in fields], number)
+        default = _best_us(lambda: default_response(result), number)
+        fast = _best_us(lambda: fast_response(result), number)
+        print(f"{count:5d} {validate:8.1f}us {construct:8.1f}us {default:8.1f}us {fast:8.1f}us "
+              f"{default - fast:8.1f}us ({default / fast:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
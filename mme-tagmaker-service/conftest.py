@@ -0,0 +1,9 @@
+"""
+Shared pytest setup for the tagmaker service.
+
+Settings require a MongoDB URI at import time; unit tests never connect to it.
+"""
+
+import os
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017/")